@@ -0,0 +1,362 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import random
+import tempfile
+import threading
+
+from datetime import datetime, timedelta
+
+import requests
+
+from app.lib.logger import *
+from app.lib.utils.ratelimit import TokenBucket
+
+__all__ = ['Crawler', 'get_windows']
+
+BASE_URL = 'https://codereview.chromium.org'
+SEARCH_PATH = '/search'
+REVIEW_PATH = '/api/{rid}'
+PATCHSET_PATH = REVIEW_PATH + '/{psid}'
+
+# Number of identifiers per page of search results
+SEARCH_LIMIT = 1000
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+INTERVALS = ['month', 'week', 'day']
+
+# Status codes that are worth retrying a request on
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+class Crawler(object):
+    """Concurrent crawler of code reviews from Rietveld.
+
+    Requests are issued from an asyncio event loop and executed on a pool of
+    threads, each of which keeps a requests.Session so that connections are
+    kept alive and reused. All requests, whether for a review or a patchset,
+    are throttled by a single token bucket. The patchsets of a review are
+    retrieved concurrently.
+    """
+    def __init__(self, base_url=BASE_URL, rate=5.0, concurrency=16,
+                 retries=3, backoff=1.0, timeout=60):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        base_url : str, optional
+            URL of the Rietveld instance to crawl.
+        rate : float, optional
+            Maximum number of requests per second.
+        concurrency : int, optional
+            Maximum number of requests in flight.
+        retries : int, optional
+            Number of times a failed request is retried.
+        backoff : float, optional
+            Seconds to wait before the first retry. The wait doubles with
+            every retry.
+        timeout : float, optional
+            Seconds to wait for a response.
+        """
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate)
+        self._local = threading.local()
+
+    def get_reviews(self, ids):
+        """Retrieve the code reviews identified by the identifiers specified.
+
+        Parameters
+        ----------
+        ids : list
+            Unique identifiers of the code reviews to retrieve.
+
+        Returns
+        -------
+        (reviews, errors) : tuple
+            A list of reviews, with the patchsets of each review embedded in
+            it, and a list of identifiers of reviews that could not be
+            retrieved.
+        """
+        (reviews, errors) = (list(), list())
+        self.crawl(ids, reviews.append, errors.append)
+        return (reviews, errors)
+
+    def crawl(self, ids, on_review, on_error, predicate=None):
+        """Retrieve code reviews and hand each over as soon as it arrives.
+
+        Parameters
+        ----------
+        ids : list
+            Unique identifiers of the code reviews to retrieve.
+        on_review : callable
+            Called, in the calling thread, with each review retrieved.
+        on_error : callable
+            Called, in the calling thread, with the identifier of each review
+            that could not be retrieved.
+        predicate : callable, optional
+            Called with each review, before its patchsets are retrieved, where
+            patchsets is the list of patchset identifiers. The patchsets are
+            retrieved only if the predicate returns True, otherwise the review
+            is skipped.
+        """
+        self._run(self._crawl, ids, on_review, on_error, predicate)
+
+    def get_ids(self, year, interval='month', progress=None):
+        """Retrieve the identifiers of code reviews created in a year.
+
+        The year is split into windows of creation dates that are searched
+        concurrently. The identifiers found in each window are recorded in a
+        progress file as soon as the search of the window completes so that an
+        interrupted retrieval may be resumed.
+
+        Parameters
+        ----------
+        year : int
+            Year in which the code reviews were created.
+        interval : str, optional
+            Length of a window. One of 'month', 'week', or 'day'.
+        progress : str, optional
+            Path to a JSON file in which the identifiers found in each window
+            are recorded. Windows recorded in an existing file are skipped.
+
+        Returns
+        -------
+        (ids, failed) : tuple
+            A sorted list of unique identifiers of code reviews found and the
+            number of windows whose search failed. The identifiers are
+            incomplete unless the number of windows that failed is zero.
+        """
+        windows = get_windows(year, interval)
+        found = dict()
+        if progress is not None and os.path.exists(progress):
+            with open(progress, 'r') as file:
+                found = json.load(file)['windows']
+        pending = [window for window in windows if window[0] not in found]
+        debug('{} of {} windows pending'.format(len(pending), len(windows)))
+
+        failed = self._run(self._search_windows, pending, found, progress)
+
+        ids = set()
+        for _ids in found.values():
+            ids.update(_ids)
+        return (sorted(ids), failed)
+
+    # Private Members
+
+    def _run(self, coroutine, *args):
+        """Run a coroutine function in a new event loop."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        executor = concurrent.futures.ThreadPoolExecutor(self.concurrency)
+        loop.set_default_executor(executor)
+        try:
+            return loop.run_until_complete(coroutine(loop, *args))
+        finally:
+            loop.close()
+            asyncio.set_event_loop(None)
+            executor.shutdown(wait=True)
+
+    async def _crawl(self, loop, ids, on_review, on_error, predicate):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Bound the number of reviews in progress so that a large chunk of
+        # identifiers does not create as many tasks at once
+        pending = set()
+        for rid in ids:
+            if len(pending) >= self.concurrency:
+                (done, pending) = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                self._dispatch(done, on_review, on_error)
+            pending.add(loop.create_task(
+                    self._get_review(loop, semaphore, rid, predicate)
+                ))
+        if pending:
+            (done, _) = await asyncio.wait(pending)
+            self._dispatch(done, on_review, on_error)
+
+    async def _search_windows(self, loop, windows, found, progress):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+                loop.create_task(self._search(loop, semaphore, window))
+                for window in windows
+            ]
+        failed = 0
+        for task in asyncio.as_completed(tasks):
+            (window, ids) = await task
+            if ids is None:
+                error('Search of {} to {} failed'.format(*window))
+                failed += 1
+                continue
+            debug('{} to {}: {:,} identifiers'.format(
+                    window[0], window[1], len(ids)
+                ))
+            found[window[0]] = ids
+            if progress is not None:
+                _save_progress(progress, found)
+        return failed
+
+    async def _search(self, loop, semaphore, window):
+        """
+        Return a tuple (window, ids), where ids is the list of identifiers of
+        code reviews created in the window or None if a page of search results
+        could not be retrieved.
+        """
+        url = self.base_url + SEARCH_PATH
+        parameters = {
+                'format': 'json', 'limit': SEARCH_LIMIT, 'keys_only': True,
+                'cursor': '', 'created_after': window[0],
+                'created_before': window[1]
+            }
+        ids = list()
+        while True:
+            page = await self._get(loop, semaphore, url, dict(parameters))
+            if page is None:
+                return (window, None)
+            ids.extend(page['results'])
+            cursor = page.get('cursor') or ''
+            if len(page['results']) < SEARCH_LIMIT or \
+                    cursor in ('', parameters['cursor']):
+                break
+            parameters['cursor'] = cursor
+        return (window, ids)
+
+    def _dispatch(self, tasks, on_review, on_error):
+        for task in tasks:
+            (rid, review) = task.result()
+            if review is False:
+                on_error(rid)
+            elif review is not None:
+                on_review(review)
+
+    async def _get_review(self, loop, semaphore, rid, predicate=None):
+        """
+        Return a tuple (rid, review), where review is the review with its
+        patchsets, None if the review has no patchsets or does not satisfy
+        the predicate, or False on error.
+        """
+        url = self.base_url + REVIEW_PATH.format(rid=rid)
+        review = await self._get(loop, semaphore, url, {'messages': True})
+        if review is None:
+            return (rid, False)
+
+        psids = review['patchsets']
+        if len(psids) == 0:
+            return (rid, None)
+        if predicate is not None and not predicate(review):
+            return (rid, None)
+        patchsets = await asyncio.gather(*[
+                self._get(
+                    loop, semaphore,
+                    self.base_url + PATCHSET_PATH.format(rid=rid, psid=psid),
+                    {'comments': True}
+                )
+                for psid in psids
+            ])
+        if any(patchset is None for patchset in patchsets):
+            return (rid, False)
+
+        review['patchsets'] = dict(zip(psids, patchsets))
+        return (rid, review)
+
+    async def _get(self, loop, semaphore, url, parameters):
+        """
+        Return the JSON at the URL or None if it could not be retrieved after
+        all retries.
+        """
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                delay = self.backoff * (2 ** (attempt - 1))
+                await asyncio.sleep(delay * (1 + random.random()))
+            delay = self.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                try:
+                    (status, json) = await loop.run_in_executor(
+                            None, self._get_json, url, parameters
+                        )
+                except requests.exceptions.RequestException as exception:
+                    debug('{} ({}/{})\n{}'.format(
+                            url, attempt + 1, self.retries + 1, exception
+                        ))
+                    continue
+            if status == requests.codes.ok:
+                debug(url)
+                return json
+            if status not in RETRY_STATUSES:
+                error('[HTTP {}] {}'.format(status, url))
+                return None
+            debug('[HTTP {}] {} ({}/{})'.format(
+                    status, url, attempt + 1, self.retries + 1
+                ))
+        error('{} failed after {} attempts'.format(url, self.retries + 1))
+        return None
+
+    def _get_json(self, url, parameters):
+        """Issue a GET request using a session local to the calling thread."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        response = session.get(
+                url, params=parameters, allow_redirects=False,
+                timeout=self.timeout
+            )
+        json = response.json() if response.status_code == requests.codes.ok \
+            else None
+        return (response.status_code, json)
+
+
+def get_windows(year, interval='month'):
+    """Split a year into windows of creation dates.
+
+    Parameters
+    ----------
+    year : int
+        Year to split.
+    interval : str, optional
+        Length of a window. One of 'month', 'week', or 'day'. The last week of
+        the year is cut short at the end of the year.
+
+    Returns
+    -------
+    windows : list
+        List of tuples of the form (created_after, created_before) where the
+        end of a window is the beginning of the next.
+    """
+    if interval not in INTERVALS:
+        raise ValueError('Argument interval must be one of {}'.format(
+                INTERVALS
+            ))
+    (begin, end) = (datetime(year, 1, 1), datetime(year + 1, 1, 1))
+    if interval == 'month':
+        starts = [datetime(year, month, 1) for month in range(1, 13)]
+    else:
+        step = timedelta(days=7 if interval == 'week' else 1)
+        starts = list()
+        while begin < end:
+            starts.append(begin)
+            begin += step
+    ends = starts[1:] + [end]
+    return [
+            (start.strftime(DATETIME_FORMAT), end.strftime(DATETIME_FORMAT))
+            for (start, end) in zip(starts, ends)
+        ]
+
+
+def _save_progress(path, found):
+    """Atomically save the identifiers found in each window to a file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    (descriptor, temppath) = tempfile.mkstemp(dir=directory)
+    with os.fdopen(descriptor, 'w') as file:
+        json.dump({'windows': found}, file)
+    os.replace(temppath, path)
@@ -0,0 +1,194 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import json
+import os
+
+from django.db import connection, transaction
+
+from app.lib.files import KEYS
+
+# Sentences of the comments and messages posted in a set of reviews
+SENTENCES_QUERY = '''
+    SELECT cs.sentence_id
+    FROM comment_sentences cs
+      JOIN comment c ON c.id = cs.comment_id
+      JOIN patch p ON p._id = c.patch_id
+      JOIN patchset ps ON ps._id = p.patchset_id
+    WHERE ps.review_id = ANY(%(ids)s)
+    UNION
+    SELECT ms.sentence_id
+    FROM message_sentences ms
+      JOIN message m ON m.id = ms.message_id
+    WHERE m.review_id = ANY(%(ids)s);
+'''
+
+# Statements, in order, that delete the rows derived from a set of reviews
+DELETE_REVIEWS = [
+    'DELETE FROM token WHERE sentence_id = ANY(%(sentences)s);',
+    'DELETE FROM comment_sentences WHERE sentence_id = ANY(%(sentences)s);',
+    'DELETE FROM message_sentences WHERE sentence_id = ANY(%(sentences)s);',
+    'DELETE FROM sentence WHERE id = ANY(%(sentences)s);',
+    '''
+    DELETE FROM comment c
+    USING patch p, patchset ps
+    WHERE p._id = c.patch_id AND ps._id = p.patchset_id
+      AND ps.review_id = ANY(%(ids)s);
+    ''',
+    '''
+    DELETE FROM patch p
+    USING patchset ps
+    WHERE ps._id = p.patchset_id AND ps.review_id = ANY(%(ids)s);
+    ''',
+    'DELETE FROM patchset WHERE review_id = ANY(%(ids)s);',
+    'DELETE FROM message WHERE review_id = ANY(%(ids)s);',
+    'DELETE FROM review_bug WHERE review_id = ANY(%(ids)s);',
+    'DELETE FROM review WHERE id = ANY(%(ids)s);',
+]
+
+
+class Changed(object):
+    """Predicate that is True for a bug or review that changed.
+
+    A bug or review changed if it was not saved earlier or if its fingerprint
+    differs from the fingerprint of the bug or review saved earlier.
+    """
+    def __init__(self, files, switch, fingerprints):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        files : app.lib.files.Files
+            Files object used to compute fingerprints.
+        switch : str
+            'bugs' or 'reviews'.
+        fingerprints : dict
+            Fingerprints of the bugs or reviews saved earlier.
+        """
+        self.files = files
+        self.switch = switch
+        self.fingerprints = fingerprints
+
+    def __call__(self, item):
+        fingerprint = self.files.get_fingerprint(item, self.switch)
+        return self.fingerprints.get(item[KEYS[self.switch]]) != fingerprint
+
+
+def delete_bugs(ids):
+    """Delete the associations between vulnerabilities and bugs.
+
+    Bugs are updated in place when a delta is applied, so only the
+    associations, which are created again, are deleted.
+
+    Parameters
+    ----------
+    ids : list
+        Unique identifiers of the bugs.
+
+    Returns
+    -------
+    count : int
+        Number of associations deleted.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+                'DELETE FROM vulnerability_bug WHERE bug_id = ANY(%s);',
+                [list(ids)]
+            )
+        return cursor.rowcount
+
+
+def delete_reviews(ids):
+    """Delete reviews and all rows derived from them.
+
+    The patchsets, patches, comments, messages, sentences, tokens, and
+    associations with bugs of the reviews are deleted along with the reviews
+    in a single transaction.
+
+    Parameters
+    ----------
+    ids : list
+        Unique identifiers of the reviews.
+
+    Returns
+    -------
+    count : int
+        Number of reviews deleted.
+    """
+    parameters = {'ids': list(ids)}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(SENTENCES_QUERY, parameters)
+        parameters['sentences'] = [row[0] for row in cursor.fetchall()]
+        for statement in DELETE_REVIEWS:
+            cursor.execute(statement, parameters)
+        return cursor.rowcount
+
+
+def get_ids(path):
+    """Return the switch of a delta and the identifiers in it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory containing the delta.
+
+    Returns
+    -------
+    (switch, ids) : tuple
+        'bugs' or 'reviews' and the list of unique identifiers of the bugs or
+        reviews in the delta.
+    """
+    with open(os.path.join(path, 'manifest.json'), 'r') as file:
+        manifest = json.load(file)
+    ids = list()
+    for chunk in manifest['chunks']:
+        ids.extend(chunk['ids'])
+    return (manifest['switch'], ids)
+
+
+def refresh(files, year, switch, chunksize, crawl):
+    """Retrieve the bugs or reviews that changed since they were saved.
+
+    The bugs or reviews that changed, or that were not saved earlier, are
+    written to a new delta and their fingerprints are updated.
+
+    Parameters
+    ----------
+    files : app.lib.files.Files
+        Files object used to read and write bugs or reviews.
+    year : int
+        Year in which the bugs were published or the code reviews were
+        created.
+    switch : str
+        'bugs' or 'reviews'.
+    chunksize : int
+        Maximum number of bugs or reviews per chunk file of the delta.
+    crawl : callable
+        Called with the list of identifiers to retrieve, a callable to call
+        with each bug or review retrieved, a callable to call with each
+        identifier that could not be retrieved, and a predicate that is True
+        for a bug or review that changed.
+
+    Returns
+    -------
+    writer : app.lib.files.ChunkWriter
+        Writer of the delta, which is removed if it is empty.
+    """
+    fingerprints = files.get_fingerprints(year, switch)
+    changed = Changed(files, switch, dict(fingerprints))
+    ids = [int(id) for id in files.get_ids(year, switch)]
+
+    def write(item):
+        writer.write(item)
+        fingerprints[item[KEYS[switch]]] = files.get_fingerprint(item, switch)
+
+    with files.get_delta_writer(year, switch, chunksize) as writer:
+        try:
+            crawl(ids, write, writer.error, changed)
+        finally:
+            files.save_fingerprints(year, switch, fingerprints)
+    if not os.listdir(writer.directory):
+        os.rmdir(writer.directory)
+    return writer
@@ -3,13 +3,27 @@
 @AUTHOR: meyersbs
 """
 
+import collections
 import csv
 import glob
 import json
 import os
+import re
+import shutil
+import tempfile
+
+from datetime import datetime
 
 from app.lib import helpers
 
+# Attribute that uniquely identifies a bug or a review
+KEYS = {'bugs': 'id', 'reviews': 'issue'}
+DELTA_FORMAT = '%Y%m%d%H%M%S%f'
+# Extension of chunk files compressed using each of the compressions
+COMPRESSIONS = {'gzip': '.gz', 'lzma': '.xz'}
+# Extensions of chunk files in the order in which they are preferred
+_SUFFIXES = [''] + sorted(COMPRESSIONS.values())
+
 
 class Files(object):
     """
@@ -24,6 +38,7 @@ class Files(object):
         self.reviews_path = settings.REVIEWS_PATH
         self.vulnerabilities_path = settings.VULNERABILITIES_PATH
         self.bots = settings.BOTS
+        self.compression = settings.ARCHIVE_COMPRESSION
 
     def get_bug(self, id, year=None):
         """Retrieve a bug identified by the unique identifier specified.
@@ -41,11 +56,9 @@ class Files(object):
         """
         year = self.get_year(id, switch='bugs') if year is None else year
         directory = self.get_bugs_path(year)
-        for path in self._get_files(directory, pattern='bugs.*.json'):
-            bugs = helpers.load_json(path)
-            for bug in bugs:
-                if id == bug['id']:
-                    return bug
+        for bug in self._load(directory, switch='bugs'):
+            if id == bug['id']:
+                return bug
         raise Exception('No bug identified by {}'.format(id))
 
     def get_bugs(self, year):
@@ -63,9 +76,8 @@ class Files(object):
             returned without blocking the caller.
         """
         directory = self.get_bugs_path(year)
-        for path in self._get_files(directory, pattern='bugs.*.json'):
-            for bug in helpers.load_json(path):
-                yield bug
+        for bug in self._load(directory, switch='bugs'):
+            yield bug
 
     def get_bugs_path(self, year):
         """
@@ -120,11 +132,9 @@ class Files(object):
         """
         year = self.get_year(id, switch='reviews') if year is None else year
         directory = self.get_reviews_path(year)
-        for path in self._get_files(directory, pattern='reviews.*.json'):
-            reviews = helpers.load_json(path)
-            for review in reviews:
-                if id == review['issue']:
-                    return review
+        for review in self._load(directory, switch='reviews'):
+            if id == review['issue']:
+                return review
         raise Exception('No code review identified by {}'.format(id))
 
     def get_reviews(self, year):
@@ -132,9 +142,8 @@ class Files(object):
         Yield the reviews associated with the specified year.
         """
         directory = self.get_reviews_path(year)
-        for path in self._get_files(directory, pattern='reviews.*.json'):
-            for review in helpers.load_json(path):
-                yield review
+        for review in self._load(directory, switch='reviews'):
+            yield review
 
     def get_reviews_path(self, year):
         """
@@ -170,6 +179,220 @@ class Files(object):
                 return os.path.basename(path).replace('.csv', '')
         raise Exception('No code review or bug identified by {}'.format(id))
 
+    def get_delta(self, path):
+        """Yield the bugs or reviews in a delta written by a refresh.
+
+        Parameters
+        ----------
+        path : str
+            Path to the directory containing the delta.
+
+        Returns
+        -------
+        items : generator
+            Iterator-like object that allows iteration over the bugs or
+            reviews in the delta.
+        """
+        with open(os.path.join(path, 'manifest.json'), 'r') as file:
+            switch = json.load(file)['switch']
+        for (path, lines) in self._get_chunks(path, switch):
+            for item in helpers.load_jsonl(path):
+                yield item
+
+    def get_delta_writer(self, year, switch, chunksize):
+        """Return a writer that streams refreshed bugs or reviews to a delta.
+
+        A delta is a directory, named after the time at which it was created,
+        in the deltas directory of the path associated with the year. Bugs and
+        reviews in a delta supersede those saved earlier.
+
+        Parameters
+        ----------
+        year : int
+            Year in which the bugs were published or the code reviews were
+            created.
+        switch : str
+            'bugs' or 'reviews'.
+        chunksize : int
+            Maximum number of bugs or reviews per chunk file.
+
+        Returns
+        -------
+        writer : ChunkWriter
+            Writer to which refreshed bugs or reviews may be written.
+        """
+        directory = os.path.join(
+                self._get_path(year, switch), 'deltas',
+                datetime.now().strftime(DELTA_FORMAT)
+            )
+        return ChunkWriter(
+                directory, switch, KEYS[switch], chunksize, self.compression
+            )
+
+    def get_fingerprint(self, item, switch):
+        """Return a fingerprint of a bug or a review.
+
+        The fingerprint is composed of metadata that changes when the bug or
+        review changes and that is available without retrieving the comments
+        on a bug or the patchsets of a review, so that it may be compared to
+        the fingerprint of the bug or review saved earlier.
+
+        Parameters
+        ----------
+        item : dict
+            Bug or review. The patchsets of a review may be a list of
+            identifiers or a dictionary of patchsets.
+        switch : str
+            'bugs' or 'reviews'.
+
+        Returns
+        -------
+        fingerprint : list
+            JSON-serializable fingerprint of the bug or review.
+        """
+        if switch == 'bugs':
+            return [item.get('updated'), item.get('status'), item.get('state')]
+        elif switch == 'reviews':
+            return [
+                    item.get('modified'), len(item.get('messages', list())),
+                    sorted(int(id) for id in item['patchsets']),
+                    item.get('closed')
+                ]
+        raise ValueError('Argument switch must be \'bugs\' or \'reviews\'')
+
+    def get_fingerprints(self, year, switch):
+        """
+        Return a dictionary of fingerprints of the bugs or reviews saved for
+        the specified year. The fingerprints are computed from the bugs or
+        reviews, and saved, if they were not saved earlier.
+        """
+        path = os.path.join(self._get_path(year, switch), 'fingerprints.json')
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                return {int(k): v for (k, v) in json.load(file).items()}
+        directory = self._get_path(year, switch)
+        fingerprints = {
+                item[KEYS[switch]]: self.get_fingerprint(item, switch)
+                for item in self._load(directory, switch)
+            }
+        self.save_fingerprints(year, switch, fingerprints)
+        return fingerprints
+
+    def get_size(self, year, switch):
+        """
+        Return the total size, in bytes, of the chunk files, including those
+        of the deltas, of bugs or reviews of the specified year.
+        """
+        directory = self._get_path(year, switch)
+        directories = [directory] + self._get_files(directory, 'deltas/*')
+        return sum(
+                os.path.getsize(path)
+                for directory in directories
+                for (path, _) in self._get_chunks(directory, switch)
+            )
+
+    def get_writer(self, year, switch, chunksize):
+        """Return a writer that streams bugs or reviews to chunk files.
+
+        Parameters
+        ----------
+        year : int
+            Year in which the bugs were published or the code reviews were
+            created.
+        switch : str
+            'bugs' or 'reviews'.
+        chunksize : int
+            Maximum number of bugs or reviews per chunk file.
+
+        Returns
+        -------
+        writer : ChunkWriter
+            Writer to which bugs or reviews may be written as they are
+            retrieved.
+        """
+        return ChunkWriter(
+                self._get_path(year, switch), switch, KEYS[switch], chunksize,
+                self.compression
+            )
+
+    def recompress(self, year, switch, compression):
+        """Compress the chunk files of bugs or reviews using a compression.
+
+        The chunk files of the year, including those of the deltas, are
+        rewritten, one at a time, using the compression. Each chunk file is
+        streamed from the original to a temporary file that is atomically
+        renamed to the new name of the chunk file before the original is
+        removed. An original left behind by a recompress that was interrupted
+        between the two is removed by the next recompress. The names of the
+        chunk files recorded in a manifest are updated.
+
+        Parameters
+        ----------
+        year : int
+            Year in which the bugs were published or the code reviews were
+            created.
+        switch : str
+            'bugs' or 'reviews'.
+        compression : str
+            'gzip', 'lzma', or None to decompress the chunk files.
+
+        Returns
+        -------
+        sizes : list
+            List of tuples of the form (path, before, after) where path is
+            the path to the rewritten chunk file and before and after are its
+            sizes, in bytes, before and after it was rewritten.
+        """
+        suffix = COMPRESSIONS[compression] if compression is not None else ''
+        directory = self._get_path(year, switch)
+        directories = [directory] + sorted(
+                self._get_files(directory, 'deltas/*')
+            )
+        sizes = list()
+        for directory in directories:
+            renamed = dict()
+            for (path, _) in self._get_chunks(directory, switch):
+                base = _get_base(path)
+                if base + suffix != path:
+                    (descriptor, temppath) = tempfile.mkstemp(
+                            dir=directory, suffix=suffix
+                        )
+                    os.close(descriptor)
+                    with helpers.open_file(path, 'r') as source, \
+                            helpers.open_file(temppath, 'w') as target:
+                        shutil.copyfileobj(source, target)
+                    os.chmod(temppath, 0o644)
+                    os.replace(temppath, base + suffix)
+                    sizes.append((
+                            base + suffix, os.path.getsize(path),
+                            os.path.getsize(base + suffix)
+                        ))
+                for sibling in [base + s for s in _SUFFIXES]:
+                    if sibling != base + suffix and os.path.exists(sibling):
+                        os.remove(sibling)
+                        renamed[os.path.basename(sibling)] = \
+                            os.path.basename(base + suffix)
+            manifest = os.path.join(directory, 'manifest.json')
+            if renamed and os.path.exists(manifest):
+                with open(manifest, 'r') as file:
+                    contents = json.load(file)
+                for chunk in contents['chunks']:
+                    chunk['file'] = renamed.get(chunk['file'], chunk['file'])
+                _dump(contents, manifest)
+        return sizes
+
+    def save_fingerprints(self, year, switch, fingerprints):
+        """
+        Atomically save the fingerprints of the bugs or reviews saved for the
+        specified year.
+        """
+        directory = self._get_path(year, switch)
+        if not os.path.exists(directory):
+            os.makedirs(directory, mode=0o755)
+        path = os.path.join(directory, 'fingerprints.json')
+        _dump(fingerprints, path)
+        return path
+
     def save_ids(self, year, ids, switch):
         """
         Save the specified IDs to a file in the path associated with the
@@ -181,6 +404,26 @@ class Files(object):
             writer.writerows([(id,) for id in ids])
         return path
 
+    def merge_ids(self, year, ids, switch):
+        """
+        Merge the specified IDs with those, if any, in the file in the path
+        associated with the specified year. The IDs are deduplicated, sorted,
+        and atomically written to the file.
+        """
+        path = os.path.join(self.get_ids_path(switch), '{}.csv'.format(year))
+        merged = set(int(id) for id in ids)
+        if os.path.exists(path):
+            merged.update(int(id) for id in self.get_ids(year, switch))
+        (descriptor, temppath) = tempfile.mkstemp(
+                dir=self.get_ids_path(switch)
+            )
+        with os.fdopen(descriptor, 'w') as file:
+            writer = csv.writer(file)
+            writer.writerows([(id,) for id in sorted(merged)])
+        os.chmod(temppath, 0o644)
+        os.replace(temppath, path)
+        return path
+
     def save_bugs(self, year, chunk, bugs, errors=None):
         """Save bugs to a JSON file and errors (if any) to a CSV file.
 
@@ -340,6 +583,50 @@ class Files(object):
             ]
         return files
 
+    def _get_path(self, year, switch):
+        if switch == 'bugs':
+            return self.get_bugs_path(year)
+        elif switch == 'reviews':
+            return self.get_reviews_path(year)
+        raise ValueError('Argument switch must be \'bugs\' or \'reviews\'')
+
+    def _get_chunks(self, directory, switch):
+        """
+        Return a list of tuples of the form (path, lines) where path is the
+        path to a JSON (lines is False) or JSON Lines (lines is True) chunk
+        file of bugs or reviews, which may be compressed, in the specified
+        directory. A chunk file is listed once even if a recompress that was
+        interrupted left it behind along with its recompressed copy.
+        """
+        chunks = collections.OrderedDict()
+        for suffix in _SUFFIXES:
+            for (extension, lines) in [('json', False), ('jsonl', True)]:
+                pattern = '{}.*.{}{}'.format(switch, extension, suffix)
+                for path in self._get_files(directory, pattern):
+                    chunks.setdefault(_get_base(path), (path, lines))
+        return list(chunks.values())
+
+    def _load(self, directory, switch):
+        """
+        Yield the bugs or reviews in the JSON and JSON Lines chunk files in
+        the specified directory. A bug or review in a delta in the directory
+        supersedes the one in the chunk files. Deltas, which are expected to
+        be small, are read into memory.
+        """
+        key = KEYS[switch]
+        deltas = dict()
+        for path in sorted(self._get_files(directory, 'deltas/*')):
+            if os.path.exists(os.path.join(path, 'manifest.json')):
+                for item in self.get_delta(path):
+                    deltas[item[key]] = item
+
+        for (path, lines) in self._get_chunks(directory, switch):
+            load = helpers.load_jsonl if lines else helpers.load_json
+            for item in load(path):
+                yield deltas.pop(item[key], item)
+        for item in deltas.values():
+            yield item
+
     def _parse(self, commit):
         """
 
@@ -356,7 +643,9 @@ class Files(object):
             os.mkdir(directory, mode=0o755)
 
         path = os.path.join(directory, '{}.{}.json'.format(switch, chunk))
-        with open(path, 'w') as file:
+        if self.compression is not None:
+            path += COMPRESSIONS[self.compression]
+        with helpers.open_file(path, 'w') as file:
             json.dump(items, file)
 
         if errors:
@@ -365,3 +654,235 @@ class Files(object):
                 writer = csv.writer(file)
                 writer.writerows([(error,) for error in errors])
         return path
+
+
+class ChunkWriter(object):
+    """Stream bugs or reviews to JSON Lines chunk files as they arrive.
+
+    Every item is appended, as a line, to a partial chunk file that is flushed
+    after each write so that at most the item being written is lost if the
+    process crashes. A partial chunk file is atomically renamed to its final
+    name when it is full (or the writer is closed), after which it is recorded
+    in a manifest along with the identifiers of the items in it. Identifiers
+    of items that could not be retrieved are appended to errors.csv.
+
+    Partial chunk files left behind by a crash are recovered, and the
+    identifiers of items already saved are available in saved, when the
+    writer is created so that the retrieval may be resumed.
+
+    When a compression is specified, partial chunk files are written
+    uncompressed, so that they remain recoverable, and compressed when they
+    are finalized.
+    """
+    def __init__(self, directory, switch, key, chunksize, compression=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        directory : str
+            Path to the directory in which the chunk files are written.
+        switch : str
+            Prefix of the names of the chunk files, e.g. 'reviews'.
+        key : str
+            Name of the attribute that uniquely identifies an item.
+        chunksize : int
+            Maximum number of items per chunk file.
+        compression : str, optional
+            'gzip' or 'lzma' to compress the chunk files. Default is None.
+        """
+        if chunksize <= 0:
+            raise ValueError('Argument chunksize must be positive')
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError('Argument compression must be one of {}'.format(
+                    sorted(COMPRESSIONS)
+                ))
+        self.directory = directory
+        self.switch = switch
+        self.key = key
+        self.chunksize = chunksize
+        self.compression = compression
+        self.count = 0
+        self.errors = 0
+        self.saved = set()
+
+        self._chunks = list()
+        self._chunk = None
+        self._file = None
+        self._ids = list()
+
+        if not os.path.exists(directory):
+            os.makedirs(directory, mode=0o755)
+        self._recover()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def manifest(self):
+        """Path to the manifest of chunk files written to the directory."""
+        return os.path.join(self.directory, 'manifest.json')
+
+    def close(self):
+        """Finalize the partial chunk file, if any."""
+        if self._file is not None:
+            self._rotate()
+
+    def error(self, id):
+        """Record the identifier of an item that could not be retrieved."""
+        path = os.path.join(self.directory, 'errors.csv')
+        with open(path, 'a') as file:
+            writer = csv.writer(file)
+            writer.writerow((id,))
+        self.errors += 1
+
+    def write(self, item):
+        """Append an item to the current chunk file."""
+        if self._file is None:
+            self._file = open(self._get_path(self._chunk, partial=True), 'w')
+        self._file.write(json.dumps(item))
+        self._file.write('\n')
+        self._file.flush()
+        self._ids.append(item[self.key])
+        self.saved.add(item[self.key])
+        self.count += 1
+        if len(self._ids) >= self.chunksize:
+            self._rotate()
+
+    # Private Members
+
+    def _get_path(self, chunk, partial=False):
+        path = os.path.join(
+                self.directory, '{}.{}.jsonl'.format(self.switch, chunk)
+            )
+        if partial:
+            return path + '.part'
+        if self.compression is not None:
+            return path + COMPRESSIONS[self.compression]
+        return path
+
+    def _recover(self):
+        """
+        Load the manifest and finalize any partial chunk files left behind by
+        a writer that was not closed.
+        """
+        if os.path.exists(self.manifest):
+            with open(self.manifest, 'r') as file:
+                self._chunks = json.load(file)['chunks']
+        for chunk in self._chunks:
+            self.saved.update(chunk['ids'])
+
+        pattern = re.compile(
+                r'^{}\.(\d+)\.(json|jsonl)(\.gz|\.xz|\.part)?$'
+                .format(self.switch)
+            )
+        recorded = set(chunk['file'] for chunk in self._chunks)
+        chunks = [0]
+        paths = set()
+        for name in sorted(os.listdir(self.directory), key=_by_part):
+            match = pattern.match(name)
+            if match is None:
+                continue
+            chunks.append(int(match.group(1)))
+            path = os.path.join(self.directory, name)
+            paths.add(path)
+            if name.endswith('.part'):
+                self._chunk = int(match.group(1))
+                if self._get_path(self._chunk) in paths:
+                    # Compressed but not removed before a crash
+                    os.remove(path)
+                    continue
+                self._finalize(path)
+                continue
+            # A recompress that was interrupted leaves a chunk file behind
+            # along with its recompressed copy, only one of which is recorded
+            siblings = set(
+                    os.path.basename(_get_base(path)) + suffix
+                    for suffix in _SUFFIXES
+                )
+            if match.group(2) == 'jsonl' and recorded.isdisjoint(siblings):
+                # Renamed but not recorded in the manifest before a crash
+                ids = [item[self.key] for item in helpers.load_jsonl(path)]
+                self._chunks.append(
+                        {'file': name, 'count': len(ids), 'ids': ids}
+                    )
+                recorded.add(name)
+                self.saved.update(ids)
+                self._save_manifest()
+        self._chunk = max(chunks) + 1
+
+    def _finalize(self, path):
+        """Keep the complete lines of a partial chunk file and rotate it."""
+        with open(path, 'r') as file:
+            lines = file.readlines()
+        self._file = open(path, 'w')
+        for line in lines:
+            if not line.endswith('\n'):
+                break
+            item = json.loads(line)
+            self._file.write(line)
+            self._ids.append(item[self.key])
+            self.saved.add(item[self.key])
+        self._rotate()
+
+    def _rotate(self):
+        """
+        Atomically rename the partial chunk file to its final name and record
+        it in the manifest. An empty partial chunk file is discarded.
+        """
+        (file, self._file) = (self._file, None)
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+
+        path = self._get_path(self._chunk, partial=True)
+        if self._ids:
+            if self.compression is not None:
+                (descriptor, temppath) = tempfile.mkstemp(
+                        dir=self.directory,
+                        suffix=COMPRESSIONS[self.compression]
+                    )
+                os.close(descriptor)
+                with open(path, 'r') as source, \
+                        helpers.open_file(temppath, 'w') as target:
+                    shutil.copyfileobj(source, target)
+                os.chmod(temppath, 0o644)
+                os.replace(temppath, self._get_path(self._chunk))
+                os.remove(path)
+            else:
+                os.replace(path, self._get_path(self._chunk))
+            self._chunks.append({
+                    'file': os.path.basename(self._get_path(self._chunk)),
+                    'count': len(self._ids), 'ids': self._ids
+                })
+            self._save_manifest()
+        else:
+            os.remove(path)
+        self._chunk += 1
+        self._ids = list()
+
+    def _save_manifest(self):
+        _dump({'switch': self.switch, 'chunks': self._chunks}, self.manifest)
+
+
+def _by_part(name):
+    """Sort key that orders partial chunk files after all other files."""
+    return (name.endswith('.part'), name)
+
+
+def _get_base(path):
+    """Return the path to a chunk file without its compression extension."""
+    (base, extension) = os.path.splitext(path)
+    return base if extension in COMPRESSIONS.values() else path
+
+
+def _dump(obj, path):
+    """Atomically write an object to a JSON file."""
+    (descriptor, temppath) = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(descriptor, 'w') as file:
+        json.dump(obj, file)
+    os.chmod(temppath, 0o644)
+    os.replace(temppath, path)
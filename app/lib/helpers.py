@@ -5,7 +5,9 @@
 
 import codecs
 import csv
+import gzip
 import json
+import lzma
 import os
 import random
 import re
@@ -13,17 +15,16 @@ import time
 import unicodedata
 
 from collections import OrderedDict
-from splat.complexity import levenshtein_distance
 from splat.corpora import *
 from splat.Util import count_pronouns
 
-import difflib
 import pandas
 import requests
 
 import app.queryStrings as qs
 
 from app.lib import patch, logger
+from app.lib.nlp import syllables
 
 # Match the line of header that marks the beginning of quoted text.
 # E.g., On 2008/01/01 00:00:01, Raymond Reddington wrote:
@@ -71,6 +72,9 @@ DATE_TIME_RE = re.compile(
 # E.g. Raymond Reddington
 AUTHOR_RE = re.compile(', (.*) wrote:')
 
+# Number of characters of the quote of a comment used to fingerprint it
+QUOTE_PREFIX = 16
+
 
 TOKENS = qs.query_all('token', ids=False)
 PRONOUNS_1 = ['I', 'ME', 'MYSELF', 'MY', 'MINE', 'WE', 'US', 'OURSELVES', 'OUR',
@@ -81,35 +85,11 @@ PRONOUNS_3 = ['SHE', 'ITSELF', 'HER', 'HE', 'ITS', 'HIM', 'IT', 'HIMSELF',
               'THEIRS']
 
 def get_syllable_count(tokens):
-    total = 0
-    pron = []
-    for token in tokens:
-        word = token.strip("\n")
-        try:
-            pron = CMUDICT[word.lower()]
-        except KeyError:
-            if re.search(r'[aeiouy]', word.lower()) is not None:
-                closest_matches = difflib.get_close_matches(word.lower(), CMUDICT.keys(), 5)
-                levs = {}
-                for match in closest_matches:
-                    l = levenshtein_distance(match, word.lower())
-                    if l not in levs.keys(): levs[l] = []
-                    levs[l].append(match)
-                try:
-                    min_lev = min(levs.keys())
-                    closest = levs[min_lev][0]
-                    pron = CMUDICT[closest]
-                except:
-                    pron = CMUDICT['to']
-            else:
-                pron = CMUDICT['to']
-
-        temp_count = max([len(list(y for y in x if y[-1].isdigit())) for x in pron])
-
-        if len(re.findall(r'[aeiouy]', word.lower())) == 1 and len(pron) > 1: total += 1
-        else: total += temp_count
-
-    return total
+    """
+    Return the number of syllables in the specified tokens. See
+    app.lib.nlp.syllables.SyllableCounter.
+    """
+    return syllables.get_counter().total(tokens)
 
 def get_type_token_ratio(tokens):
     toks = [ t[0] for t in tokens ]
@@ -172,29 +152,15 @@ def get_parent(raw, comments):
     """
     match = RESPONSE_HEAD_RE.match(raw)
     if match is not None:
-        # Extract date and time and author from comment reponse header
-        header = match.group(0)
-
-        match = DATE_TIME_RE.search(header)
-        if match is None:
+        timestamp = _get_timestamp(match.group(0))
+        if timestamp is None:
             logger.error('NONE: ' + raw)
             return None
-        components = match.groupdict()
-        timestamp = '{date} {time}'.format(
-                date=components['date'].replace('/', '-'),
-                time=components['time']
-            )
-
-        match = AUTHOR_RE.search(header)
-        author = match.group(1)
 
         parents = list()
         for comment in comments:
             # Compare timestamps without milliseconds
-            ind = len(comment.posted)
-            if '.' in comment.posted:
-                ind = comment.posted.index('.')
-            if comment.posted[:ind] == timestamp:
+            if _truncate_posted(comment.posted) == timestamp:
                 parents.append(comment)
 
         if len(parents) == 1:
@@ -203,12 +169,112 @@ def get_parent(raw, comments):
         else:
             # Multiple parents found by timestamp matching. Use full text.
             for comment in comments:
-                text = '> {}'.format(comment.text.replace(r'\n', r'\n> '))
-                if text in raw:
+                if _get_quote(comment.text) in raw:
                     return comment
     return None if len(comments) == 0 else comments[-1]
 
 
+class ThreadIndex(object):
+    """Index of the comments posted on the lines of a patch.
+
+    The index finds the same parent as get_parent does when given the comments
+    previously posted on the same line, but without scanning those comments.
+    The comments are indexed by line and by the timestamp, without
+    milliseconds, at which they were posted. To disambiguate comments posted
+    at the same time, they are also indexed by a fingerprint, the first
+    QUOTE_PREFIX characters, of the quote that a response to them would
+    contain. A quote can only start where the response has '> ' so only the
+    comments whose fingerprint is at one of those positions are compared with
+    the response.
+
+    The author in the response header is not used as a key because the header
+    has the name of the author while a comment has the email address.
+    """
+    __slots__ = ('_lines', '_timestamps', '_quotes', '_lengths')
+
+    def __init__(self):
+        self._lines = dict()
+        self._timestamps = dict()
+        self._quotes = dict()
+        # Lengths of the quotes shorter than QUOTE_PREFIX on each line
+        self._lengths = dict()
+
+    def add(self, comment):
+        """Add a comment to the index.
+
+        Parameters
+        ----------
+        comment: object
+            An instance of app.models.Comment with the line, posted, and text
+            attributes set.
+        """
+        comments = self._lines.setdefault(comment.line, list())
+        index = len(comments)
+        comments.append(comment)
+
+        key = (comment.line, _truncate_posted(comment.posted))
+        self._timestamps.setdefault(key, list()).append(comment)
+
+        quote = _get_quote(comment.text)
+        key = (comment.line, quote[:QUOTE_PREFIX])
+        self._quotes.setdefault(key, list()).append((index, quote, comment))
+        if len(quote) < QUOTE_PREFIX:
+            self._lengths.setdefault(comment.line, set()).add(len(quote))
+
+    def get_comments(self, line):
+        """Return the list of comments, in order, posted on a line."""
+        return self._lines.get(line, list())
+
+    def get_parent(self, raw, line):
+        """Return parent of a comment posted on a line.
+
+        Parameters
+        ----------
+        raw: str
+            The raw text of the comment message for which the parent is to be
+            identified.
+        line: int
+            The line on which the comment was posted.
+
+        Returns
+        -------
+        comment: object
+            An instance of app.models.Comment that represents the parent of
+            the comment. None is returned if no parent was found.
+        """
+        comments = self.get_comments(line)
+
+        match = RESPONSE_HEAD_RE.match(raw)
+        if match is None:
+            return comments[-1] if comments else None
+
+        timestamp = _get_timestamp(match.group(0))
+        if timestamp is None:
+            logger.error('NONE: ' + raw)
+            return None
+
+        parents = self._timestamps.get((line, timestamp), list())
+        if len(parents) == 1:
+            return parents[0]
+
+        # The first comment, in order, whose quote is in the response
+        parent = None
+        lengths = self._lengths.get(line, set()) | {QUOTE_PREFIX}
+        position = raw.find('> ')
+        while position != -1:
+            for length in lengths:
+                key = (line, raw[position:position + length])
+                for (index, quote, comment) in self._quotes.get(key, []):
+                    if parent is not None and parent[0] <= index:
+                        continue
+                    if raw.startswith(quote, position):
+                        parent = (index, comment)
+            position = raw.find('> ', position + 1)
+        if parent is not None:
+            return parent[1]
+        return comments[-1] if comments else None
+
+
 def get_elapsed(begin, end):
     """
     Return the number of minutes that passed between the specified beginning
@@ -411,7 +477,7 @@ def get_verbs(filepath):
 
 def load_json(filepath, sanitize=True):
     """ Load the specified json file after sanitizing it. """
-    with open(filepath, 'r') as file:
+    with open_file(filepath, 'r') as file:
         if sanitize:
             contents = file.read()
             contents = NULL_RE.sub('', contents)
@@ -419,6 +485,30 @@ def load_json(filepath, sanitize=True):
         return json.load(file)
 
 
+def load_jsonl(filepath, sanitize=True):
+    """ Yield the objects in the specified JSON Lines file. """
+    with open_file(filepath, 'r') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if sanitize:
+                line = NULL_RE.sub('', line)
+            yield json.loads(line)
+
+
+def open_file(filepath, mode='r'):
+    """
+    Open the specified file in text mode. Files with the extension .gz or .xz
+    are (de)compressed, using gzip or lzma respectively, as they are read or
+    written.
+    """
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, mode + 't', encoding='utf-8')
+    if filepath.endswith('.xz'):
+        return lzma.open(filepath, mode + 't', encoding='utf-8')
+    return open(filepath, mode)
+
+
 def parse_bugids(text):
     """
     Search for bug IDs within the specified text. Return a list of any results.
@@ -497,29 +587,55 @@ def truncate(string, length=50):
 
 
 def _get_related_chunks(chunk_a, patch_b):
-    for chunk in patch_b.get_chunks():
-        if chunk.get_base_hunk() == chunk_a.get_base_hunk():
-            return chunk
-    return None
+    return patch_b.get_chunk_by_base_hunk(chunk_a.get_base_hunk())
 
 
 def line_changed(line_number, patch_a, patch_b):
-    a = patch.Patch(patch_a)
-    b = patch.Patch(patch_b)
-    c = a.get_chunk_by_line(line_number)
-    d = _get_related_chunks(c, b)
+    return lines_changed([line_number], patch_a, patch_b)[0]
+
+
+def lines_changed(line_numbers, patch_a, patch_b, keys=(None, None)):
+    """
+    Determine, for each line number, if the line at the number in the first
+    patch was changed in the second patch.
+
+    Parameters
+    ----------
+    line_numbers : list
+        Line numbers, with respect to the new file of the first patch, of the
+        lines to check.
+    patch_a : str
+        Text of the first patch.
+    patch_b : str
+        Text of the second patch.
+    keys : tuple, optional
+        Keys, e.g. the identifiers of the patches, with which the parsed
+        patches are cached. The text of a patch is the key by default.
 
-    if d is None:
-        return False
+    Returns
+    -------
+    changed : list
+        A list of booleans, one for each line number, that are True if the
+        line was changed and False otherwise. A line that is not in a chunk of
+        the first patch, or whose chunk is not in the second patch, is
+        considered unchanged.
+    """
+    a = patch.get_patch(patch_a, keys[0])
+    b = patch.get_patch(patch_b, keys[1])
 
-    e = c.get_lines()[line_number]
-    f = d.get_hunk()
-    g = d.get_lines()[f[2]+(f[3]-f[1])]
+    changed = list()
+    for line_number in line_numbers:
+        c = a.get_chunk_by_line(line_number)
+        d = _get_related_chunks(c, b) if c is not None else None
+        if d is None:
+            changed.append(False)
+            continue
 
-    if e != g:
-        return True
-    else:
-        return False
+        e = c.get_lines()[line_number]
+        f = d.get_hunk()
+        g = d.get_lines()[f[2]+(f[3]-f[1])]
+        changed.append(e != g)
+    return changed
 
 
 def to_json(response):
@@ -531,6 +647,37 @@ def to_json(response):
 # Private Functions
 
 
+def _get_quote(text):
+    """
+    Return the text as it would be quoted in a response to a comment.
+    """
+    return '> {}'.format(text.replace(r'\n', r'\n> '))
+
+
+def _get_timestamp(header):
+    """
+    Return the timestamp, of the form YYYY-MM-DD HH:MM:SS, in the header of a
+    comment response or None if the header has no timestamp.
+    """
+    match = DATE_TIME_RE.search(header)
+    if match is None:
+        return None
+    components = match.groupdict()
+    return '{date} {time}'.format(
+            date=components['date'].replace('/', '-'),
+            time=components['time']
+        )
+
+
+def _truncate_posted(posted):
+    """
+    Return the timestamp at which a comment was posted without milliseconds.
+    """
+    posted = str(posted)
+    index = posted.find('.')
+    return posted if index == -1 else posted[:index]
+
+
 def _get_contribution(comment, reviews, comments):
     # Variant: Uniform
     contribution = 1 / reviews.num_reviewers
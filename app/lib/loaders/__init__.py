@@ -1,4 +1,4 @@
-from app.lib.loaders.loader import Loader
+from app.lib.loaders.loader import MODES, Loader
 
 from app.lib.loaders.bug import BugLoader
 from app.lib.loaders.message import MessageLoader
@@ -8,3 +8,4 @@ from app.lib.loaders.vulnerability import VulnerabilityLoader
 from app.lib.loaders.sentencemessage import SentenceMessageLoader
 from app.lib.loaders.sentencecomment import SentenceCommentLoader
 from app.lib.loaders.comment import CommentLoader
+from app.lib.loaders.ingest import IngestLoader
@@ -1,7 +1,6 @@
 """
 @AUTHOR: nuthanmunaiah
 """
-import multiprocessing
 import sys
 import traceback
 
@@ -10,9 +9,17 @@ from datetime import datetime
 from django.db import Error, transaction
 
 from app.lib import files, helpers, loaders
-from app.lib.utils import parallel
+from app.lib.logger import *
+from app.lib.utils import parallel, pipeline
 from app.models import *
 
+# Number of bugs saved in a single bulk insert. Kept well below
+# settings.BATCH_SIZE since every bug carries its document, comments included.
+BATCH_SIZE = 500
+
+# Bugs awaiting a bulk insert in a writer process
+_bugs = list()
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -25,27 +32,7 @@ def aggregate(oqueue, cqueue, num_doers):
             continue  # pragma: no cover
 
         (bug, cves) = item
-        try:
-            with transaction.atomic():
-                bug.save()
-                objects = list()
-                for cve in cves:
-                    vulnerability = helpers.get_row(Vulnerability, id=cve)
-                    if vulnerability is None:
-                        vulnerability = Vulnerability(id=cve)
-                        vulnerability.save()
-
-                    objects.append(VulnerabilityBug(
-                            vulnerability=vulnerability, bug=bug
-                        ))
-                if objects:
-                    VulnerabilityBug.objects.bulk_create(objects)
-                count += 1
-        except Error as err:  # pragma: no cover
-            sys.stderr.write('Exception\n')
-            sys.stderr.write('  Bug  {}\n'.format(bug.id))
-            extype, exvalue, extrace = sys.exc_info()
-            traceback.print_exception(extype, exvalue, extrace)
+        count += save(bug, cves)
 
     oqueue.put(count)
 
@@ -57,34 +44,155 @@ def do(iqueue, cqueue):  # pragma: no cover
             cqueue.put(parallel.DD)
             break
 
-        type, cves = '', list()
-        if 'labels' in item:
-            for label in item['labels']:
-                if label.startswith('Type-'):
-                    type = label.replace('Type-', '')
-                if label.startswith('CVE-'):
-                    cves.append(label)
+        cqueue.put(transform(item))
 
-        bug = Bug(
-                id=item['id'], type=type, status=item['status'], document=item
-            )
-        cqueue.put((bug, cves))
 
-
-def stream(iqueue, settings, num_doers):
+def get_bugs(settings, delta=None):
+    """
+    Generator of the bugs, transformed for loading, reported in the years in
+    settings.YEARS or, if specified, in a delta.
+    """
     f = files.Files(settings)
-    for year in settings.YEARS:
-        for bug in f.get_bugs(year):
-            iqueue.put(f.transform_bug(bug))
+    if delta is not None:
+        for bug in f.get_delta(delta):
+            yield f.transform_bug(bug)
+    else:
+        for year in settings.YEARS:
+            for bug in f.get_bugs(year):
+                yield f.transform_bug(bug)
+
+
+def save(bug, cves):
+    """
+    Save a bug and its association with the vulnerabilities identified by
+    cves, saving the vulnerabilities that do not exist. Returns 1 if the bug
+    was saved and 0 otherwise.
+    """
+    try:
+        with transaction.atomic():
+            bug.save()
+            objects = list()
+            for cve in cves:
+                vulnerability = helpers.get_row(Vulnerability, id=cve)
+                if vulnerability is None:
+                    vulnerability = Vulnerability(id=cve)
+                    vulnerability.save()
+
+                objects.append(VulnerabilityBug(
+                        vulnerability=vulnerability, bug=bug
+                    ))
+            if objects:
+                VulnerabilityBug.objects.bulk_create(objects)
+            return 1
+    except Error as err:  # pragma: no cover
+        sys.stderr.write('Exception\n')
+        sys.stderr.write('  Bug  {}\n'.format(bug.id))
+        extype, exvalue, extrace = sys.exc_info()
+        traceback.print_exception(extype, exvalue, extrace)
+    return 0
+
+
+def stream(iqueue, settings, num_doers, delta=None):
+    for bug in get_bugs(settings, delta):
+        iqueue.put(bug)
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
 
 
+def transform(item):
+    """
+    Returns a tuple (bug, cves) where bug is the unsaved Bug for the bug item
+    and cves is the list of identifiers of the vulnerabilities that the bug
+    is labeled with.
+    """
+    type, cves = '', list()
+    if 'labels' in item:
+        for label in item['labels']:
+            if label.startswith('Type-'):
+                type = label.replace('Type-', '')
+            if label.startswith('CVE-'):
+                cves.append(label)
+
+    bug = Bug(
+            id=item['id'], type=type, status=item['status'], document=item
+        )
+    return (bug, cves)
+
+
+def bulk_stream(oqueue, settings, delta=None):  # pragma: no cover
+    for bug in get_bugs(settings, delta):
+        oqueue.put(bug)
+
+
+def bulk_transform(item):  # pragma: no cover
+    return ([transform(item)], 0)
+
+
+def bulk_write(item, vulnerabilities):  # pragma: no cover
+    """
+    Batch a bug and save the batch when it is full. Returns a tuple (outputs,
+    count) where count is the number of bugs saved, if any.
+    """
+    _bugs.append(item)
+    if len(_bugs) < BATCH_SIZE:
+        return (list(), 0)
+    return (list(), flush(vulnerabilities))
+
+
+def flush(vulnerabilities):  # pragma: no cover
+    """
+    Save the batched bugs, and their associations with vulnerabilities, in
+    bulk. Only the vulnerabilities that are in neither vulnerabilities, the
+    set of identifiers of vulnerabilities known to exist, nor the database
+    are saved. When the bulk insert fails, e.g. because a bug in the batch
+    exists, the bugs are saved one at a time so that only the offending bugs
+    are not saved. Returns the number of bugs saved.
+    """
+    items = list(_bugs)
+    del _bugs[:]
+    if not items:
+        return 0
+
+    cves = set(cve for (_, _cves) in items for cve in _cves)
+    try:
+        with transaction.atomic():
+            Bug.objects.bulk_create([bug for (bug, _) in items])
+            for cve in sorted(cves - vulnerabilities):
+                Vulnerability.objects.get_or_create(id=cve)
+            VulnerabilityBug.objects.bulk_create([
+                    VulnerabilityBug(vulnerability_id=cve, bug_id=bug.id)
+                    for (bug, _cves) in items for cve in _cves
+                ])
+        vulnerabilities.update(cves)
+        return len(items)
+    except Error as err:
+        debug('Bulk insert of {:,} bugs failed: {}'.format(len(items), err))
+    return sum(save(bug, _cves) for (bug, _cves) in items)
+
+
 class BugLoader(loaders.Loader):
     """
     Implements loader object.
     """
+    def __init__(self, settings, num_processes, delta=None, mode='parallel',
+                 num_writers=1):
+        """
+        Constructor. When delta, the path to a delta written by a refresh, is
+        specified only the bugs in the delta are loaded.
+
+        In the bulk mode, the identifiers of all vulnerabilities are read once,
+        instead of once for every CVE a bug is labeled with, and the bugs are
+        saved in batches by num_writers processes instead of one at a time by
+        a single process.
+        """
+        super(BugLoader, self).__init__(settings, num_processes)
+        if mode not in loaders.MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
+        self.delta = delta
+        self.mode = mode
+        self.num_writers = num_writers
+
     def load(self):
         """
         Grabs all of the bugs from within the specified range of years,
@@ -93,6 +201,9 @@ class BugLoader(loaders.Loader):
         """
         count = 0
 
+        if self.mode == 'bulk':
+            return self._load_bulk()
+
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
         process = self._start_streaming(iqueue)
         count = parallel.run(do, aggregate, iqueue, self.num_processes)
@@ -100,9 +211,28 @@ class BugLoader(loaders.Loader):
 
         return count
 
+    def _load_bulk(self):
+        vulnerabilities = set(
+                Vulnerability.objects.values_list('id', flat=True)
+            )
+        stages = [
+                pipeline.Stage(
+                    'transform', bulk_transform, self.num_processes
+                ),
+                pipeline.Stage(
+                    'write', bulk_write, self.num_writers, finisher=flush,
+                    args=(vulnerabilities,)
+                )
+            ]
+        counts = pipeline.run(
+                bulk_stream, stages, self.settings.QUEUE_SIZE,
+                args=(self.settings, self.delta)
+            )
+        return counts['write']
+
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
-                target=stream, args=(iqueue, self.settings, self.num_processes)
+        process = parallel.spawn(
+                target=stream,
+                args=(iqueue, self.settings, self.num_processes, self.delta)
             )
-        process.start()
         return process
@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -8,7 +7,7 @@ from django.db.models import Q
 
 from app.lib import helpers, loaders
 from app.lib.nlp import summarizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -37,47 +36,9 @@ def do(iqueue, cqueue):  # pragma: no cover
         cnt = 0
         with transaction.atomic():
             try:
-                for (author, psid, ps) in patchsets:
-                    patchset = PatchSet(
-                            review=review, id=psid, created=ps['created']
-                        )
-                    patchset.save()
-
-                    files, modules = list(), list()
-                    for (path, p) in ps['files'].items():
-                        patch = Patch(
-                                patchset=patchset, id=p['id'], file_path=path,
-                                module_path=helpers.get_module_path(path),
-                                num_added=p['num_added'],
-                                num_removed=p['num_removed']
-                            )
-                        patch.save()
-
-                        files.append(path)
-                        modules.append(helpers.get_module_path(path))
-                        if 'messages' in p:
-                            previous = dict()
-                            for i, m in enumerate(p['messages']):
-                                line = m['lineno']
-                                if line not in previous:
-                                    previous[line] = list()
-                                comment = Comment(
-                                        patch=patch, posted=m['date'],
-                                        line=line, author=m['author_email'],
-                                        text=helpers.clean(m['text']),
-                                        by_reviewer=m['author_email'] != author
-                                    )
-                                comment.parent = helpers.get_parent(
-                                        m['text'], previous[line]
-                                    )
-                                comment.save()
-                                previous[line].append(comment)
-                                cnt += 1
-                    if files or modules:
-                        patchset.files = files
-                        patchset.modules = modules
-                        patchset.save()
+                cnt = len(save(review, patchsets))
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Review  {}\n'.format(review.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -86,16 +47,69 @@ def do(iqueue, cqueue):  # pragma: no cover
         cqueue.put(cnt)
 
 
+def get_patchsets(review):
+    """
+    Returns a list of tuples of the form (author, psid, patchset) with one
+    tuple for each patchset of the review.
+    """
+    author = review.document['owner_email']
+
+    patchsets = list()
+    for (psid, ps) in review.document['patchsets'].items():
+        patchsets.append((author, psid, ps))
+    return patchsets
+
+
+def save(review, patchsets):  # pragma: no cover
+    """
+    Save the patchsets and patches of a review along with the comments posted
+    on them. Returns the list of comments saved.
+    """
+    comments = list()
+    for (author, psid, ps) in patchsets:
+        patchset = PatchSet(
+                review=review, id=psid, created=ps['created']
+            )
+        patchset.save()
+
+        files, modules = list(), list()
+        for (path, p) in ps['files'].items():
+            patch = Patch(
+                    patchset=patchset, id=p['id'], file_path=path,
+                    module_path=helpers.get_module_path(path),
+                    num_added=p['num_added'],
+                    num_removed=p['num_removed']
+                )
+            patch.save()
+
+            files.append(path)
+            modules.append(helpers.get_module_path(path))
+            if 'messages' in p:
+                index = helpers.ThreadIndex()
+                for i, m in enumerate(p['messages']):
+                    line = m['lineno']
+                    comment = Comment(
+                            patch=patch, posted=m['date'],
+                            line=line, author=m['author_email'],
+                            text=helpers.clean(m['text']),
+                            by_reviewer=m['author_email'] != author
+                        )
+                    comment.parent = index.get_parent(m['text'], line)
+                    comment.save()
+                    index.add(comment)
+                    comments.append(comment)
+        if files or modules:
+            patchset.files = files
+            patchset.modules = modules
+            patchset.save()
+    return comments
+
+
 def stream(review_ids, settings, iqueue, num_doers):
     for review_id in review_ids:
         review = helpers.get_row(Review, id=review_id)
         if review is not None:
-            author = review.document['owner_email']
-
-            patchsets = list()
-            for (psid, ps) in review.document['patchsets'].items():
-                patchsets.append((author, psid, ps))
-            iqueue.put((review, patchsets))
+            iqueue.put((review, get_patchsets(review)))
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
@@ -116,12 +130,11 @@ class CommentLoader(loaders.Loader):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.review_ids, self.settings, iqueue, self.num_processes
                 )
             )
-        process.start()
 
         return process
@@ -0,0 +1,187 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import sys
+import traceback
+
+from django.db import Error, transaction
+
+from app.lib import helpers, loaders
+from app.lib.loaders import comment, message
+from app.lib.nlp import summarizer, sentenizer
+from app.lib.utils import pipeline
+from app.models import *
+
+# Models with which sentences are associated
+OWNERS = {'comment': Comment, 'message': Message}
+
+# Tokens awaiting a bulk insert in a process of the tokens stage
+_tokens = list()
+
+
+def extract(review, settings):  # pragma: no cover
+    """
+    Save the patchsets, patches, comments, and messages of a review. Returns
+    a tuple (outputs, count) where outputs has a single tuple of the form
+    (review_id, year, texts) with texts being a list of tuples of the form
+    (owner, id, text) with one tuple for each comment and message saved.
+    """
+    (comments, messages) = (list(), list())
+    with transaction.atomic():
+        try:
+            comments = comment.save(review, comment.get_patchsets(review))
+            texts = message.get_messages(review, settings)
+            for (posted, sender, text) in texts:
+                messages.append(Message(
+                        review_id=review.id, posted=posted, sender=sender,
+                        text=text
+                    ))
+            if len(messages) > 0:
+                Message.objects.bulk_create(messages)
+        except Error:  # pragma: no cover
+            sys.stderr.write('Exception\n')
+            sys.stderr.write('  Review  {}\n'.format(review.id))
+            extype, exvalue, extrace = sys.exc_info()
+            traceback.print_exception(extype, exvalue, extrace)
+            return (list(), 0)
+
+    texts = [('comment', c.id, c.text) for c in comments]
+    texts.extend(('message', m.id, m.text) for m in messages)
+    return ([(review.id, review.created.year, texts)], len(texts))
+
+
+def sentenize(item, settings):  # pragma: no cover
+    """
+    Split the text of each comment and message of a review into sentences
+    and save the sentences. Returns a tuple (outputs, count) where outputs
+    has a single tuple of the form (review_id, sentences) with sentences
+    being a list of tuples of the form (sentence_id, text, year).
+    """
+    (review_id, year, texts) = item
+
+    (sentences, owners) = (list(), list())
+    for (owner, id, text) in texts:
+        for sent in sentenizer.NLTKSentenizer(text).execute():
+            sentences.append(Sentence(text=sent, year=year))
+            owners.append((owner, id))
+
+    with transaction.atomic():
+        try:
+            if len(sentences) > 0:
+                Sentence.objects.bulk_create(sentences)
+            for (owner, model) in OWNERS.items():
+                through = model.sentences.through
+                objects = [
+                        through(**{
+                            '{}_id'.format(owner): id,
+                            'sentence_id': sentence.id
+                        })
+                        for ((_owner, id), sentence) in zip(owners, sentences)
+                        if _owner == owner
+                    ]
+                if len(objects) > 0:
+                    through.objects.bulk_create(objects)
+        except Error:  # pragma: no cover
+            sys.stderr.write('Exception\n')
+            sys.stderr.write('  Review  {}\n'.format(review_id))
+            extype, exvalue, extrace = sys.exc_info()
+            traceback.print_exception(extype, exvalue, extrace)
+            return (list(), 0)
+
+    sentences = [(s.id, s.text, s.year) for s in sentences]
+    return ([(review_id, sentences)], len(sentences))
+
+
+def tokenize(item, settings):  # pragma: no cover
+    """
+    Summarize the sentences of a review into tokens. The tokens are saved in
+    batches of settings.BATCH_SIZE, so the count returned is the number of
+    tokens saved, if any, while the tokens of the review were batched.
+    """
+    (review_id, sentences) = item
+
+    for (sentence_id, sentence_text, year) in sentences:
+        summary = summarizer.Summarizer(sentence_text).execute()
+        for (position, token, stem, lemma, pos, chunk) in summary:
+            _tokens.append(Token(
+                    sentence_id=sentence_id, position=position, token=token,
+                    stem=stem, lemma=lemma, pos=pos, chunk=chunk, year=year
+                ))
+
+    count = 0
+    if len(_tokens) >= settings.BATCH_SIZE:
+        count = flush(settings)
+    return (list(), count)
+
+
+def flush(settings):  # pragma: no cover
+    """
+    Save the tokens awaiting a bulk insert. Returns the number of tokens
+    saved.
+    """
+    objects = list(_tokens)
+    del _tokens[:]
+
+    with transaction.atomic():
+        try:
+            for index in range(0, len(objects), settings.BATCH_SIZE):
+                Token.objects.bulk_create(
+                        objects[index:index + settings.BATCH_SIZE]
+                    )
+        except Error:  # pragma: no cover
+            sys.stderr.write('Exception\n')
+            extype, exvalue, extrace = sys.exc_info()
+            traceback.print_exception(extype, exvalue, extrace)
+            return 0
+
+    return len(objects)
+
+
+def stream(oqueue, review_ids, settings):  # pragma: no cover
+    for review_id in review_ids:
+        review = helpers.get_row(Review, id=review_id)
+        if review is not None:
+            oqueue.put(review)
+
+
+class IngestLoader(loaders.Loader):
+    """
+    Implements loader object that loads the comments, messages, sentences,
+    and tokens of reviews in a single pipeline. A review flows from one stage
+    of the pipeline to the next as soon as a stage is done with it instead of
+    each stage waiting for the one before it to be done with all reviews.
+    """
+    def __init__(self, settings, num_processes, review_ids):
+        super(IngestLoader, self).__init__(settings, num_processes)
+        self.review_ids = review_ids
+
+    def load(self):
+        """
+        Returns a dictionary with the number of comments and messages,
+        sentences, and tokens loaded keyed by 'texts', 'sentences', and
+        'tokens' respectively.
+        """
+        (texts, sentences, tokens) = self._get_num_doers()
+        args = (self.settings,)
+        stages = [
+                pipeline.Stage('texts', extract, texts, args=args),
+                pipeline.Stage('sentences', sentenize, sentences, args=args),
+                pipeline.Stage(
+                    'tokens', tokenize, tokens, finisher=flush, args=args
+                )
+            ]
+        return pipeline.run(
+                stream, stages, self.settings.QUEUE_SIZE,
+                args=(self.review_ids, self.settings)
+            )
+
+    def _get_num_doers(self):
+        """
+        Returns the number of processes of each stage. Tokenizing sentences
+        takes the longest, so half the processes are given to it.
+        """
+        texts = max(1, self.num_processes // 4)
+        sentences = max(1, self.num_processes // 4)
+        tokens = max(1, self.num_processes - texts - sentences)
+        return (texts, sentences, tokens)
@@ -4,6 +4,11 @@
 
 from django.db import transaction
 
+# Modes in which a loader that supports bulk loading may load. In the bulk
+# mode, the rows that are referred to are read once and the rows loaded are
+# saved in batches by one or more writer processes.
+MODES = ['parallel', 'bulk']
+
 
 class Loader(object):
     """
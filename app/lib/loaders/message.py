@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -7,7 +6,7 @@ from django.db import Error, transaction
 
 from app.lib import helpers, loaders
 from app.lib.nlp import summarizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -53,6 +52,7 @@ def do(iqueue, cqueue): # pragma: no cover
                 if len(objects) > 0:
                     Message.objects.bulk_create(objects)
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Review  {}\n'.format(review_id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -62,20 +62,28 @@ def do(iqueue, cqueue): # pragma: no cover
         cqueue.put(len(objects))
 
 
+def get_messages(review, settings):
+    """
+    Returns a list of tuples of the form (posted, sender, text) with one tuple
+    for each message, that was neither auto generated nor sent by a bot,
+    posted on the review.
+    """
+    messages = list()
+    for message in review.document['messages']:
+        (posted, sender, auto) = (message['date'], message['sender'],
+                                  message['auto_generated'])
+
+        if auto or sender in settings.BOTS:
+            continue
+        text = _strip_comments(message['text'])
+        messages.append((posted, sender, text))
+    return messages
+
+
 def stream(review_ids, settings, iqueue, num_doers):
     for review_id in review_ids:
         review = helpers.get_row(Review, id=review_id)
-
-        messages = list()
-        for message in review.document['messages']:
-            (posted, sender, auto) = (message['date'], message['sender'],
-                                      message['auto_generated'])
-
-            if auto or sender in settings.BOTS:
-                continue
-            text = _strip_comments(message['text'])
-            messages.append((posted, sender, text))
-        iqueue.put((review_id, messages))
+        iqueue.put((review_id, get_messages(review, settings)))
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
@@ -96,12 +104,11 @@ class MessageLoader(loaders.Loader):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.review_ids, self.settings, iqueue, self.num_processes
                 )
             )
-        process.start()
 
         return process
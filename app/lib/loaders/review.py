@@ -2,16 +2,23 @@
 @AUTHOR: nuthanmunaiah
 """
 
-import multiprocessing
 import sys
 import traceback
 
 from django.db import connection, Error, transaction
 
 from app.lib import files, helpers, loaders
-from app.lib.utils import parallel
+from app.lib.logger import *
+from app.lib.utils import parallel, pipeline
 from app.models import *
 
+# Number of reviews saved in a single bulk insert. Reviews embed the document
+# they were loaded from so the batches are smaller than settings.BATCH_SIZE.
+BATCH_SIZE = 100
+
+# Reviews awaiting a bulk insert in a writer process
+_reviews = list()
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -24,23 +31,7 @@ def aggregate(oqueue, cqueue, num_doers):
             continue  # pragma: no cover
 
         (review, bug_ids) = item
-        try:
-            with transaction.atomic():
-                review.save()
-
-                review_bugs = list()
-                for id in bug_ids:
-                    bug = helpers.get_row(Bug, id=id)
-                    if bug is not None:
-                        review_bugs.append(ReviewBug(review=review, bug=bug))
-                if review_bugs:
-                    ReviewBug.objects.bulk_create(review_bugs)
-                count += 1
-        except Error as err:  # pragma: no cover
-            sys.stderr.write('Exception\n')
-            sys.stderr.write('  Review  {}\n'.format(review.id))
-            extype, exvalue, extrace = sys.exc_info()
-            traceback.print_exception(extype, exvalue, extrace)
+        count += save(review, bug_ids)
 
     oqueue.put(count)
 
@@ -52,30 +43,162 @@ def do(iqueue, cqueue):  # pragma: no cover
             cqueue.put(parallel.DD)
             break
 
-        review = Review(
-                id=item['issue'], created=item['created'],
-                is_open=True if not item['closed'] else False,
-                num_messages=len(item['messages']), document=item
-            )
-        bug_ids = set(helpers.parse_bugids(item['description']))
+        cqueue.put(transform(item))
 
-        cqueue.put((review, bug_ids))
 
-
-def stream(iqueue, settings, num_doers):
+def get_reviews(settings, delta=None):
+    """
+    Generator of the reviews, transformed for loading, created in the years
+    in settings.YEARS or, if specified, in a delta.
+    """
     f = files.Files(settings)
-    for year in settings.YEARS:
-        for review in f.get_reviews(year):
-            iqueue.put(f.transform_review(review))
+    if delta is not None:
+        for review in f.get_delta(delta):
+            yield f.transform_review(review)
+    else:
+        for year in settings.YEARS:
+            for review in f.get_reviews(year):
+                yield f.transform_review(review)
+
+
+def save(review, bug_ids):
+    """
+    Save a review and its association with the bugs, among those identified
+    by bug_ids, that exist. Returns 1 if the review was saved and 0 otherwise.
+    """
+    try:
+        with transaction.atomic():
+            review.save()
+
+            review_bugs = list()
+            for id in bug_ids:
+                bug = helpers.get_row(Bug, id=id)
+                if bug is not None:
+                    review_bugs.append(ReviewBug(review=review, bug=bug))
+            if review_bugs:
+                ReviewBug.objects.bulk_create(review_bugs)
+            return 1
+    except Error as err:  # pragma: no cover
+        sys.stderr.write('Exception\n')
+        sys.stderr.write('  Review  {}\n'.format(review.id))
+        extype, exvalue, extrace = sys.exc_info()
+        traceback.print_exception(extype, exvalue, extrace)
+    return 0
+
+
+def stream(iqueue, settings, num_doers, delta=None):
+    for review in get_reviews(settings, delta):
+        iqueue.put(review)
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
 
 
+def transform(item):
+    """
+    Returns a tuple (review, bug_ids) where review is the unsaved Review for
+    the review item and bug_ids is the set of identifiers of the bugs that the
+    description of the review refers to.
+    """
+    review = Review(
+            id=item['issue'], created=item['created'],
+            is_open=True if not item['closed'] else False,
+            num_messages=len(item['messages']), document=item
+        )
+    bug_ids = set(helpers.parse_bugids(item['description']))
+    return (review, bug_ids)
+
+
+def bulk_stream(oqueue, settings, delta=None):  # pragma: no cover
+    for review in get_reviews(settings, delta):
+        oqueue.put(review)
+
+
+def bulk_transform(item, bugs):  # pragma: no cover
+    """
+    Returns a tuple (outputs, count) where outputs has a single tuple of the
+    form (review, bug_ids) with bug_ids limited to the identifiers of bugs
+    that exist.
+    """
+    (review, bug_ids) = transform(item)
+    return ([(review, bug_ids & bugs)], 0)
+
+
+def bulk_write(item):  # pragma: no cover
+    """
+    Batch a review and save the batch when it is full. Returns a tuple
+    (outputs, count) where count is the number of reviews saved, if any.
+    """
+    _reviews.append(item)
+    if len(_reviews) < BATCH_SIZE:
+        return (list(), 0)
+    return (list(), flush())
+
+
+def flush():  # pragma: no cover
+    """
+    Save the batched reviews, and their associations with bugs, in bulk.
+    When the bulk insert fails, e.g. because a review in the batch exists,
+    the reviews are saved one at a time so that only the offending reviews
+    are not saved. Returns the number of reviews saved.
+    """
+    items = list(_reviews)
+    del _reviews[:]
+    if not items:
+        return 0
+
+    try:
+        with transaction.atomic():
+            Review.objects.bulk_create([review for (review, _) in items])
+            ReviewBug.objects.bulk_create([
+                    ReviewBug(review_id=review.id, bug_id=id)
+                    for (review, bug_ids) in items for id in bug_ids
+                ])
+        return len(items)
+    except Error as err:
+        debug('Bulk insert of {:,} reviews failed: {}'.format(len(items), err))
+    return sum(save(review, bug_ids) for (review, bug_ids) in items)
+
+
+def cluster():
+    """
+    Physically order the review table by the date on which reviews were
+    created.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('CLUSTER review USING review_created_idx')
+    except Error as err:
+        sys.stderr.write('Exception\n')
+        extype, exvalue, extrace = sys.exc_info()
+        traceback.print_exception(extype, exvalue, extrace)
+
+
 class ReviewLoader(loaders.Loader):
     """
     Implements loader object.
     """
+    def __init__(self, settings, num_processes, delta=None, cluster=True,
+                 mode='parallel', num_writers=1):
+        """
+        Constructor. When delta, the path to a delta written by a refresh, is
+        specified only the reviews in the delta are loaded. When cluster is
+        False the review table is not clustered after the reviews are loaded,
+        e.g. when several loaders run at once and the table is clustered once
+        all of them are done.
+
+        In the bulk mode, the identifiers of all bugs are read once, instead of
+        once for every review, and the reviews are saved in batches by
+        num_writers processes instead of one at a time by a single process.
+        """
+        super(ReviewLoader, self).__init__(settings, num_processes)
+        if mode not in loaders.MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
+        self.delta = delta
+        self.cluster = cluster
+        self.mode = mode
+        self.num_writers = num_writers
+
     def load(self):
         """
         Grabs all of the reviews created within the specified range of years,
@@ -84,27 +207,39 @@ class ReviewLoader(loaders.Loader):
         """
         count = 0
 
-        iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
-        process = self._start_streaming(iqueue)
-        count = parallel.run(do, aggregate, iqueue, self.num_processes)
-        process.join()
+        if self.mode == 'bulk':
+            count = self._load_bulk()
+        else:
+            iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
+            process = self._start_streaming(iqueue)
+            count = parallel.run(do, aggregate, iqueue, self.num_processes)
+            process.join()
 
-        self._cluster()
+        if self.cluster:
+            cluster()
 
         return count
 
-    def _cluster(self):
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute('CLUSTER review USING review_created_idx')
-        except Error as err:
-            sys.stderr.write('Exception\n')
-            extype, exvalue, extrace = sys.exc_info()
-            traceback.print_exception(extype, exvalue, extrace)
+    def _load_bulk(self):
+        bugs = set(Bug.objects.values_list('id', flat=True))
+        stages = [
+                pipeline.Stage(
+                    'transform', bulk_transform, self.num_processes,
+                    args=(bugs,)
+                ),
+                pipeline.Stage(
+                    'write', bulk_write, self.num_writers, finisher=flush
+                )
+            ]
+        counts = pipeline.run(
+                bulk_stream, stages, self.settings.QUEUE_SIZE,
+                args=(self.settings, self.delta)
+            )
+        return counts['write']
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
-                target=stream, args=(iqueue, self.settings, self.num_processes)
+        process = parallel.spawn(
+                target=stream,
+                args=(iqueue, self.settings, self.num_processes, self.delta)
             )
-        process.start()
         return process
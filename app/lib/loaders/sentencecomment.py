@@ -1,4 +1,3 @@
-import multiprocessing
 import sys
 import traceback
 
@@ -6,7 +5,7 @@ from django.db import Error, transaction
 
 from app.lib import helpers, loaders
 from app.lib.nlp import summarizer, sentenizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 from app.queryStrings import *
 
@@ -31,7 +30,7 @@ def do(iqueue, cqueue):  # pragma: no cover
             cqueue.put(parallel.DD)
             break
 
-        (review_id, comments) = item
+        (review_id, year, comments) = item
 
         count = 0
         with transaction.atomic():
@@ -40,9 +39,10 @@ def do(iqueue, cqueue):  # pragma: no cover
                     comment = Comment.objects.get(id=comment_id)
                     # TODO: Save position of sentence
                     for sent in sentenizer.NLTKSentenizer(text).execute():
-                        comment.sentences.create(text=sent)
+                        comment.sentences.create(text=sent, year=year)
                         count += 1
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Review  {}\n'.format(review_id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -57,7 +57,7 @@ def stream(review_ids, settings, iqueue, num_doers):
 
         comments = Comment.objects.filter(patch__patchset__review_id=review_id) \
                           .values_list('posted', 'author', 'text', 'id')
-        iqueue.put((review_id, list(comments)))
+        iqueue.put((review_id, review.created.year, list(comments)))
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
@@ -72,18 +72,19 @@ class SentenceCommentLoader(loaders.Loader):
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
 
         process = self._start_streaming(iqueue)
-        count = parallel.run(do, aggregate, iqueue, self.num_processes)
+        count = parallel.run(
+                do, aggregate, iqueue, self.num_processes, resources=['punkt']
+            )
         process.join()
 
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.review_ids, self.settings, iqueue, self.num_processes
                 )
             )
-        process.start()
 
         return process
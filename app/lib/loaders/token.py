@@ -1,4 +1,3 @@
-import multiprocessing
 import sys
 import traceback
 
@@ -6,9 +5,12 @@ from django.db import Error, transaction
 from django.db.models import Q
 from app.lib import helpers, loaders
 from app.lib.nlp import summarizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
+# NLP resources used to summarize a sentence
+RESOURCES = ['punkt', 'tagger', 'wordnet', 'chunker']
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -35,20 +37,19 @@ def do(iqueue, cqueue):  # pragma: no cover
         objects = list()
         with transaction.atomic():
             try:
-                for (sentence_id, sentence_text) in sentences:
-                    #print(sentence_id)
-                    #print(sentence_text)
+                for (sentence_id, sentence_text, year) in sentences:
                     summary = summarizer.Summarizer(sentence_text).execute()
                     for (position, token, stem, lemma, pos, chunk) in summary:
                         objects.append(Token(
                                 sentence_id=sentence_id, position=position,
                                 token=token, stem=stem, lemma=lemma, pos=pos,
-                                chunk=chunk
+                                chunk=chunk, year=year
                             ))
 
                 if len(objects) > 0:
                     Token.objects.bulk_create(objects)
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Review  {}\n'.format(review_id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -61,9 +62,9 @@ def stream(review_ids, settings, iqueue, num_doers):
     for review_id in review_ids:
         sentences = list()
         for sentence in Sentence.objects.filter(message__review_id=review_id):
-            sentences.append((sentence.id, sentence.text))
+            sentences.append((sentence.id, sentence.text, sentence.year))
         for sentence in Sentence.objects.filter(comment__patch__patchset__review_id=review_id):
-            sentences.append((sentence.id, sentence.text))
+            sentences.append((sentence.id, sentence.text, sentence.year))
         iqueue.put((review_id, sentences))
 
     for i in range(num_doers):
@@ -79,18 +80,19 @@ class TokenLoader(loaders.Loader):
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
 
         process = self._start_streaming(iqueue)
-        count = parallel.run(do, aggregate, iqueue, self.num_processes)
+        count = parallel.run(
+                do, aggregate, iqueue, self.num_processes, resources=RESOURCES
+            )
         process.join()
 
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.review_ids, self.settings, iqueue, self.num_processes
                 )
             )
-        process.start()
 
         return process
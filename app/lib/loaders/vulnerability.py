@@ -13,6 +13,17 @@ class VulnerabilityLoader(loader.Loader):
     """
     Implements loader object.
     """
+    def __init__(self, settings, num_processes, mode='parallel'):
+        """
+        Constructor. In the bulk mode, the identifiers of all bugs,
+        vulnerabilities, and their associations are read once, instead of once
+        for every vulnerability, and the rows missing are saved in bulk.
+        """
+        super(VulnerabilityLoader, self).__init__(settings, num_processes)
+        if mode not in loader.MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
+        self.mode = mode
+
     def load(self):
         """
         Grabs all of the vulnerabilities from the specified files, parses them,
@@ -21,6 +32,9 @@ class VulnerabilityLoader(loader.Loader):
         """
         count = 0
 
+        if self.mode == 'bulk':
+            return self._load_bulk()
+
         with transaction.atomic():
             f = files.Files(self.settings)
             for (source, cve, bug_id) in f.get_vulnerabilities():
@@ -41,3 +55,41 @@ class VulnerabilityLoader(loader.Loader):
                 count += 1
 
         return count
+
+    def _load_bulk(self):
+        count = 0
+
+        bugs = set(Bug.objects.values_list('id', flat=True))
+        vulnerabilities = set(
+                Vulnerability.objects.values_list('id', flat=True)
+            )
+        pairs = set(VulnerabilityBug.objects.values_list(
+                'vulnerability_id', 'bug_id'
+            ))
+
+        (_bugs, _vulnerabilities, _pairs) = (dict(), dict(), list())
+        f = files.Files(self.settings)
+        for (source, cve, bug_id) in f.get_vulnerabilities():
+            bug_id = int(bug_id)
+            if bug_id not in bugs and bug_id not in _bugs:
+                _bugs[bug_id] = Bug(
+                        id=bug_id, type='Bug-Security', status='Redacted'
+                    )
+            if cve not in vulnerabilities and cve not in _vulnerabilities:
+                _vulnerabilities[cve] = Vulnerability(id=cve, source=source)
+            if (cve, bug_id) not in pairs:
+                pairs.add((cve, bug_id))
+                _pairs.append(VulnerabilityBug(
+                        vulnerability_id=cve, bug_id=bug_id
+                    ))
+            count += 1
+
+        size = self.settings.BATCH_SIZE
+        with transaction.atomic():
+            Bug.objects.bulk_create(list(_bugs.values()), batch_size=size)
+            Vulnerability.objects.bulk_create(
+                    list(_vulnerabilities.values()), batch_size=size
+                )
+            VulnerabilityBug.objects.bulk_create(_pairs, batch_size=size)
+
+        return count
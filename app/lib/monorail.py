@@ -1,6 +1,9 @@
+import concurrent.futures
+import functools
 import multiprocessing
+import threading
 
-from apiclient.discovery import build
+from apiclient.discovery import build_from_document
 from googleapiclient.errors import HttpError
 from httplib2 import Http
 from oauth2client.service_account import ServiceAccountCredentials as SAC
@@ -13,11 +16,21 @@ __all__ = ['Monorail']
 SCOPES = ['https://www.googleapis.com/auth/userinfo.email']
 MAX_RESULTS = 1000
 MAX_RETRIES = 3
+MODES = ['process', 'thread']
+
+# Client of the calling process of a pool of processes
+_monorail = None
+_lock = None
 
 
 class Monorail(object):
     '''Interface to the Google Monorail Service.
 
+    The discovery document of the API is retrieved once and a service client
+    is built from it once per thread, or once per process of a pool of
+    processes, so that the connections of a thread are reused across
+    requests.
+
     Parameters
     ----------
     url : string
@@ -27,11 +40,32 @@ class Monorail(object):
         to authenticate server to the Monorail API using  OAuth 2.0. See
         https://developers.google.com/identity/protocols/OAuth2ServiceAccount
         for more information on creating a service account for server-to-server
-        access using OAuth 2.0.
+        access using OAuth 2.0. Requests are not authenticated when None.
+    mode : string, optional
+        'process' to retrieve bugs in parallel using a pool of processes or
+        'thread' to use a pool of threads that share the credentials.
     '''
-    def __init__(self, url, keyfile):
+    def __init__(self, url, keyfile, mode='process'):
+        if mode not in MODES:
+            raise ValueError('Argument mode must be one of {}'.format(MODES))
         self.url = url
-        self.credentials = SAC.from_json_keyfile_name(keyfile, SCOPES)
+        self.mode = mode
+        self.credentials = None
+        if keyfile is not None:
+            self.credentials = SAC.from_json_keyfile_name(keyfile, SCOPES)
+        self._document = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
 
     def get_bug(self, id):
         '''Retrieve bug identified by the unique identifier specified.
@@ -57,7 +91,8 @@ class Monorail(object):
         ids : list(int)
             List of unique identifier of bugs to retrieve.
         processes : int
-            Number of processes to spawn when retrieving bugs in parallel
+            Number of processes (or threads) to spawn when retrieving bugs in
+            parallel
 
         Returns
         -------
@@ -68,30 +103,77 @@ class Monorail(object):
             List of unique identifiers of those bugs that were either not found
             or an error occurred when retrieving the bug.
         '''
+        (bugs, errors) = (list(), list())
+        self.crawl(ids, processes, bugs.append, errors.append)
+        return (bugs, errors)
+
+    def crawl(self, ids, processes, on_bug, on_error, predicate=None):
+        '''Retrieve bugs and hand each over as soon as it is retrieved.
+
+        Parameters
+        ----------
+        ids : list(int)
+            List of unique identifier of bugs to retrieve.
+        processes : int
+            Number of processes (or threads) to spawn when retrieving bugs in
+            parallel
+        on_bug : callable
+            Called, in the calling process, with each bug retrieved.
+        on_error : callable
+            Called, in the calling process, with the unique identifier of
+            each bug that was either not found or an error occurred when
+            retrieving the bug.
+        predicate : callable, optional
+            Called with each bug, before the comments made on it are
+            retrieved. The comments are retrieved only if the predicate
+            returns True, otherwise the bug is skipped. The predicate is
+            pickled along with each bug to retrieve when using a pool of
+            processes.
+        '''
+        if self.mode == 'thread':
+            results = self._fetch_bugs(ids, processes, predicate)
+            self._dispatch(results, on_bug, on_error)
+            return
+
+        # Ship the discovery document to the processes along with the client
+        self._get_document()
         manager = multiprocessing.Manager()
-        bugs = manager.Queue(len(ids))
-        errors = manager.Queue()
         lock = manager.Lock()
 
-        with multiprocessing.Pool(processes) as pool:
-            pool.starmap(
-                    self._put_bug, [(id, bugs, errors, lock) for id in ids]
+        # The client is handed over to every process once, rather than along
+        # with every bug, so that its service client is built only once
+        initargs = (self, lock)
+        with multiprocessing.Pool(processes, _initialize, initargs) as pool:
+            results = pool.imap_unordered(
+                    functools.partial(_fetch_bug, predicate=predicate), ids
                 )
+            self._dispatch(results, on_bug, on_error)
 
-        return (to_list(bugs), to_list(errors))
+    def _dispatch(self, results, on_bug, on_error):
+        for (id, bug) in results:
+            if bug is False:
+                continue
+            elif bug is not None:
+                on_bug(bug)
+            else:
+                on_error(id)
 
-    def _get_bug(self, id, lock=None):
+    def _get_bug(self, id, lock=None, predicate=None):
         '''Retrieve bug identified by the unique identifier specified.
 
         The process of retrieving a bug involves two steps: retrieval of bug
         metadata and retrieval of comments made on the bug. This method
-        implements the two steps.
+        implements the two steps. False is returned, without retrieving the
+        comments, if the bug metadata does not satisfy the predicate.
         '''
         bug = None
 
         service = self._get_service(lock)
         request = service.issues().get(projectId='chromium', issueId=id)
         response = self._get_response(request)
+        if response is not None and predicate is not None and \
+                not predicate(response):
+            return False
         if response is not None:
             comments = self._get_comments(id)
             if comments is not None:
@@ -101,25 +183,32 @@ class Monorail(object):
         return bug
 
     def _get_comments(self, bug_id):
-        '''Retrieve comments made to a bug.'''
+        '''Retrieve comments made to a bug.
+
+        The number of comments is taken from the first page of comments so
+        that the page is not retrieved twice.
+        '''
         comments = list()
 
-        num_comments = self._get_numcomments(bug_id)
+        num_comments = None
         index = 0
         while True:
-            _comments = self.__get_comments(bug_id, index)
-            if _comments is None:
+            response = self.__get_comments(bug_id, index)
+            if response is None:
                 return None
+            if num_comments is None:
+                num_comments = response['totalResults']
+            _comments = response.get('items', list())
             comments.extend(_comments)
             debug('[{}] {}/{}'.format(bug_id, len(comments), num_comments))
-            if len(comments) == num_comments:
+            if len(comments) >= num_comments or len(_comments) == 0:
                 break
             index += MAX_RESULTS
 
         return comments
 
     def __get_comments(self, bug_id, index):
-        '''Retrieve comments made to a bug starting at specified index.
+        '''Retrieve a page of comments made to a bug starting at an index.
 
         The results in the response from certain Monorail service methods are
         paginated and self._get_comments invokes this method to retrieve a page
@@ -130,20 +219,7 @@ class Monorail(object):
                 projectId='chromium', issueId=bug_id,
                 maxResults=MAX_RESULTS, startIndex=index
             )
-        response = self._get_response(request)
-        return [comment for comment in response['items']] if response else None
-
-    def _get_numcomments(self, bug_id):
-        '''Retrieve the number of comments made to a bug.'''
-        service = self._get_service()
-        request = service.issues().comments().list(
-                projectId='chromium', issueId=bug_id,
-                maxResults=MAX_RESULTS, startIndex=0
-            )
-        response = self._get_response(request)
-        if response is None:
-            raise Exception('No response from Monorail API despite retries.')
-        return response['totalResults']
+        return self._get_response(request)
 
     def _get_response(self, request):
         '''Execute a HTTP request and return the response.'''
@@ -160,27 +236,79 @@ class Monorail(object):
         error('Failed {}'.format(request.uri))
         return None
 
+    def _get_document(self):
+        '''Retrieve, once, the discovery document of the Monorail API.'''
+        if self._document is None:
+            with self._lock:
+                if self._document is None:
+                    url = self.url.format(api='monorail', apiVersion='v1')
+                    (response, content) = Http().request(url)
+                    if response.status >= 400:
+                        raise HttpError(response, content, uri=url)
+                    if isinstance(content, bytes):
+                        content = content.decode('utf-8')
+                    self._document = content
+        return self._document
+
     def _get_service(self, lock=None):
-        '''Create and return an instance of the Monorail API service client.'''
-        http = Http()
-        if self.credentials.access_token_expired:
-            if lock is not None:
-                with lock:
-                    self.credentials.refresh(http)
-            else:
-                self.credentials.refresh(http)
-        http = self.credentials.authorize(http)
-        return build('monorail', 'v1', http=http, discoveryServiceUrl=self.url)
+        '''Return the Monorail API service client of the calling thread.'''
+        lock = lock if lock is not None else self._lock
+        if self.credentials is not None and \
+                self.credentials.access_token_expired:
+            with lock:
+                # Another thread may have refreshed while this one waited
+                if self.credentials.access_token_expired:
+                    self.credentials.refresh(Http())
 
-    def _put_bug(self, id, bugs, errors, lock):
-        '''Retrieve a bug and put it into the bugs queue.
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            http = Http()
+            if self.credentials is not None:
+                http = self.credentials.authorize(http)
+            service = build_from_document(self._get_document(), http=http)
+            self._local.service = service
+        return service
+
+    def _fetch_bug(self, id, lock, predicate=None):
+        '''Retrieve a bug and return it along with its identifier.
 
         When retrieving bugs in parallel, each process invokes this method to
-        retrieve a single bug. If the bug retrieval was successful, it is put
-        into bugs else errors, both of which are shared queues.
+        retrieve a single bug. The bug is None if the retrieval failed and
+        False if the bug was skipped.
+        '''
+        return (id, self._get_bug(id, lock, predicate))
+
+    def _fetch_bugs(self, ids, threads, predicate=None):
+        '''Retrieve bugs using a pool of threads.
+
+        Yields tuples of the form (id, bug) as soon as each bug is retrieved.
+        The number of bugs in progress is bounded so that retrieved bugs are
+        not held on to until all bugs are retrieved.
         '''
-        bug = self._get_bug(id, lock)
-        if bug is not None:
-            bugs.put(bug, block=True)
-        else:
-            errors.put(id, block=True)
+        with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+            (ids, pending) = (iter(ids), set())
+            while True:
+                for id in ids:
+                    pending.add(executor.submit(
+                            self._fetch_bug, id, None, predicate
+                        ))
+                    if len(pending) >= threads * 2:
+                        break
+                if not pending:
+                    break
+                (done, pending) = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                for future in done:
+                    yield future.result()
+
+
+def _initialize(monorail, lock):
+    '''Keep the client of the calling process of a pool of processes.'''
+    global _monorail, _lock
+    (_monorail, _lock) = (monorail, lock)
+
+
+def _fetch_bug(id, predicate=None):
+    '''Retrieve a bug using the client of the calling process.'''
+    return _monorail._fetch_bug(id, _lock, predicate)
@@ -0,0 +1,280 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import os
+import random
+import re
+
+from nltk.tree import Tree
+
+from app.lib import files, helpers
+from app.lib.external.squinky_corpus.word import _Word
+from app.lib.nlp import (chunktagger, complexity, lemmatizer, postagger,
+                         sentenizer, stemmer, summarizer, tokenizer,
+                         tokenremover)
+from app.lib.nlp import resources as nlpresources
+from app.lib.utils import benchmark
+
+# Match a fragment of source code in a sentence.
+# E.g., foo->Bar(), base::Bind, kMaxSize = 10;, new_value, window.open(
+CODE_RE = re.compile(
+        r'[{}\[\];<>=|&]|::|->|\(\)|\b\w+_\w+\b|\b[a-z]+[A-Z]\w*\b|'
+        r'\b\w+\.\w+\('
+    )
+# Number of fragments of source code that make a sentence code-heavy
+CODE_THRESHOLD = 2
+
+# Brackets in tokens and tags escaped, as in the Penn Treebank, in a parse tree
+BRACKETS = [('(', '-LRB-'), (')', '-RRB-')]
+
+# Kinds of sentences that components are measured on
+KINDS = ['prose', 'code']
+
+# Resources loaded before components are measured so that the first call to
+# a component does not pay for loading them
+RESOURCES = ['punkt', 'tagger', 'wordnet', 'stopwords', 'chunker']
+
+
+class Sample(object):
+    """A sentence along with the input, derived from it, of each component.
+
+    The parse tree of the sentence, the input of the complexity metrics, is
+    built from the chunks of the sentence since the parse trees produced by
+    CoreNLP are not available offline. The tree has a phrase for every chunk
+    and is thus shallower than a parse tree.
+    """
+    __slots__ = ['text', 'kind', 'tokens', 'tags', 'chunks', 'tree']
+
+    def __init__(self, text, kind):
+        self.text = text
+        self.kind = kind
+        self.tokens = tokenizer.NLTKTokenizer(text).execute()
+        self.tags = postagger.PosTagger(self.tokens).execute()
+        self.chunks = chunktagger.ChunkTagger().parse(self.tags) \
+            if self.tags else list()
+        self.tree = _to_treestring(self.tags, self.chunks)
+
+
+def _tokenize(sample):
+    return tokenizer.NLTKTokenizer(sample.text).execute()
+
+
+def _sentenize(sample):
+    return sentenizer.NLTKSentenizer(sample.text).execute()
+
+
+def _lemmatize(sample):
+    return lemmatizer.NLTKLemmatizer(sample.tokens).execute()
+
+
+def _stem(sample):
+    return stemmer.Stemmer(sample.tokens).execute()
+
+
+def _tag(sample):
+    return postagger.PosTagger(sample.tokens).execute()
+
+
+def _chunk(sample):
+    return chunktagger.ChunkTagger().parse(sample.tags)
+
+
+def _summarize(sample):
+    return summarizer.Summarizer(sample.text).execute()
+
+
+def _remove(sample):
+    return tokenremover.TokenRemover(sample.tokens).execute()
+
+
+def _yngve(sample):
+    return complexity.get_mean_yngve([sample.tree])
+
+
+def _frazier(sample):
+    return complexity.get_mean_frazier([sample.tree])
+
+
+def _extract(sample):
+    features = dict()
+    for (index, (token, pos)) in enumerate(sample.tags):
+        previous = sample.tokens[index - 1] if index > 0 else None
+        next = sample.tokens[index + 1] \
+            if index + 1 < len(sample.tokens) else None
+        word = _Word(
+                token, pos, index + 1, previous, next, sample.chunks[index][1]
+            )
+        features.update(word.get_features())
+    return features
+
+
+# Name of a component -> Function that runs it on a sample
+COMPONENTS = collections.OrderedDict([
+        ('tokenizer', _tokenize),
+        ('sentenizer', _sentenize),
+        ('lemmatizer', _lemmatize),
+        ('stemmer', _stem),
+        ('postagger', _tag),
+        ('chunktagger', _chunk),
+        ('summarizer', _summarize),
+        ('tokenremover', _remove),
+        ('yngve', _yngve),
+        ('frazier', _frazier),
+        ('word', _extract)
+    ])
+
+
+def get_kind(sentence):
+    """Return 'code' if a sentence is code-heavy and 'prose' otherwise."""
+    return 'code' if len(CODE_RE.findall(sentence)) >= CODE_THRESHOLD \
+        else 'prose'
+
+
+def get_sentences(settings):
+    """
+    Return the distinct sentences in the comments and messages of the
+    reviews in the corpus, at the paths in settings, of every year in
+    settings.YEARS that has any, as a dictionary of sets keyed by kind.
+    """
+    corpus = files.Files(settings)
+    sentences = {kind: set() for kind in KINDS}
+    for year in settings.YEARS:
+        if not os.path.exists(corpus.get_reviews_path(year)):
+            continue
+        for review in corpus.get_reviews(year):
+            for text in _get_texts(review, settings.BOTS):
+                for sentence in sentenizer.NLTKSentenizer(text).execute():
+                    sentence = sentence.strip()
+                    if sentence:
+                        sentences[get_kind(sentence)].add(sentence)
+    return sentences
+
+
+def get_samples(settings, size, seed=None):
+    """Return samples of the sentences in the comments and messages of the
+    reviews in the corpus.
+
+    Parameters
+    ----------
+    settings : object
+        Settings with the paths to the corpus, e.g. django.conf.settings.
+    size : int
+        Maximum number of sentences of each of KINDS to sample.
+    seed : int, optional
+        Seed of the random number generator used to sample the sentences.
+
+    Returns
+    -------
+    samples : list
+        List of instances of Sample, ordered by kind. The sentences of a kind
+        are sampled uniformly at random without replacement.
+    """
+    sentences = get_sentences(settings)
+    generator = random.Random(seed)
+    samples = list()
+    for kind in KINDS:
+        population = sorted(sentences[kind])
+        population = generator.sample(
+                population, min(size, len(population))
+            )
+        samples.extend(Sample(sentence, kind) for sentence in population)
+    return samples
+
+
+def run(samples, components=None, repeat=1):
+    """Measure components on samples.
+
+    Every component is run once on every sample, to warm it up, before it is
+    timed. The memory allocated by a component is traced in a pass of its own
+    so that tracing does not slow down the pass that is timed.
+
+    Parameters
+    ----------
+    samples : list
+        List of instances of Sample.
+    components : list, optional
+        Names of the components to measure. Each must be a key of COMPONENTS.
+        Default is all components.
+    repeat : int, optional
+        Number of times every sample is run through a component when timed.
+
+    Returns
+    -------
+    results : collections.OrderedDict
+        Summaries, as returned by app.lib.utils.benchmark.summarize, with
+        the peak size, in bytes, of the memory allocated added as memory.
+        The summary of a component on the samples of a kind is keyed by
+        '{component}:{kind}' and on all samples by the name of the component.
+    """
+    components = list(COMPONENTS) if components is None else components
+    unknown = [name for name in components if name not in COMPONENTS]
+    if unknown:
+        raise ValueError('{} are not known components'.format(unknown))
+    nlpresources.load(RESOURCES)
+
+    kinds = [
+            (kind, [sample for sample in samples if sample.kind == kind])
+            for kind in KINDS
+        ]
+    results = collections.OrderedDict()
+    for name in components:
+        function = COMPONENTS[name]
+        for sample in samples:
+            function(sample)
+
+        latencies = list()
+        for (kind, items) in kinds:
+            if not items:
+                continue
+            _latencies = benchmark.time_calls(function, items, repeat)
+            summary = benchmark.summarize(_latencies)
+            summary['memory'] = benchmark.trace_memory(function, items)
+            results['{}:{}'.format(name, kind)] = summary
+            latencies.extend(_latencies)
+
+        summary = benchmark.summarize(latencies)
+        summary['memory'] = benchmark.trace_memory(function, samples)
+        results[name] = summary
+    return results
+
+
+def _get_texts(review, bots):
+    """
+    Yield the text, cleaned of quotes, of every message and inline comment
+    of a review that was not posted by a bot.
+    """
+    for message in review['messages']:
+        if message['sender'] not in bots:
+            yield helpers.clean(message['text'])
+    for patchset in review['patchsets'].values():
+        for file in patchset['files'].values():
+            for comment in file.get('messages') or list():
+                if comment['author_email'] not in bots:
+                    yield helpers.clean(comment['text'])
+
+
+def _to_treestring(tags, chunks):
+    """
+    Return a parse tree, in the bracketed notation, with a phrase for every
+    chunk of a sentence given its part-of-speech tags and IOB chunk tags.
+    """
+    (phrases, phrase) = (list(), None)
+    for ((token, pos), (_, chunk)) in zip(tags, chunks):
+        for (bracket, escaped) in BRACKETS:
+            (token, pos) = (
+                    token.replace(bracket, escaped),
+                    pos.replace(bracket, escaped)
+                )
+        leaf = Tree(pos, [token])
+        if chunk is not None and chunk.startswith('I-') and \
+                phrase is not None and phrase.label() == chunk[2:]:
+            phrase.append(leaf)
+        elif chunk is not None and chunk[:2] in ['B-', 'I-']:
+            phrase = Tree(chunk[2:], [leaf])
+            phrases.append(phrase)
+        else:
+            phrase = None
+            phrases.append(leaf)
+    return ' '.join(str(Tree('ROOT', [Tree('S', phrases)])).split())
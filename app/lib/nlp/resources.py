@@ -0,0 +1,86 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import importlib
+import time
+
+
+def _load_punkt():
+    import nltk
+    nltk.data.load('tokenizers/punkt/english.pickle')
+
+
+def _load_tagger():
+    # The model loaded is cached by nltk.data so that taggers created by
+    # nltk.pos_tag do not load it again
+    from nltk.tag.perceptron import PerceptronTagger
+    PerceptronTagger()
+
+
+def _load_wordnet():
+    from nltk.stem import WordNetLemmatizer
+    WordNetLemmatizer().lemmatize('loaded')
+
+
+def _load_stopwords():
+    from nltk.corpus import stopwords
+    stopwords.words('english')
+
+
+def _load_chunker():
+    # The chunk tagger is trained when its module is imported
+    importlib.import_module('app.lib.nlp.chunktagger')
+
+
+def _load_cmudict():
+    from app.lib.nlp import syllables
+    syllables.get_counter()
+
+
+# Name of a resource -> Function that loads it into the calling process
+RESOURCES = collections.OrderedDict([
+        ('punkt', _load_punkt),
+        ('tagger', _load_tagger),
+        ('wordnet', _load_wordnet),
+        ('stopwords', _load_stopwords),
+        ('chunker', _load_chunker),
+        ('cmudict', _load_cmudict)
+    ])
+
+_loaded = set()
+
+
+def load(names):
+    """
+    Load NLP resources into the calling process. A resource is loaded once;
+    loading it again does nothing.
+
+    Resources that are loaded in a process before it forks are shared, copy on
+    write, with its children, which do not have to load them again.
+
+    Parameters
+    ----------
+    names : list
+        Names of the resources to load. Each must be a key of RESOURCES.
+
+    Returns
+    -------
+    times : collections.OrderedDict
+        The number of seconds taken to load each resource that was not loaded
+        before, keyed by the name of the resource.
+    """
+    unknown = [name for name in names if name not in RESOURCES]
+    if unknown:
+        raise ValueError('{} are not known resources'.format(unknown))
+
+    times = collections.OrderedDict()
+    for name in names:
+        if name in _loaded:
+            continue
+        begin = time.time()
+        RESOURCES[name]()
+        times[name] = time.time() - begin
+        _loaded.add(name)
+    return times
@@ -0,0 +1,215 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import difflib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from splat.complexity import levenshtein_distance
+from splat.corpora import CMUDICT
+
+VOWELS_RE = re.compile(r'[aeiouy]')
+
+# Arguments of difflib.get_close_matches used to find the closest word in the
+# dictionary to a word that is not in it
+NUM_MATCHES = 5
+CUTOFF = 0.6
+
+# Word whose pronunciation is used for a word that has no close match
+FALLBACK = 'to'
+
+# Name of the file, in settings.NLP_CACHE_PATH, in which the closest match to
+# each word that is not in the dictionary is remembered
+CACHE_FILENAME = 'syllables.json'
+
+# Number of new words that are remembered before the cache is saved
+SAVE_INTERVAL = 1000
+
+_counter = None
+
+
+class SyllableCounter(object):
+    """Counts syllables in words using the CMU Pronouncing Dictionary.
+
+    The count for a word is the number of stressed phonemes in its
+    pronunciation. A word that is not in the dictionary is given the
+    pronunciation of its closest match, i.e. the match, among the matches
+    difflib.get_close_matches finds, that has the smallest Levenshtein
+    distance to it.
+
+    The number of stressed phonemes in the pronunciations of every word in the
+    dictionary is computed once. The closest match to a word that is not in the
+    dictionary is found by comparing the word with only the words in the
+    dictionary that difflib would not discard using its quick_ratio, an upper
+    bound on the similarity computed from the number of characters the words
+    have in common. The character counts of every word in the dictionary are
+    held in a matrix so that the bound is computed for all of them at once.
+    The counts are thus identical to those found by comparing the word with
+    every word in the dictionary. Closest matches are remembered and may be
+    saved to a file so that they are not found again.
+    """
+    def __init__(self, dictionary=None, path=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        dictionary : dict, optional
+            Mapping of a word to a list of its pronunciations, each a list of
+            phonemes. Default is the CMU Pronouncing Dictionary.
+        path : str, optional
+            Path to a JSON file in which the closest matches to words that are
+            not in the dictionary are remembered. Matches in an existing file
+            are reused.
+        """
+        dictionary = CMUDICT if dictionary is None else dictionary
+        self.path = path
+
+        # Word -> (number of stressed phonemes, number of pronunciations)
+        self.table = dict()
+        for (word, pronunciations) in dictionary.items():
+            stresses = max(
+                    len([p for p in pronunciation if p[-1].isdigit()])
+                    for pronunciation in pronunciations
+                )
+            self.table[word] = (stresses, len(pronunciations))
+
+        self.words = sorted(self.table)
+        characters = sorted(set(''.join(self.words)))
+        self._characters = {c: i for (i, c) in enumerate(characters)}
+        self._lengths = np.array([len(word) for word in self.words])
+        self._counts = np.zeros(
+                (len(self.words), len(characters)), dtype=np.int16
+            )
+        for (index, word) in enumerate(self.words):
+            for character in word:
+                self._counts[index, self._characters[character]] += 1
+
+        self.matches = dict()
+        self._unsaved = 0
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as file:
+                self.matches = json.load(file)
+
+    def count(self, token):
+        """Return the number of syllables in a token.
+
+        Parameters
+        ----------
+        token : str
+            Word whose syllables are counted.
+
+        Returns
+        -------
+        count : int
+            Number of syllables in the token.
+        """
+        word = token.strip('\n').lower()
+        entry = self.table.get(word)
+        if entry is None:
+            entry = self.table[self.get_match(word)]
+        (stresses, variants) = entry
+        if len(VOWELS_RE.findall(word)) == 1 and variants > 1:
+            return 1
+        return stresses
+
+    def counts(self, tokens):
+        """Return the number of syllables in each token of a list."""
+        return [self.count(token) for token in tokens]
+
+    def total(self, tokens):
+        """Return the number of syllables in all tokens of a list."""
+        return sum(self.counts(tokens))
+
+    def get_match(self, word):
+        """Return the word in the dictionary closest to a word not in it.
+
+        Parameters
+        ----------
+        word : str
+            Lowercase word that is not in the dictionary.
+
+        Returns
+        -------
+        match : str
+            The closest word in the dictionary or FALLBACK when the word has no
+            vowels or no close match.
+        """
+        match = self.matches.get(word)
+        if match is not None:
+            return match
+
+        match = FALLBACK
+        if VOWELS_RE.search(word) is not None:
+            matches = difflib.get_close_matches(
+                    word, self._get_candidates(word), NUM_MATCHES, CUTOFF
+                )
+            if matches:
+                distances = [levenshtein_distance(m, word) for m in matches]
+                match = matches[distances.index(min(distances))]
+
+        self.matches[word] = match
+        self._unsaved += 1
+        if self.path is not None and self._unsaved >= SAVE_INTERVAL:
+            self.save()
+        return match
+
+    def save(self):
+        """
+        Save the closest matches to the file at path, merging them with those
+        saved by other processes since the file was read.
+        """
+        if self.path is None or self._unsaved == 0:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                for (word, match) in json.load(file).items():
+                    self.matches.setdefault(word, match)
+        (descriptor, temppath) = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(self.matches, file)
+        os.replace(temppath, self.path)
+        self._unsaved = 0
+
+    def _get_candidates(self, word):
+        """
+        Return the words in the dictionary whose quick_ratio with word is at
+        least CUTOFF. The ratio is computed exactly as difflib computes it.
+        """
+        counts = np.zeros(len(self._characters), dtype=np.int16)
+        for character in word:
+            index = self._characters.get(character)
+            if index is not None:
+                counts[index] += 1
+        matches = np.minimum(self._counts, counts).sum(axis=1)
+        ratios = 2.0 * matches / (self._lengths + len(word))
+        return [self.words[i] for i in np.flatnonzero(ratios >= CUTOFF)]
+
+
+def get_counter():
+    """
+    Return the SyllableCounter of the calling process, creating it on first
+    use, with closest matches remembered in settings.NLP_CACHE_PATH.
+    """
+    global _counter
+    if _counter is None:
+        from django.conf import settings
+        path = os.path.join(settings.NLP_CACHE_PATH, CACHE_FILENAME)
+        _counter = SyllableCounter(path=path)
+    return _counter
+
+
+def save():
+    """
+    Save the closest matches remembered by the SyllableCounter of the calling
+    process, if it was created.
+    """
+    if _counter is not None:
+        _counter.save()
@@ -3,7 +3,6 @@
 @AUTHOR: meyersbs
 """
 
-import multiprocessing
 import sys
 import traceback
 
@@ -92,10 +91,7 @@ def compute(review_ids, idf, num_procs, key='lemma'):
     KEY = key
 
     iqueue = parallel.manager.Queue()
-    proc = multiprocessing.Process(
-            target=stream, args=(review_ids, iqueue, num_procs)
-        )
-    proc.start()
+    proc = parallel.spawn(target=stream, args=(review_ids, iqueue, num_procs))
     tfidfs = parallel.run(do, aggregate, iqueue, num_procs)
     proc.join()
 
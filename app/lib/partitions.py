@@ -0,0 +1,314 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+from django.db import connection, transaction
+
+# Tables that are partitioned by the year in which the review was created
+TABLES = ['sentence', 'token']
+
+# Declarative partitioning with a DEFAULT partition and a primary key on the
+# partitioned table requires PostgreSQL 11
+MINIMUM_VERSION = 110000
+
+VIEWS = {
+        'vw_review_token': 'token',
+        'vw_review_lemma': 'lemma',
+    }
+
+
+def get_partition(table, year):
+    """Return the name of the partition of a table that holds a year.
+
+    Parameters
+    ----------
+    table : str
+        Name of the partitioned table. Must be one of TABLES.
+    year : int
+        Year in which the reviews whose rows the partition holds were created.
+
+    Returns
+    -------
+    partition : str
+        Name of the partition.
+    """
+    if table not in TABLES:
+        raise ValueError('{} is not a partitioned table'.format(table))
+    return '{}_{}'.format(table, year)
+
+
+def get_partitions(table):
+    """Return the names of the partitions of a table.
+
+    Parameters
+    ----------
+    table : str
+        Name of the table.
+
+    Returns
+    -------
+    partitions : list
+        Names of the partitions of the table sorted by name. The list is empty
+        when the table is not partitioned.
+    """
+    query = '''
+        SELECT c.relname
+        FROM pg_inherits i
+          JOIN pg_class c ON c.oid = i.inhrelid
+          JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+        ORDER BY c.relname;
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(query, [table])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def is_partitioned(table, cursor=None):
+    """Return True if the table is a partitioned table, False otherwise."""
+    query = '''
+        SELECT COUNT(*) FROM pg_partitioned_table pt
+          JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = %s;
+    '''
+    if _get_version(cursor) < MINIMUM_VERSION:
+        return False
+    if cursor is None:
+        with connection.cursor() as cursor:
+            cursor.execute(query, [table])
+            return cursor.fetchone()[0] == 1
+    cursor.execute(query, [table])
+    return cursor.fetchone()[0] == 1
+
+
+def create(year):
+    """Create the partitions, of all partitioned tables, for a year.
+
+    Rows for a year that does not have a partition of its own are routed to
+    the default partition. Rows in the default partition that belong to the
+    year are moved to the partition created.
+
+    Parameters
+    ----------
+    year : int
+        Year for which the partitions must be created.
+
+    Returns
+    -------
+    created : list
+        Names of the partitions created.
+    """
+    created = list()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in TABLES:
+            if not is_partitioned(table, cursor):
+                continue
+            partition = get_partition(table, year)
+            if partition in get_partitions(table):
+                continue
+            default = get_partition(table, 'default')
+            cursor.execute(
+                    'CREATE TEMPORARY TABLE _{0} ON COMMIT DROP AS '
+                    'SELECT * FROM {1} WHERE year = %s;'.format(
+                        partition, default
+                    ),
+                    [year]
+                )
+            cursor.execute(
+                    'DELETE FROM {} WHERE year = %s;'.format(default), [year]
+                )
+            cursor.execute(
+                    'CREATE TABLE {} PARTITION OF {} FOR VALUES IN (%s);'
+                    .format(partition, table), [year]
+                )
+            cursor.execute(
+                    'INSERT INTO {0} SELECT * FROM _{0};'.format(partition)
+                )
+            created.append(partition)
+    return created
+
+
+def truncate(year):
+    """Remove all sentences and tokens from reviews created in a year.
+
+    When the tables are partitioned, the partitions holding the year are
+    truncated instead of deleting the rows one at a time. The associations
+    between comments/messages and the sentences removed are deleted in both
+    cases.
+
+    Parameters
+    ----------
+    year : int
+        Year whose sentences and tokens must be removed.
+
+    Returns
+    -------
+    truncated : bool
+        True if the partitions were truncated, False if the rows were deleted.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in ['comment_sentences', 'message_sentences']:
+            cursor.execute(
+                    'DELETE FROM {} WHERE sentence_id IN '
+                    '(SELECT id FROM sentence WHERE year = %s);'.format(table),
+                    [year]
+                )
+
+        partitions = {table: get_partitions(table) for table in TABLES}
+        partitioned = all(
+                get_partition(table, year) in partitions[table]
+                for table in TABLES
+            )
+        if partitioned:
+            cursor.execute('TRUNCATE {};'.format(', '.join(
+                    get_partition(table, year) for table in TABLES
+                )))
+        else:
+            for table in reversed(TABLES):
+                cursor.execute(
+                        'DELETE FROM {} WHERE year = %s;'.format(table), [year]
+                    )
+    return partitioned
+
+
+def partition(cursor, years):
+    """Convert the sentence and token tables into partitioned tables.
+
+    The materialized views that depend on the tables are dropped and recreated
+    because a table with dependent views cannot be replaced. The conversion is
+    skipped if the server does not support declarative partitioning.
+
+    Parameters
+    ----------
+    cursor : object
+        Cursor to the database.
+    years : list
+        Years for which a partition must be created. Rows for any other year
+        are routed to a default partition.
+
+    Returns
+    -------
+    partitioned : bool
+        True if the tables were partitioned, False otherwise.
+    """
+    if _get_version(cursor) < MINIMUM_VERSION:
+        return False
+
+    _drop_views(cursor)
+    for table in TABLES:
+        if is_partitioned(table, cursor):
+            continue
+        indexes = _get_indexes(cursor, table)
+        cursor.execute('ALTER TABLE {0} RENAME TO _{0};'.format(table))
+        cursor.execute(
+                'CREATE TABLE {0} (LIKE _{0} INCLUDING DEFAULTS) '
+                'PARTITION BY LIST (year);'.format(table)
+            )
+        cursor.execute('ALTER TABLE {} ADD PRIMARY KEY (id, year);'.format(
+                table
+            ))
+        for year in years:
+            cursor.execute(
+                    'CREATE TABLE {} PARTITION OF {} FOR VALUES IN (%s);'
+                    .format(get_partition(table, year), table), [year]
+                )
+        cursor.execute('CREATE TABLE {} PARTITION OF {} DEFAULT;'.format(
+                get_partition(table, 'default'), table
+            ))
+        _replace(cursor, table, indexes)
+    _create_views(cursor)
+
+    return True
+
+
+def unpartition(cursor):
+    """Convert the sentence and token tables back into regular tables."""
+    if _get_version(cursor) < MINIMUM_VERSION:
+        return False
+
+    _drop_views(cursor)
+    for table in TABLES:
+        if not is_partitioned(table, cursor):
+            continue
+        indexes = _get_indexes(cursor, table)
+        cursor.execute('ALTER TABLE {0} RENAME TO _{0};'.format(table))
+        cursor.execute(
+                'CREATE TABLE {0} (LIKE _{0} INCLUDING DEFAULTS);'.format(
+                    table
+                )
+            )
+        cursor.execute('ALTER TABLE {} ADD PRIMARY KEY (id);'.format(table))
+        _replace(cursor, table, indexes)
+    _create_views(cursor)
+
+    return True
+
+
+# Private Members
+
+def _create_views(cursor):
+    for (view, column) in VIEWS.items():
+        cursor.execute(
+                'CREATE MATERIALIZED VIEW {0} AS '
+                'SELECT DISTINCT ON (t.{1}, m.review_id) '
+                '   nextval(\'{0}_id_seq\'::regclass) AS id, '
+                '   t.{1}, m.review_id '
+                'FROM token t '
+                '   JOIN sentence s ON s.id = t.sentence_id '
+                '   JOIN message_sentences ms ON ms.sentence_id = s.id '
+                '   JOIN message m ON ms.message_id = m.id;'.format(
+                    view, column
+                )
+            )
+        cursor.execute(
+                'CREATE UNIQUE INDEX {0}_id ON {0} USING btree (id);'.format(
+                    view
+                )
+            )
+        cursor.execute(
+                'CREATE INDEX {0}_review_id ON {0} USING btree (review_id);'
+                .format(view)
+            )
+        cursor.execute(
+                'CREATE INDEX {0}_{1} ON {0} USING btree ({1});'.format(
+                    view, column
+                )
+            )
+
+
+def _drop_views(cursor):
+    for view in VIEWS:
+        cursor.execute('DROP MATERIALIZED VIEW IF EXISTS {};'.format(view))
+
+
+def _get_indexes(cursor, table):
+    """Return definition of all indexes, except the primary key, on a table."""
+    query = '''
+        SELECT i.indexdef
+        FROM pg_indexes i
+          LEFT JOIN pg_constraint c ON c.conname = i.indexname
+        WHERE i.tablename = %s AND c.conname IS NULL;
+    '''
+    cursor.execute(query, [table])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _get_version(cursor=None):
+    if cursor is None:
+        return connection.pg_version
+    return cursor.connection.server_version
+
+
+def _replace(cursor, table, indexes):
+    """Move rows from the renamed table to the new table and drop the former.
+
+    The sequence that generates the identifiers is owned by the renamed table
+    and would be dropped with it unless its ownership is transferred first.
+    The indexes are recreated after the renamed table is dropped so that they
+    retain their names.
+    """
+    cursor.execute('INSERT INTO {0} SELECT * FROM _{0};'.format(table))
+    cursor.execute('ALTER SEQUENCE {0}_id_seq OWNED BY {0}.id;'.format(table))
+    cursor.execute('DROP TABLE _{};'.format(table))
+    for index in indexes:
+        cursor.execute(index)
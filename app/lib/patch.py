@@ -1,3 +1,5 @@
+import bisect
+import collections
 import re
 
 import warnings
@@ -7,6 +9,9 @@ from app.lib import helpers
 
 HUNK_REGEX = re.compile(r'@@ -([\d]*),([\d]*) \+([\d]*),([\d]*) @@')
 
+# Maximum number of parsed patches kept by the cache used by get_patch
+CACHE_SIZE = 1024
+
 
 class Chunk(object):
     """
@@ -25,6 +30,8 @@ class Chunk(object):
            the new file.
         D: The number of lines in the Chunk with respect to the new file.
     """
+    __slots__ = ('raw_hunk', 'hunk', 'lines')
+
     def __init__(self, chunk_lines):
         """
         The first element in the given chunk_lines is the Hunk line, which is
@@ -54,6 +61,13 @@ class Chunk(object):
     def get_lines(self):
         return self.lines
 
+    def get_range(self):
+        """
+        Returns a tuple (first, last) of the line numbers, with respect to the
+        new file, of the first and last lines in the Chunk.
+        """
+        return (self.hunk[2], self.hunk[2] + len(self.lines) - 1)
+
     def __parse_hunk(self, raw_hunk):
         hunk_list = list(HUNK_REGEX.search(raw_hunk).groups())
         return list(map(int, hunk_list))
@@ -63,7 +77,15 @@ class Patch(object):
     """
     A Patch is a collection of Chunks. The start of each Chunk is denoted by
     a Hunk of the form: @@ -A,B + C,D @@.
+
+    The Chunks are indexed by the range of line numbers they span, so that the
+    Chunk containing a line is found by a binary search, and by their base
+    Hunk.
     """
+    __slots__ = (
+            'patch', 'lines', 'chunks', '_starts', '_ends', '_base_hunks'
+        )
+
     def __init__(self, patch_str):
         self.patch = patch_str
 
@@ -85,6 +107,8 @@ class Patch(object):
                 temp.append(line)
         self.chunks.append(Chunk(temp))
 
+        self.__index()
+
     def get_patch(self):
         return self.patch
 
@@ -98,7 +122,86 @@ class Patch(object):
         return [h.get_hunk() for h in self.chunks]
 
     def get_chunk_by_line(self, line_number):
-        for chunk in self.chunks:
-            if line_number in chunk.get_lines().keys():
-                return chunk
+        if self._starts is None:
+            for chunk in self.chunks:
+                if line_number in chunk.get_lines().keys():
+                    return chunk
+            return None
+
+        index = bisect.bisect_right(self._starts, line_number) - 1
+        if index >= 0 and line_number <= self._ends[index]:
+            return self.chunks[index]
         return None
+
+    def get_chunk_by_base_hunk(self, base_hunk):
+        """
+        Returns the first Chunk whose base Hunk, i.e. [A, B], is base_hunk or
+        None if there is no such Chunk.
+        """
+        return self._base_hunks.get(tuple(base_hunk))
+
+    def __index(self):
+        """
+        Index the Chunks by the range of line numbers they span and by their
+        base Hunk. When the ranges are not in ascending order or overlap, as
+        they do not in a well-formed patch, the Chunks are not indexed by
+        their range and are scanned for a line instead.
+        """
+        self._base_hunks = dict()
+        for chunk in self.chunks:
+            self._base_hunks.setdefault(tuple(chunk.get_base_hunk()), chunk)
+
+        ranges = [chunk.get_range() for chunk in self.chunks]
+        (self._starts, self._ends) = (None, None)
+        if all(a[1] < b[0] for (a, b) in zip(ranges, ranges[1:])):
+            self._starts = [first for (first, _) in ranges]
+            self._ends = [last for (_, last) in ranges]
+
+
+class PatchCache(object):
+    """
+    A least recently used cache of parsed Patches.
+    """
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._patches = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._patches)
+
+    def get(self, patch_str, key=None):
+        """
+        Returns the Patch parsed from patch_str. The Patch is cached using key,
+        e.g. the identifier of the patch, or patch_str itself when key is not
+        specified.
+        """
+        key = patch_str if key is None else key
+        patch = self._patches.get(key)
+        if patch is not None:
+            self.hits += 1
+            self._patches.move_to_end(key)
+            return patch
+
+        self.misses += 1
+        patch = Patch(patch_str)
+        self._patches[key] = patch
+        if len(self._patches) > self.size:
+            self._patches.popitem(last=False)
+        return patch
+
+    def clear(self):
+        (self.hits, self.misses) = (0, 0)
+        self._patches.clear()
+
+
+cache = PatchCache()
+
+
+def get_patch(patch_str, key=None):
+    """
+    Returns the Patch parsed from patch_str, parsing it only if it is not in
+    the cache. See PatchCache.get.
+    """
+    return cache.get(patch_str, key)
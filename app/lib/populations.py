@@ -0,0 +1,250 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.functions import ExtractYear
+
+from app.models import *
+
+# Populations of code reviews
+#   all      All code reviews
+#   fixed    Code reviews that fixed a vulnerability
+#   missed   Code reviews that missed a vulnerability
+#   neutral  Code reviews that neither fixed nor missed a vulnerability
+#   fm       Code reviews that fixed or missed a vulnerability
+#   nf       Code reviews that did not miss a vulnerability
+#   nm       Code reviews that did not fix a vulnerability
+POPULATIONS = ['all', 'fixed', 'missed', 'neutral', 'fm', 'nf', 'nm']
+
+# Tables whose content determine the populations. The fingerprint has the
+# number of rows in each table and a checksum of the columns of the rows that
+# the populations are derived from, so that inserting, deleting or updating
+# rows changes the fingerprint, which invalidates the cached populations.
+FINGERPRINT_QUERY = '''
+    SELECT
+      (SELECT COUNT(*) FROM review),
+      (SELECT COALESCE(SUM(hashtext(
+          id || ':' || created || ':' || missed_vulnerability
+        )), 0) FROM review),
+      (SELECT COUNT(*) FROM message),
+      (SELECT COALESCE(SUM(hashtext(
+          id || ':' || review_id || ':' || posted
+        )), 0) FROM message),
+      (SELECT COUNT(*) FROM review_bug),
+      (SELECT COALESCE(SUM(hashtext(
+          review_id || ':' || bug_id
+        )), 0) FROM review_bug),
+      (SELECT COUNT(*) FROM vulnerability_bug),
+      (SELECT COALESCE(SUM(hashtext(
+          vulnerability_id || ':' || bug_id
+        )), 0) FROM vulnerability_bug);
+'''
+
+
+class Registry(object):
+    """Registry of the identifiers of code reviews and messages in each
+    population.
+
+    The identifiers are stored as sorted arrays of 64-bit integers so that the
+    populations may be derived from one another through set operations. The
+    arrays are persisted to disk along with a fingerprint of the database and
+    are reused until the fingerprint changes.
+    """
+    def __init__(self, path=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the directory in which the populations are persisted. The
+            populations are only held in memory when the path is None.
+        """
+        self.path = path
+        self._arrays = None
+        self._fingerprint = None
+
+    def clear(self):
+        """Discard the populations held in memory.
+
+        The fingerprint is recomputed on the next access and the populations
+        are reloaded from disk, or the database, accordingly.
+        """
+        self._arrays = None
+        self._fingerprint = None
+
+    def get_fingerprint(self):
+        """Return the fingerprint of the database.
+
+        Returns
+        -------
+        fingerprint : numpy.ndarray
+            An array of counts and checksums of the tables that the
+            populations are derived from. The fingerprint is computed once and
+            reused until the registry is cleared.
+        """
+        if self._fingerprint is None:
+            with connection.cursor() as cursor:
+                cursor.execute(FINGERPRINT_QUERY)
+                self._fingerprint = np.array(cursor.fetchone(), dtype=np.int64)
+        return self._fingerprint
+
+    def get_reviews(self, population):
+        """Return the identifiers of code reviews in a population.
+
+        Parameters
+        ----------
+        population : str
+            Name of the population. Must be one of POPULATIONS or a year.
+
+        Returns
+        -------
+        ids : numpy.ndarray
+            Sorted array of code review identifiers.
+        """
+        arrays = self._get_arrays()
+        if population in POPULATIONS:
+            return arrays['reviews_{}'.format(population)]
+        year = self._to_year(population)
+        return arrays['reviews'][arrays['reviews_year'] == year]
+
+    def get_messages(self, population):
+        """Return the identifiers of messages in a population.
+
+        The messages in a population are the messages posted in the code
+        reviews in the population. The messages in a year, however, are the
+        messages posted in that year.
+
+        Parameters
+        ----------
+        population : str
+            Name of the population. Must be one of POPULATIONS or a year.
+
+        Returns
+        -------
+        ids : numpy.ndarray
+            Sorted array of message identifiers.
+        """
+        arrays = self._get_arrays()
+        if population == 'all':
+            return arrays['messages']
+        if population in POPULATIONS:
+            reviews = self.get_reviews(population)
+            mask = _contains(reviews, arrays['messages_review'])
+            return arrays['messages'][mask]
+        year = self._to_year(population)
+        return arrays['messages'][arrays['messages_year'] == year]
+
+    # Private Members
+
+    def _get_arrays(self):
+        fingerprint = self.get_fingerprint()
+        if self._arrays is not None:
+            return self._arrays
+
+        arrays = self._load(fingerprint)
+        if arrays is None:
+            arrays = self._compute()
+            self._save(fingerprint, arrays)
+        self._arrays = arrays
+
+        return self._arrays
+
+    def _compute(self):
+        reviews = Review.objects.order_by('id') \
+                        .annotate(year=ExtractYear('created')) \
+                        .values_list('id', 'year', 'missed_vulnerability')
+        (ids, years, missed) = _to_arrays(reviews, 3)
+        missed = ids[missed.astype(np.bool_)]
+        fixed = VulnerabilityBug.objects \
+                                .exclude(bug__review__id__exact=None) \
+                                .values_list('bug__review__id', flat=True)
+        fixed = np.unique(np.fromiter(fixed, dtype=np.int64))
+
+        arrays = dict()
+        arrays['reviews'] = ids
+        arrays['reviews_year'] = years
+        arrays['reviews_all'] = ids
+        arrays['reviews_fixed'] = fixed
+        arrays['reviews_missed'] = missed
+        arrays['reviews_neutral'] = np.setdiff1d(
+                np.setdiff1d(ids, fixed, assume_unique=True), missed,
+                assume_unique=True
+            )
+        arrays['reviews_fm'] = np.union1d(fixed, missed)
+        arrays['reviews_nf'] = np.setdiff1d(ids, missed, assume_unique=True)
+        arrays['reviews_nm'] = np.setdiff1d(ids, fixed, assume_unique=True)
+
+        messages = Message.objects.order_by('id') \
+                          .annotate(year=ExtractYear('posted')) \
+                          .values_list('id', 'review_id', 'year')
+        (ids, reviews, years) = _to_arrays(messages, 3)
+        arrays['messages'] = ids
+        arrays['messages_review'] = reviews
+        arrays['messages_year'] = years
+
+        return arrays
+
+    def _get_filepath(self):
+        name = connection.settings_dict['NAME']
+        return os.path.join(self.path, '{}.npz'.format(name))
+
+    def _load(self, fingerprint):
+        if self.path is None:
+            return None
+        filepath = self._get_filepath()
+        if not os.path.exists(filepath):
+            return None
+        with np.load(filepath) as file:
+            if not np.array_equal(file['fingerprint'], fingerprint):
+                return None
+            return {
+                    key: file[key] for key in file.files
+                    if key != 'fingerprint'
+                }
+
+    def _save(self, fingerprint, arrays):
+        if self.path is None:
+            return
+        if not os.path.exists(self.path):
+            os.makedirs(self.path, mode=0o755)
+        # Write to a temporary file first so that a concurrent reader never
+        # sees a partially written file
+        (handle, temppath) = tempfile.mkstemp(suffix='.npz', dir=self.path)
+        with os.fdopen(handle, 'wb') as file:
+            np.savez(file, fingerprint=fingerprint, **arrays)
+        os.replace(temppath, self._get_filepath())
+
+    def _to_year(self, population):
+        years = [str(i) for i in range(2008, 2017)]
+        if population not in years:
+            raise ValueError('{} is not a known population'.format(population))
+        return int(population)
+
+
+def _contains(ids, values):
+    """
+    Return a boolean array that is True where a value is in a sorted array of
+    identifiers. Unlike numpy.in1d or numpy.isin, binary search is available
+    in every version of numpy.
+    """
+    if ids.size == 0:
+        return np.zeros(values.shape, dtype=np.bool_)
+    index = np.minimum(np.searchsorted(ids, values), ids.size - 1)
+    return ids[index] == values
+
+
+def _to_arrays(queryset, width):
+    """Transpose a list of tuples into a tuple of 64-bit integer arrays."""
+    rows = np.array(list(queryset), dtype=np.int64).reshape(-1, width)
+    return tuple(rows[:, i].copy() for i in range(width))
+
+
+registry = Registry(settings.POPULATIONS_PATH)
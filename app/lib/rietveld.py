@@ -64,16 +64,23 @@ class Rietveld(object):
         Get all of the reviews associated with the specified IDs. Return a
         tuple of the form: ([rev1, rev2,...revN], [err1, err2,...errN])
         """
-        manager = multiprocessing.Manager()
-        reviews = manager.Queue(len(ids))
-        errors = manager.Queue()
+        (reviews, errors) = (list(), list())
+        self.crawl(ids, processes, reviews.append, errors.append)
+        return (reviews, errors)
 
+    def crawl(self, ids, processes, on_review, on_error):
+        """
+        Get the reviews associated with the specified IDs and hand each over,
+        in the calling process, to on_review as soon as it is retrieved. The
+        IDs of reviews that could not be retrieved are handed over to
+        on_error.
+        """
         with multiprocessing.Pool(processes) as pool:
-            pool.starmap(
-                    self._put_review, [(id, reviews, errors) for id in ids]
-                )
-
-        return (to_list(reviews), to_list(errors))
+            for (rid, review) in pool.imap_unordered(self._get_review, ids):
+                if review is False:
+                    on_error(rid)
+                elif review is not None:
+                    on_review(review)
 
     def _get_ids(self, parameters):
         """
@@ -101,11 +108,12 @@ class Rietveld(object):
 
         return (status, ids, cursor)
 
-    def _put_review(self, rid, reviews, errors):
+    def _get_review(self, rid):
         """
-        Grab the review associated with the specified ID, create a dictionary
-        of patchsets associated with that review, and append the review with
-        its patchsets to the specified list of reviews.
+        Grab the review associated with the specified ID and embed in it a
+        dictionary of patchsets associated with that review. Return a tuple
+        of the form (rid, review), where review is None if the review has no
+        patchsets and False if the review could not be retrieved.
         """
         url = REVIEW_URL.format(rid=rid)
         debug(url)
@@ -118,21 +126,18 @@ class Rietveld(object):
                     if status == 0:
                         patchsets[psid] = patchset
                     else:
-                        patchsets = None
-                        errors.put(rid, block=True)
-                        break
-
-                if patchsets is not None and len(patchsets) > 0:
-                    review['patchsets'] = patchsets
-                    reviews.put(review, block=True)
+                        return (rid, False)
 
                 sleep(seconds=10)
+                if len(patchsets) == 0:
+                    return (rid, None)
+                review['patchsets'] = patchsets
+                return (rid, review)
             else:
                 error('[HTTP {}] {}'.format(scode, url))
-                errors.put(rid, block=True)
         except exceptions.RequestException as exception: # pragma: no cover
             error('{}\n{}'.format(exception.request.url, exception))
-            errors.put(rid, block=True)
+        return (rid, False)
 
     def _get_patchset(self, rid, psid):
         """
@@ -0,0 +1,143 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import math
+import random
+
+import numpy as np
+
+from django.db import connection
+
+# Sampling methods supported by PostgreSQL's TABLESAMPLE clause
+METHODS = ['BERNOULLI', 'SYSTEM']
+
+
+def sample(ids, size, seed=None):
+    """Draw a simple random sample, without replacement, of identifiers.
+
+    Only the positions of the identifiers sampled are drawn, so the cost of
+    drawing a sample is proportional to the size of the sample and not the
+    size of the population.
+
+    Parameters
+    ----------
+    ids : numpy.ndarray or list
+        Identifiers to sample from.
+    size : int
+        Number of identifiers to sample. Samples as large as the population
+        are truncated to the size of the population.
+    seed : int or str, optional
+        Seed of the random number generator. The same sample is drawn every
+        time the same seed is used on the same identifiers. A different sample
+        is drawn every time when the seed is None.
+
+    Returns
+    -------
+    sample : numpy.ndarray
+        Sorted array of the identifiers sampled.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    size = max(0, min(int(size), ids.size))
+    positions = random.Random(seed).sample(range(ids.size), size)
+    return np.sort(ids[np.array(positions, dtype=np.int64)])
+
+
+def sample_fraction(ids, rand, seed=None):
+    """Draw a random sample of 1/rand of the identifiers.
+
+    Parameters
+    ----------
+    ids : numpy.ndarray or list
+        Identifiers to sample from.
+    rand : float
+        Inverse of the fraction of identifiers to sample. For instance, a
+        value of 2 samples half of the identifiers.
+    seed : int or str, optional
+        Seed of the random number generator.
+
+    Returns
+    -------
+    sample : numpy.ndarray
+        Sorted array of the identifiers sampled.
+    """
+    return sample(ids, math.floor(len(ids) / rand), seed=seed)
+
+
+def stratify(strata, rand, seed=None):
+    """Draw a stratified random sample of identifiers.
+
+    A fraction, 1/rand, of the identifiers in each stratum is sampled
+    independently. The random number generator for a stratum is seeded with
+    the seed and the name of the stratum, so the sample drawn from a stratum
+    does not depend on the other strata.
+
+    Parameters
+    ----------
+    strata : dict
+        A dictionary with the name of the stratum as key and the identifiers
+        in the stratum as value.
+    rand : float
+        Inverse of the fraction of identifiers to sample from each stratum.
+    seed : int or str, optional
+        Seed of the random number generator.
+
+    Returns
+    -------
+    sample : numpy.ndarray
+        Sorted array of the identifiers sampled from all strata. Identifiers
+        that appear in more than one stratum appear at most once.
+    """
+    samples = [np.array([], dtype=np.int64)]
+    for name in sorted(strata):
+        _seed = None if seed is None else '{}:{}'.format(seed, name)
+        samples.append(sample_fraction(strata[name], rand, seed=_seed))
+    return np.unique(np.concatenate(samples))
+
+
+def tablesample(table, percent, seed, ids=None, method='BERNOULLI'):
+    """Sample rows of a table using PostgreSQL's TABLESAMPLE clause.
+
+    The sampling happens in the database, so neither the table nor the
+    population is sorted or transferred to draw the sample. The size of the
+    sample is approximately, not exactly, the percentage of rows specified.
+
+    Parameters
+    ----------
+    table : str
+        Name of the table to sample. The table must have an id column.
+    percent : float
+        Percentage, between 0 and 100, of rows to sample.
+    seed : int
+        Seed used in the REPEATABLE clause. The same rows are sampled every
+        time the same seed is used as long as the table does not change.
+    ids : numpy.ndarray or list, optional
+        If specified, only rows whose id is in the list are sampled.
+    method : str, optional
+        Sampling method. BERNOULLI samples individual rows while SYSTEM
+        samples entire pages, which is faster but less random.
+
+    Returns
+    -------
+    sample : numpy.ndarray
+        Sorted array of the identifiers sampled.
+    """
+    if method not in METHODS:
+        raise ValueError('{} is not a sampling method'.format(method))
+    if not 0 <= percent <= 100:
+        raise ValueError('Percentage must be between 0 and 100')
+
+    query = 'SELECT id FROM {} TABLESAMPLE {} (%s) REPEATABLE (%s)'.format(
+            table, method
+        )
+    params = [percent, seed]
+    if ids is not None:
+        query += ' WHERE id = ANY(%s)'
+        params.append([int(id) for id in ids])
+    query += ' ORDER BY id;'
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return np.fromiter(
+                (row[0] for row in cursor.fetchall()), dtype=np.int64
+            )
@@ -0,0 +1,380 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import copy
+import csv
+import datetime
+import os
+import random
+import re
+import types
+
+from app.lib import files, helpers
+
+# Offsets added to the sequence numbers of synthetic reviews and bugs so that
+# their identifiers are told apart from those in the seed corpus
+ISSUE_OFFSET = 900000000
+BUG_ID_OFFSET = 90000000
+
+# Formats of the timestamps in reviews, in bugs, and in the header of a
+# response to an inline comment
+TIMESTAMP_FORMATS = [
+        '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S'
+    ]
+HEADER_FORMAT = '%Y/%m/%d %H:%M:%S'
+
+# Attributes of a review and of a bug that hold timestamps
+REVIEW_TIMESTAMPS = ['created', 'modified']
+BUG_TIMESTAMPS = [
+        'published', 'updated', 'closed', 'status_modified', 'owner_modified',
+        'component_modified'
+    ]
+
+# Match a line of a description or a message that refers to bugs
+# E.g., BUG=613160 or, in a quoted description, > BUG=613160
+BUG_LINE_RE = re.compile('^.*BUG=.*$\n?', flags=re.MULTILINE)
+
+# Name of the file, in the vulnerabilities path, to which the vulnerabilities
+# that synthetic bugs are associated with are written
+VULNERABILITIES_SOURCE = 'synthetic'
+
+# Maximum number of reviews or bugs per chunk file
+CHUNK_SIZE = 1000
+
+
+def get_settings(directory, years, bots=(), compression=None):
+    """
+    Return an object with the paths, relative to a directory, and the other
+    attributes of the settings that app.lib.files.Files is constructed with.
+    """
+    return types.SimpleNamespace(
+            BUGS_PATH=os.path.join(directory, 'bugs/{year}'),
+            IDS_PATH=os.path.join(directory, '{switch}/ids'),
+            REVIEWS_PATH=os.path.join(directory, 'reviews/{year}'),
+            VULNERABILITIES_PATH=os.path.join(directory, 'vulnerabilities'),
+            BOTS=list(bots), ARCHIVE_COMPRESSION=compression,
+            YEARS=list(years)
+        )
+
+
+class Generator(object):
+    """Generates a synthetic corpus of reviews and bugs from a seed corpus.
+
+    A synthetic review is a copy of a review, chosen at random, in the seed
+    corpus that is moved to a random time in the year it is generated for and
+    whose text is replaced. The shape of the review, i.e. its patchsets, the
+    files in them, the lines commented on, the authors, and which inline
+    comments respond to others, is thus that of a real review. The text of a
+    message or of an inline comment is composed of lines drawn from the lines
+    of the messages or inline comments in the seed corpus, and has as many
+    lines as one drawn from those. A response to an inline comment quotes a
+    comment posted earlier on the same line behind a header with the time at
+    which, and the author by whom, that comment was posted, as Rietveld does.
+
+    A synthetic bug is a copy of a bug in the seed corpus moved to the year.
+    Bugs are generated in the ratio of bugs to reviews in the seed corpus,
+    reviews refer to bugs in BUG= lines as often, and with as many bugs, as
+    those in the seed corpus do, and bugs are labeled with vulnerabilities as
+    often as those in the seed corpus are.
+    """
+    def __init__(self, settings, seed=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        settings : object
+            Settings with the paths to the seed corpus, e.g. django.conf.
+            settings. The reviews and bugs of every year in settings.YEARS
+            that has any are read.
+        seed : int, optional
+            Seed of the random number generator. Corpora generated using the
+            same seed corpus and seed are identical.
+        """
+        self.random = random.Random(seed)
+
+        seed_files = files.Files(settings)
+        (self.reviews, self.bugs) = (list(), list())
+        for year in settings.YEARS:
+            if os.path.exists(seed_files.get_reviews_path(year)):
+                self.reviews.extend(seed_files.get_reviews(year))
+            if os.path.exists(seed_files.get_bugs_path(year)):
+                self.bugs.extend(seed_files.get_bugs(year))
+        if not self.reviews or not self.bugs:
+            raise ValueError('The seed corpus must have reviews and bugs')
+
+        # Kind of text -> Lines of, and number of lines in, the texts
+        self.lines = collections.defaultdict(list)
+        self.lengths = collections.defaultdict(list)
+        # Number of bugs referred to by each review that refers to any
+        self.references = list()
+        for review in self.reviews:
+            ids = helpers.parse_bugids(review['description'])
+            if ids:
+                self.references.append(len(ids))
+            for message in review['messages']:
+                if not message['auto_generated']:
+                    self._add('message', message['text'])
+            for patchset in review['patchsets'].values():
+                for file in patchset['files'].values():
+                    for comment in file.get('messages') or list():
+                        kind = 'response' \
+                            if _is_response(comment['text']) else 'comment'
+                        self._add(kind, comment['text'])
+        for kind in ['comment', 'response']:
+            if not self.lines[kind]:
+                self._add(kind, 'LGTM')
+
+        self.ratio = len(self.bugs) / len(self.reviews)
+        self.referencing = len(self.references) / len(self.reviews)
+        self.security = len([
+                bug for bug in self.bugs
+                if any(l.startswith('CVE-') for l in bug.get('labels', []))
+            ]) / len(self.bugs)
+
+    def generate(self, directory, years, size, chunksize=CHUNK_SIZE):
+        """Generate a synthetic corpus.
+
+        The corpus is laid out in a directory as settings.DATA_DIR is, i.e.
+        chunk files of the bugs and reviews of a year in bugs/{year} and
+        reviews/{year}, their identifiers in bugs/ids and reviews/ids, and
+        the vulnerabilities the bugs are associated with in vulnerabilities.
+
+        Parameters
+        ----------
+        directory : str
+            Path to the directory to which the corpus is written.
+        years : list
+            Years to generate reviews and bugs for.
+        size : int
+            Number of reviews to generate for each year.
+        chunksize : int, optional
+            Maximum number of reviews or bugs per chunk file.
+
+        Returns
+        -------
+        counts : collections.OrderedDict
+            Number of reviews, messages, patchsets, inline comments, bugs,
+            and vulnerabilities generated, and the size, in bytes, of the
+            corpus.
+        """
+        settings = get_settings(directory, years)
+        corpus = files.Files(settings)
+        for switch in ['bugs', 'reviews']:
+            os.makedirs(corpus.get_ids_path(switch), exist_ok=True)
+        os.makedirs(settings.VULNERABILITIES_PATH, exist_ok=True)
+
+        counts = collections.OrderedDict([
+                ('reviews', 0), ('messages', 0), ('patchsets', 0),
+                ('comments', 0), ('bugs', 0), ('vulnerabilities', 0),
+                ('bytes', 0)
+            ])
+        (bug_ids, vulnerabilities) = (list(), list())
+        paths = list()
+        for year in years:
+            os.makedirs(corpus.get_bugs_path(year), exist_ok=True)
+            os.makedirs(corpus.get_reviews_path(year), exist_ok=True)
+
+            bugs = list()
+            for index in range(max(1, int(round(size * self.ratio)))):
+                id = BUG_ID_OFFSET + len(bug_ids) + 1
+                cve = None
+                if self.random.random() < self.security:
+                    cve = 'CVE-{}-{:05d}'.format(year, len(vulnerabilities))
+                    vulnerabilities.append((cve, id))
+                bugs.append(self.make_bug(id, year, cve))
+                bug_ids.append(id)
+            for (chunk, items) in enumerate(helpers.chunk(bugs, chunksize)):
+                paths.append(corpus.save_bugs(year, chunk + 1, items))
+            corpus.save_ids(year, [bug['id'] for bug in bugs], 'bugs')
+            counts['bugs'] += len(bugs)
+
+            (chunk, reviews, issues) = (0, list(), list())
+            for index in range(size):
+                issue = ISSUE_OFFSET + counts['reviews'] + 1
+                references = list()
+                if self.random.random() < self.referencing:
+                    references = self.random.sample(
+                            bug_ids, min(
+                                len(bug_ids),
+                                self.random.choice(self.references)
+                            )
+                        )
+                review = self.make_review(issue, year, references)
+                reviews.append(review)
+                issues.append(issue)
+                counts['reviews'] += 1
+                counts['messages'] += len(review['messages'])
+                counts['patchsets'] += len(review['patchsets'])
+                counts['comments'] += sum(
+                        len(file.get('messages') or list())
+                        for patchset in review['patchsets'].values()
+                        for file in patchset['files'].values()
+                    )
+                if len(reviews) == chunksize or index == size - 1:
+                    chunk += 1
+                    paths.append(corpus.save_reviews(year, chunk, reviews))
+                    reviews = list()
+            corpus.save_ids(year, issues, 'reviews')
+
+        path = os.path.join(
+                settings.VULNERABILITIES_PATH,
+                '{}.csv'.format(VULNERABILITIES_SOURCE)
+            )
+        with open(path, 'w') as file:
+            writer = csv.writer(file)
+            writer.writerows(vulnerabilities)
+        counts['vulnerabilities'] = len(vulnerabilities)
+        counts['bytes'] = sum(os.path.getsize(path) for path in paths)
+        return counts
+
+    def make_bug(self, id, year, cve=None):
+        """
+        Return a synthetic bug, published in a year, identified by an
+        identifier, and labeled with a vulnerability if cve is not None.
+        """
+        bug = copy.deepcopy(self.random.choice(self.bugs))
+        bug['id'] = id
+
+        delta = self._get_delta(bug['published'], year)
+        for key in BUG_TIMESTAMPS:
+            if bug.get(key):
+                bug[key] = _shift(bug[key], delta)
+        for comment in bug.get('comments') or list():
+            if comment.get('published'):
+                comment['published'] = _shift(comment['published'], delta)
+
+        labels = [
+                label for label in bug.get('labels', list())
+                if not label.startswith('CVE-') and
+                label != 'Type-Bug-Security'
+            ]
+        if cve is not None:
+            labels.extend(['Type-Bug-Security', cve])
+        elif not any(label.startswith('Type-') for label in labels):
+            labels.append('Type-Bug')
+        bug['labels'] = labels
+        return bug
+
+    def make_review(self, issue, year, bug_ids):
+        """
+        Return a synthetic review, created in a year, identified by an issue
+        number, whose description refers to the bugs identified by bug_ids.
+        """
+        review = copy.deepcopy(self.random.choice(self.reviews))
+        review['issue'] = issue
+
+        delta = self._get_delta(review['created'], year)
+        for key in REVIEW_TIMESTAMPS:
+            if review.get(key):
+                review[key] = _shift(review[key], delta)
+
+        line = 'BUG={}\n'.format(','.join(str(id) for id in bug_ids)) \
+            if bug_ids else ''
+        description = BUG_LINE_RE.sub('', review['description']).rstrip()
+        if line:
+            description = '{}\n\n{}'.format(description, line.rstrip())
+        review['description'] = description
+
+        for message in review['messages']:
+            message['date'] = _shift(message['date'], delta)
+            if message['auto_generated']:
+                # Keep the text, e.g. of a change to the description, but
+                # refer to the bugs the review refers to
+                message['text'] = BUG_LINE_RE.sub(
+                        lambda match: line, message['text']
+                    )
+            else:
+                message['text'] = self._compose('message')
+
+        for patchset in review['patchsets'].values():
+            patchset['issue'] = issue
+            for key in REVIEW_TIMESTAMPS:
+                if patchset.get(key):
+                    patchset[key] = _shift(patchset[key], delta)
+            for file in patchset['files'].values():
+                comments = file.get('messages') or list()
+                for (index, comment) in enumerate(comments):
+                    comment['date'] = _shift(comment['date'], delta)
+                    parents = [
+                            parent for parent in comments[:index]
+                            if parent['lineno'] == comment['lineno']
+                        ]
+                    if _is_response(comment['text']) and parents:
+                        comment['text'] = self._respond(
+                                self.random.choice(parents)
+                            )
+                    else:
+                        comment['text'] = self._compose('comment')
+        return review
+
+    # Private Members
+
+    def _add(self, kind, text):
+        lines = [
+                line for line in helpers.clean(text).split('\n')
+                if line.strip()
+            ]
+        if lines:
+            self.lines[kind].extend(lines)
+            self.lengths[kind].append(len(lines))
+
+    def _compose(self, kind):
+        return '\n'.join(
+                self.random.choice(self.lines[kind])
+                for _ in range(self.random.choice(self.lengths[kind]))
+            )
+
+    def _respond(self, parent):
+        header = 'On {}, {} wrote:'.format(
+                _parse(parent['date'])[0].strftime(HEADER_FORMAT),
+                parent.get('author') or parent['author_email'].split('@')[0]
+            )
+        quote = '\n'.join(
+                '> {}'.format(line)
+                for line in helpers.clean(parent['text']).strip().split('\n')
+            )
+        return '{}\n{}\n\n{}'.format(header, quote, self._compose('response'))
+
+    def _get_delta(self, timestamp, year):
+        """
+        Return the whole number of seconds, as a timedelta, by which a
+        timestamp is moved to a random time in a year. Whole seconds keep the
+        header of a response identical to the time its parent was posted.
+        """
+        begin = datetime.datetime(year, 1, 1)
+        seconds = (datetime.datetime(year + 1, 1, 1) - begin).total_seconds()
+        target = begin + datetime.timedelta(
+                seconds=self.random.randrange(int(seconds))
+            )
+        return datetime.timedelta(
+                seconds=int((target - _parse(timestamp)[0]).total_seconds())
+            )
+
+
+def _is_response(text):
+    return helpers.RESPONSE_HEAD_RE.match(text) is not None
+
+
+def _parse(timestamp):
+    """
+    Return a tuple of the form (value, format) where value is the datetime
+    a timestamp is of and format is the format the timestamp is in.
+    """
+    for format in TIMESTAMP_FORMATS:
+        try:
+            return (datetime.datetime.strptime(timestamp, format), format)
+        except ValueError:
+            continue
+    raise ValueError('{} is not a known timestamp format'.format(timestamp))
+
+
+def _shift(timestamp, delta):
+    """
+    Return a timestamp moved by a timedelta in the format the timestamp is
+    in.
+    """
+    (value, format) = _parse(timestamp)
+    return (value + delta).strftime(format)
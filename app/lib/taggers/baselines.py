@@ -1,15 +1,191 @@
-import multiprocessing
+import json
 import sys
 import traceback
 
-from django.db import Error, transaction
+import numpy as np
+
+from django.db import Error, connection, transaction
 
 from splat.complexity import *
 
 from app.lib import taggers, logger, helpers
-from app.lib.utils import parallel
+from app.lib.nlp import syllables
+from app.lib.utils import monitor, parallel, sharding
 from app.models import *
 
+# Modes in which the tagger may run
+#   parallel    Sentences are streamed to processes that tag one at a time
+#   vectorized  Batches of sentences are streamed to processes that compute
+#               the metrics of all sentences in a batch with array operations
+#   sharded     Ranges of sentence identifiers are handed to processes that
+#               fetch their own batches of sentences and tag them as in the
+#               vectorized mode
+MODES = ['parallel', 'vectorized', 'sharded']
+
+# Part-of-speech tags of tokens that are counted as pronouns
+PRONOUN_TAGS = ['PRP', 'PRP$', 'WP', 'WP$']
+PRONOUN_CLASSES = ['1ST', '2ND', '3RD']
+PRONOUNS = [
+        set(helpers.PRONOUNS_1), set(helpers.PRONOUNS_2),
+        set(helpers.PRONOUNS_3)
+    ]
+
+# Merge the baselines of each sentence in a batch into its metrics
+UPDATE_QUERY = '''
+    UPDATE sentence SET metrics = jsonb_set(
+        sentence.metrics, '{baselines}',
+        COALESCE(sentence.metrics -> 'baselines', '{}'::jsonb) || b.baselines
+      )
+    FROM unnest(%(ids)s::integer[], %(baselines)s::jsonb[]) AS b(id, baselines)
+    WHERE sentence.id = b.id;
+'''
+
+
+class Vocabulary(object):
+    """Integer codes of tokens and lookup tables of their properties.
+
+    Every distinct token is given a code the first time it is encoded. The
+    pronoun classes of a token and the number of syllables in it are found
+    once, when they are first looked up after it is given its code. The
+    tables are indexed by code so that the properties of an array of codes
+    are looked up at once.
+    """
+    def __init__(self, counter=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        counter : app.lib.nlp.syllables.SyllableCounter, optional
+            Counter of the syllables in a token. Default is the counter of the
+            calling process.
+        """
+        self.counter = counter
+        self.codes = dict()
+        self.tokens = list()
+        self._pronouns = np.zeros((0, 3), dtype=bool)
+        self._syllables = np.zeros(0, dtype=np.int64)
+
+    def encode(self, tokens):
+        """Return the codes of a list of tokens as an array."""
+        if len(tokens) == 0:
+            return np.zeros(0, dtype=np.int64)
+        (uniques, inverse) = np.unique(tokens, return_inverse=True)
+        codes = np.array([self._get_code(str(u)) for u in uniques])
+        return codes[inverse]
+
+    def get_pronouns(self):
+        """
+        Return a boolean array of shape (number of tokens, 3) whose columns
+        indicate if a token is a first, second, and third person pronoun.
+        """
+        if len(self._pronouns) < len(self.tokens):
+            tokens = self.tokens[len(self._pronouns):]
+            classes = [
+                    [token.upper() in pronouns for pronouns in PRONOUNS]
+                    for token in tokens
+                ]
+            self._pronouns = np.concatenate((
+                    self._pronouns, np.array(classes, dtype=bool)
+                ))
+        return self._pronouns
+
+    def get_syllables(self):
+        """Return an array of the number of syllables in each token."""
+        if len(self._syllables) < len(self.tokens):
+            if self.counter is None:
+                self.counter = syllables.get_counter()
+            counts = self.counter.counts(self.tokens[len(self._syllables):])
+            self._syllables = np.concatenate((self._syllables, counts))
+        return self._syllables
+
+    def _get_code(self, token):
+        code = self.codes.get(token)
+        if code is None:
+            code = len(self.tokens)
+            self.codes[token] = code
+            self.tokens.append(token)
+        return code
+
+
+def compute(sentence_ids, tokens, tags, metrics, vocabulary):
+    """
+    Compute the baseline metrics of sentences from their tokens.
+
+    The tokens of every sentence are a contiguous segment of the arrays, so
+    that a metric is computed for all sentences at once by reducing each
+    segment with np.add.reduceat. The values are identical to those computed
+    one sentence at a time.
+
+    Parameters
+    ----------
+    sentence_ids : list
+        Identifier of the sentence of each token, in ascending order.
+    tokens : list
+        Text of each token.
+    tags : list
+        Part-of-speech tag of each token.
+    metrics : list
+        Names of the metrics to compute.
+    vocabulary : Vocabulary
+        Codes of tokens seen before.
+
+    Returns
+    -------
+    (ids, baselines) : tuple
+        A list of the identifiers of the sentences that have tokens and a list
+        of the baseline metrics of each, as they are saved in the sentence.
+    """
+    if len(sentence_ids) == 0:
+        return (list(), list())
+
+    sentence_ids = np.asarray(sentence_ids)
+    codes = vocabulary.encode(tokens)
+
+    starts = np.flatnonzero(np.concatenate(
+            ([True], sentence_ids[1:] != sentence_ids[:-1])
+        ))
+    ids = sentence_ids[starts]
+    lengths = np.diff(np.append(starts, len(sentence_ids)))
+
+    columns = dict()
+    if 'sent_length' in metrics:
+        columns['length'] = lengths.tolist()
+    if 'type_token_ratio' in metrics:
+        # Order the codes within each segment so that a code that differs from
+        # the one before it is the first of its type in the sentence
+        order = np.lexsort((codes, sentence_ids))
+        (sids, scodes) = (sentence_ids[order], codes[order])
+        first = np.concatenate(
+                ([True], (sids[1:] != sids[:-1]) | (scodes[1:] != scodes[:-1]))
+            )
+        types = np.add.reduceat(first.astype(np.int64), starts)
+        columns['type_token_ratio'] = (types / lengths).tolist()
+    if 'pronoun_density' in metrics:
+        (uniques, inverse) = np.unique(tags, return_inverse=True)
+        mask = np.array([str(u) in PRONOUN_TAGS for u in uniques])[inverse]
+        pronouns = vocabulary.get_pronouns()[codes] & mask[:, np.newaxis]
+        counts = np.add.reduceat(pronouns.astype(np.int64), starts, axis=0)
+        densities = counts / lengths[:, np.newaxis]
+        totals = counts.sum(axis=1) / lengths
+        columns['pronoun_density'] = [
+                dict(zip(PRONOUN_CLASSES + ['TOT'], row + [total]))
+                for (row, total) in zip(densities.tolist(), totals.tolist())
+            ]
+    if 'flesch_kincaid' in metrics:
+        counts = np.add.reduceat(vocabulary.get_syllables()[codes], starts)
+        columns['flesch_kincaid'] = [
+                # wordcount, sentcount, syllcount
+                calc_flesch_kincaid(length, 1, count)
+                for (length, count) in zip(lengths.tolist(), counts.tolist())
+            ]
+
+    baselines = [dict() for id in ids]
+    for (name, values) in columns.items():
+        for (baseline, value) in zip(baselines, values):
+            baseline[name] = value
+    return (ids.tolist(), baselines)
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -29,6 +205,7 @@ def do(iqueue, cqueue):  # pragma: no cover
     while True:
         item = iqueue.get()
         if item == parallel.EOI:
+            syllables.save()
             cqueue.put(parallel.DD)
             break
 
@@ -64,6 +241,7 @@ def do(iqueue, cqueue):  # pragma: no cover
 
                 sent.save()
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sent.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -72,6 +250,77 @@ def do(iqueue, cqueue):  # pragma: no cover
         cqueue.put((1, sent.id))
 
 
+def do_vectorized(iqueue, cqueue):  # pragma: no cover
+    vocabulary = Vocabulary()
+    while True:
+        item = iqueue.get()
+        if item == parallel.EOI:
+            syllables.save()
+            cqueue.put(parallel.DD)
+            break
+
+        (ids, metrics) = item
+        tag(ids, metrics, vocabulary)
+        cqueue.put((len(ids), None))
+
+
+def do_sharded(iqueue, cqueue):  # pragma: no cover
+    vocabulary = Vocabulary()
+    while True:
+        item = iqueue.get()
+        if item == parallel.EOI:
+            syllables.save()
+            cqueue.put(parallel.DD)
+            break
+
+        (query, shard, metrics, batch_size) = item
+        sentenceObjects = sharding.get_queryset(query)
+        for rows in sharding.iterate(sentenceObjects, shard, (), batch_size):
+            ids = [row[0] for row in rows]
+            tag(ids, metrics, vocabulary)
+            cqueue.put((len(ids), None))
+
+
+def tag(ids, metrics, vocabulary):  # pragma: no cover
+    """
+    Compute the baseline metrics of a batch of sentences and merge them into
+    the metrics saved in each sentence.
+    """
+    with transaction.atomic():
+        try:
+            rows = Token.objects.filter(sentence_id__in=ids) \
+                                .order_by('sentence_id') \
+                                .values_list('sentence_id', 'token', 'pos')
+            (sentence_ids, tokens, tags) = (list(), list(), list())
+            for (sentence_id, token, tag) in rows:
+                sentence_ids.append(sentence_id)
+                tokens.append(token)
+                tags.append(tag)
+
+            (tagged, baselines) = compute(
+                    sentence_ids, tokens, tags, metrics, vocabulary
+                )
+            # Sentences without tokens only have a length
+            empty = sorted(set(ids) - set(tagged))
+            tagged.extend(empty)
+            baselines.extend(
+                    {'length': 0} if 'sent_length' in metrics else dict()
+                    for id in empty
+                )
+
+            with connection.cursor() as cursor:
+                cursor.execute(UPDATE_QUERY, {
+                        'ids': tagged,
+                        'baselines': [json.dumps(b) for b in baselines]
+                    })
+        except Error:  # pragma: no cover
+            monitor.error()
+            sys.stderr.write('Exception\n')
+            sys.stderr.write('  Sentences  {}..{}\n'.format(ids[0], ids[-1]))
+            extype, exvalue, extrace = sys.exc_info()
+            traceback.print_exception(extype, exvalue, extrace)
+
+
 def stream(sentenceObjects, iqueue, num_doers, metrics):
     for sentence in sentenceObjects:
         iqueue.put((sentence, metrics))
@@ -80,29 +329,84 @@ def stream(sentenceObjects, iqueue, num_doers, metrics):
         iqueue.put(parallel.EOI)
 
 
+def stream_batches(sentenceObjects, iqueue, num_doers, metrics, size):
+    ids = sentenceObjects.order_by('id').values_list('id', flat=True)
+    batch = list()
+    for id in ids.iterator():
+        batch.append(id)
+        if len(batch) == size:
+            iqueue.put((batch, metrics))
+            batch = list()
+    if batch:
+        iqueue.put((batch, metrics))
+
+    for i in range(num_doers):
+        iqueue.put(parallel.EOI)
+
+
 class BaselinesTagger(taggers.Tagger):
-    def __init__(self, settings, num_processes, sentenceObjects, metrics):
+    def __init__(self, settings, num_processes, sentenceObjects, metrics,
+                 mode='parallel'):
         super(BaselinesTagger, self).__init__(settings, num_processes)
+        if mode not in MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
         self.sentenceObjects = sentenceObjects
         self.metrics = metrics
+        self.mode = mode
 
     def tag(self):
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
 
-        process = self._start_streaming(iqueue)
-        count = parallel.run(do, aggregate, iqueue, self.num_processes)
-        process.join()
+        process = None
+        if self.mode == 'sharded':
+            # The doers fetch their own sentences, so only the few shards are
+            # put in the queue, up front, instead of streaming sentences
+            self._warn()
+            sharding.stream(
+                    self.sentenceObjects, iqueue, self.num_processes,
+                    (self.metrics, self.settings.BATCH_SIZE)
+                )
+        else:
+            process = self._start_streaming(iqueue)
+        doer = {
+                'parallel': do, 'vectorized': do_vectorized,
+                'sharded': do_sharded
+            }[self.mode]
+        resources = ['cmudict'] if 'flesch_kincaid' in self.metrics else None
+        # The number of sentences is counted only to estimate the time
+        # remaining when the run is monitored. Only in the parallel mode is
+        # an item a sentence.
+        total = None
+        if self.mode == 'parallel' and monitor.get_path():
+            total = self.sentenceObjects.count()
+        count = parallel.run(
+                doer, aggregate, iqueue, self.num_processes,
+                resources=resources, total=total
+            )
+        if process is not None:
+            process.join()
 
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
-                target=stream,
-                args=(
+        if self.mode == 'vectorized':
+            self._warn()
+            (target, args) = (stream_batches, (
+                    self.sentenceObjects, iqueue, self.num_processes,
+                    self.metrics, self.settings.BATCH_SIZE
+                ))
+        else:
+            (target, args) = (stream, (
                     self.sentenceObjects, iqueue, self.num_processes,
                     self.metrics
-                )
-            )
-        process.start()
+                ))
+        process = parallel.spawn(target=target, args=args)
 
         return process
+
+    def _warn(self):
+        """Warn about metrics that are not implemented."""
+        for metric in ['stop_word_ratio', 'question_ratio',
+                       'conceptual_similarity']:
+            if metric in self.metrics:
+                logger.warning("NotImplemented: '{}'".format(metric))
@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -10,7 +9,7 @@ from splat.complexity import open_class_list, closed_class_list
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers, sentenizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -65,6 +64,7 @@ def do(iqueue, cqueue): # pragma: no cover
 
                 count += 1
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Comment:  {}\n'.format(comm.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -97,10 +97,9 @@ class CommentLevelTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(self.commObjects, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
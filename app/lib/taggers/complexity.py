@@ -1,4 +1,3 @@
-import multiprocessing
 import sys
 import traceback
 
@@ -7,7 +6,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers, sentenizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -48,6 +47,7 @@ def do(iqueue, cqueue): # pragma: no cover
 
                 count += 1
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence:  {}\n'.format(sent.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -79,10 +79,9 @@ class ComplexityTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(self.sentObjects, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
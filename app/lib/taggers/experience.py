@@ -1,7 +1,6 @@
 """
 @AUTHOR: nuthanmunaiah
 """
-import multiprocessing
 import sys
 
 import pandas
@@ -125,9 +124,8 @@ class ExperienceTagger(tagger.Tagger):
         COMMENTS = pandas.read_sql(query, connection)
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream, args=(self.comments, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
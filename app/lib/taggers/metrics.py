@@ -1,5 +1,5 @@
 import _pickle
-import multiprocessing
+import json
 import re
 import sys
 import traceback
@@ -7,13 +7,35 @@ import traceback
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-from django.db import Error, transaction
+from django.db import Error, connection, transaction
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel, sharding
 from app.models import *
 
+# Modes in which the tagger may run
+#   parallel  Sentences and their tokens are streamed to processes
+#   sharded   Ranges of sentence identifiers are handed to processes that
+#             fetch their own batches of sentences and tokens
+MODES = ['parallel', 'sharded']
+
+ANALYZERS = [
+        ('formality', analyzers.FormalityAnalyzer),
+        ('informativeness', analyzers.InformativenessAnalyzer),
+        ('implicature', analyzers.ImplicatureAnalyzer)
+    ]
+
+# Fields of a token used by the analyzers
+TOKEN_FIELDS = ['token', 'pos', 'position', 'chunk']
+
+# Merge the metrics of each sentence in a batch into its metrics
+UPDATE_QUERY = '''
+    UPDATE sentence SET metrics = sentence.metrics || m.metrics
+    FROM unnest(%(ids)s::integer[], %(metrics)s::jsonb[]) AS m(id, metrics)
+    WHERE sentence.id = m.id;
+'''
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -51,6 +73,7 @@ def do(iqueue, cqueue): # pragma: no cover
 
                 sent.save()
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sent.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -59,6 +82,56 @@ def do(iqueue, cqueue): # pragma: no cover
         cqueue.put((1, sent.id))
 
 
+def do_sharded(iqueue, cqueue):  # pragma: no cover
+    while True:
+        item = iqueue.get()
+        if item == parallel.EOI:
+            cqueue.put(parallel.DD)
+            break
+
+        (query, shard, metrics, batch_size) = item
+        sentenceObjects = sharding.get_queryset(query)
+        batches = sharding.iterate(
+                sentenceObjects, shard, ('text',), batch_size
+            )
+        for sentences in batches:
+            tag(sentences, metrics)
+            cqueue.put((len(sentences), None))
+
+
+def tag(sentences, metrics):  # pragma: no cover
+    """
+    Analyze a batch of sentences, each a tuple (id, text), and merge the
+    results into the metrics saved in each sentence.
+    """
+    ids = [id for (id, text) in sentences]
+    tokens = {id: list() for id in ids}
+    rows = Token.objects.filter(sentence_id__in=ids) \
+                        .order_by('sentence_id', 'position') \
+                        .values('sentence_id', *TOKEN_FIELDS)
+    for row in rows:
+        tokens[row.pop('sentence_id')].append(row)
+
+    results = list()
+    for (id, text) in sentences:
+        result = dict()
+        for (name, analyzer) in ANALYZERS:
+            if name in metrics:
+                result[name] = analyzer(text, tokens[id]).analyze()
+        results.append(json.dumps(result))
+
+    with transaction.atomic():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(UPDATE_QUERY, {'ids': ids, 'metrics': results})
+        except Error:  # pragma: no cover
+            monitor.error()
+            sys.stderr.write('Exception\n')
+            sys.stderr.write('  Sentences  {}..{}\n'.format(ids[0], ids[-1]))
+            extype, exvalue, extrace = sys.exc_info()
+            traceback.print_exception(extype, exvalue, extrace)
+
+
 def stream(sentenceObjects, iqueue, num_doers, metrics):
     for sentence in sentenceObjects:
         # TODO: Move query to queryStrings
@@ -70,28 +143,47 @@ def stream(sentenceObjects, iqueue, num_doers, metrics):
 
 
 class MetricsTagger(taggers.Tagger):
-    def __init__(self, settings, num_processes, sentenceObjects, metrics):
+    def __init__(self, settings, num_processes, sentenceObjects, metrics,
+                 mode='parallel'):
         super(MetricsTagger, self).__init__(settings, num_processes)
+        if mode not in MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
         self.sentenceObjects = sentenceObjects
         self.metrics = metrics
+        self.mode = mode
 
     def tag(self):
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
 
+        if self.mode == 'sharded':
+            # The doers fetch their own sentences, so only the few shards are
+            # put in the queue, up front, instead of streaming sentences
+            sharding.stream(
+                    self.sentenceObjects, iqueue, self.num_processes,
+                    (self.metrics, self.settings.BATCH_SIZE)
+                )
+            return parallel.run(
+                    do_sharded, aggregate, iqueue, self.num_processes
+                )
+
+        # The number of sentences is counted only to estimate the time
+        # remaining when the run is monitored
+        total = self.sentenceObjects.count() if monitor.get_path() else None
         process = self._start_streaming(iqueue)
-        count = parallel.run(do, aggregate, iqueue, self.num_processes)
+        count = parallel.run(
+                do, aggregate, iqueue, self.num_processes, total=total
+            )
         process.join()
 
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.sentenceObjects, iqueue, self.num_processes,
                     self.metrics
                 )
             )
-        process.start()
 
         return process
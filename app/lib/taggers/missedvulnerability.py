@@ -2,11 +2,41 @@
 @AUTHOR: nuthanmunaiah
 """
 
-from datetime import datetime
+from datetime import datetime as dt
 
-from app.models import *
+from django.db import connection
+
+from app.lib.helpers import get_elapsed
+from app.lib.logger import *
 from app.lib.taggers import tagger
 
+# Files that were committed in a review that fixed a vulnerability along with
+# the date on which the most recent such review was created.
+FILES_QUERY = '''
+    SELECT f.path, MAX(r.created)
+    FROM review r
+      JOIN review_bug rb ON rb.review_id = r.id
+      JOIN vulnerability_bug vb ON vb.bug_id = rb.bug_id
+      CROSS JOIN LATERAL
+        jsonb_array_elements_text(r.document -> 'committed_files') AS f(path)
+    WHERE f.path LIKE ANY(%(patterns)s)
+    GROUP BY f.path;
+'''
+
+# Reviews that reviewed one of the files before the file was last fixed. The
+# files drive the join so that each file is looked up through the GIN index
+# on document -> 'reviewed_files'.
+UPDATE_QUERY = '''
+    UPDATE review SET missed_vulnerability = TRUE
+    FROM (
+      SELECT DISTINCT r.id
+      FROM unnest(%(paths)s::text[], %(dates)s::timestamp[]) AS f(path, date)
+        JOIN review r
+          ON (r.document -> 'reviewed_files') ? f.path AND r.created < f.date
+    ) AS m
+    WHERE review.id = m.id;
+'''
+
 
 class MissedVulnerabilityTagger(tagger.Tagger):
     """
@@ -16,58 +46,52 @@ class MissedVulnerabilityTagger(tagger.Tagger):
         """
         Tag all of the reviews that missed a vulnerability.
         """
+        begin = dt.now()
         files = self._get_filesfixedforvulnerability()
-        ids = self._get_missedvulnerabilityreviewids(files)
-        Review.objects.filter(id__in=ids).update(missed_vulnerability=True)
+        info('    {:,} files fixed for a vulnerability ({:.2f} mins)'.format(
+                len(files), get_elapsed(begin, dt.now())
+            ))
 
-        return len(ids)
+        begin = dt.now()
+        count = self._tag_missedvulnerabilityreviews(files)
+        info('    {:,} reviews tagged ({:.2f} mins)'.format(
+                count, get_elapsed(begin, dt.now())
+            ))
 
-    def _get_vulnerabilityfixingreviews(self):
-        """
-        Returns a list of reviews that fixed a vulnerability.
-        """
-        reviews = set()
-        for vulnerability in Vulnerability.objects.all():
-            for bug in vulnerability.bugs.all():
-                for review in bug.review_set.all():
-                    reviews.add(review)
-        return reviews
+        return count
 
     def _get_filesfixedforvulnerability(self):
         """
-        Returns a dictionary of files that were altered in order to fix a
-        vulnerability.
+        Returns a dictionary of whitelisted files that were altered in order
+        to fix a vulnerability. The value is the date on which the most recent
+        review that altered the file to fix a vulnerability was created.
         """
-        files = dict()
-        for review in self._get_vulnerabilityfixingreviews():
-            for file in review.document['committed_files']:
-                if file not in files:
-                    files[file] = datetime.min
-                if review.created > files[file]:
-                    files[file] = review.created
-        return files
+        with connection.cursor() as cursor:
+            cursor.execute(FILES_QUERY, {'patterns': self._get_patterns()})
+            return dict(cursor.fetchall())
 
-    def _get_missedvulnerabilityreviewids(self, files):
+    def _tag_missedvulnerabilityreviews(self, files):
         """
-        Returns a list of review IDs that are associated with reviews that
-        missed a vulnerability.
+        Tag reviews that reviewed a file before the file was fixed for a
+        vulnerability. Returns the number of reviews tagged.
         """
-        ids = set()
-        for (file, date) in files.items():
-            if not self._is_whitelisted(file):
-                continue
-            reviews = Review.objects.filter(
-                    created__lt=date, document__reviewed_files__has_key=file
+        if not files:
+            return 0
+        (paths, dates) = zip(*files.items())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                    UPDATE_QUERY, {'paths': list(paths), 'dates': list(dates)}
                 )
-            ids |= set(list(reviews.values_list('id', flat=True)))
-        return ids
+            return cursor.rowcount
 
-    def _is_whitelisted(self, file):
+    def _get_patterns(self):
         """
-        Returns True if the specified file is of a type contained in the
-        whitelist. False otherwise.
+        Returns a list of LIKE patterns matching the paths of files of a type
+        contained in the whitelist.
         """
+        patterns = list()
         for type in self.settings.FILETYPES_WHITELIST:
-            if file.endswith(type):
-                return True
-        return False
+            type = type.replace('\\', '\\\\').replace('%', '\\%') \
+                       .replace('_', '\\_')
+            patterns.append('%{}'.format(type))
+        return patterns
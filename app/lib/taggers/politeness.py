@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -8,7 +7,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -42,6 +41,7 @@ def do(iqueue, cqueue): # pragma: no cover
                 sent.metrics['politeness'] = results
                 sent.save()
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sent.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -73,10 +73,9 @@ class PolitenessTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(self.sentenceObjects, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
@@ -2,7 +2,7 @@
 @AUTHOR: meyersbs
 """
 
-import multiprocessing
+import itertools
 import json
 import re
 import sys
@@ -19,7 +19,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger, helpers
 from app.lib.nlp import analyzers, sentenizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -88,6 +88,7 @@ def do(iqueue, cqueue): # pragma: no cover
                     result['treeparse'] = clean_treeparse(resp['trees'])
 
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sent_id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -95,18 +96,12 @@ def do(iqueue, cqueue): # pragma: no cover
 
         cqueue.put((1, sent_id, result))
 
-def stream(sentences, iqueue, num_doers):
-    c = 0
-    urls = [#"http://cluster-node-04.main.ad.rit.edu:41194/",
-            #"http://cluster-node-02.main.ad.rit.edu:41194/",
-            #"http://cluster-node-03.main.ad.rit.edu:41194/",
-            "http://localhost:41194/"]
+def stream(sentences, iqueue, num_doers, urls):
+    # Sentences are sent to the CoreNLP servers in turn
+    urls = itertools.cycle(urls)
     for sentence in sentences:
-        iqueue.put((sentence.id, sentence.text, urls[c]))
-        if c < len(urls)-1: # pragma: no cover
-            c += 1
-        else:
-           c = 0
+        url = next(urls)
+        iqueue.put((sentence.id, sentence.text, url))
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
@@ -127,10 +122,12 @@ class SentenceParseTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
-                args=(self.sentences, iqueue, self.num_processes)
+                args=(
+                    self.sentences, iqueue, self.num_processes,
+                    self.settings.CORENLP_URLS
+                )
             )
-        process.start()
 
         return process
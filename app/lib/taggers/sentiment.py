@@ -1,4 +1,4 @@
-import multiprocessing
+import itertools
 import sys
 import traceback
 
@@ -7,7 +7,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -39,6 +39,7 @@ def do(iqueue, cqueue): # pragma: no cover
                 sent.metrics['sentiment'] = results
                 sent.save()
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sent.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -47,18 +48,12 @@ def do(iqueue, cqueue): # pragma: no cover
         cqueue.put(1)
 
 
-def stream(sentences, iqueue, num_doers):
-    c = 0
-    urls = [#"http://cluster-node-04.main.ad.rit.edu:41194/",
-            #"http://cluster-node-02.main.ad.rit.edu:41194/",
-            #"http://cluster-node-03.main.ad.rit.edu:41194/",
-            "http://localhost:41194/"]
+def stream(sentences, iqueue, num_doers, urls):
+    # Sentences are sent to the CoreNLP servers in turn
+    urls = itertools.cycle(urls)
     for sentence in sentences:
-        iqueue.put((sentence, urls[c]))
-        if c < len(urls)-1: # pragma: no cover
-            c += 1
-        else:
-           c = 0
+        url = next(urls)
+        iqueue.put((sentence, url))
 
     for i in range(num_doers):
         iqueue.put(parallel.EOI)
@@ -79,10 +74,12 @@ class SentimentTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
-                args=(self.sentObjects, iqueue, self.num_processes)
+                args=(
+                    self.sentObjects, iqueue, self.num_processes,
+                    self.settings.CORENLP_URLS
+                )
             )
-        process.start()
 
         return process
@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -8,7 +7,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers, sentenizer
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -48,6 +47,7 @@ def do(iqueue, cqueue): # pragma: no cover
                     cnt += 1
 
             except Error as err: # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Token:  {}\n'.format(tok.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -80,10 +80,9 @@ class SourceCodeTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(self.tokenObjects, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
@@ -1,4 +1,3 @@
-import multiprocessing
 import re
 import sys
 import traceback
@@ -11,7 +10,7 @@ from django.db.models import Q
 
 from app.lib import taggers, logger
 from app.lib.nlp import analyzers
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
@@ -50,6 +49,7 @@ def do(iqueue, cqueue):  # pragma: no cover
                         token.uncertainty = uncertainty_
                         token.save()
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Sentence  {}\n'.format(sentence.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -84,12 +84,11 @@ class UncertaintyTagger(taggers.Tagger):
         return count
 
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(
                     self.sentenceObjects, iqueue, self.num_processes, self.root
                 )
             )
-        process.start()
 
         return process
@@ -1,18 +1,45 @@
-import multiprocessing
 import re
 import sys
 import traceback
 
-from django.db import Error, transaction
+from django.db import Error, connection, transaction
 from django.db.models import Q
 
 from app.lib import taggers, logger
-from app.lib.utils import parallel
+from app.lib.utils import monitor, parallel
 from app.models import *
 
 
 PATTERN = r'^\nDone\.'
 
+# Modes in which the tagger may run
+#   parallel  Replies are streamed to processes that walk up the ancestors
+#   set       A recursive query walks up the ancestors of all replies at once
+MODES = ['parallel', 'set']
+
+QUERY = '''
+    WITH RECURSIVE reply AS (
+      SELECT c.id, c.parent_id
+      FROM comment c
+        JOIN patch p ON p._id = c.patch_id
+        JOIN patchset ps ON ps._id = p.patchset_id
+      WHERE ps.review_id = ANY(%(review_ids)s::bigint[])
+        AND NOT c.by_reviewer AND c.text ~ %(pattern)s
+    ), ancestor AS (
+      SELECT c.id, c.parent_id, c.by_reviewer
+      FROM comment c JOIN reply r ON c.id = r.parent_id
+      UNION
+      SELECT c.id, c.parent_id, c.by_reviewer
+      FROM comment c JOIN ancestor a ON c.id = a.parent_id
+    ), updated AS (
+      UPDATE comment SET is_useful = TRUE
+      WHERE id IN (SELECT id FROM ancestor WHERE by_reviewer)
+        AND NOT is_useful
+      RETURNING id
+    )
+    SELECT (SELECT COUNT(*) FROM reply), (SELECT COUNT(*) FROM updated);
+'''
+
 
 def aggregate(oqueue, cqueue, num_doers):
     count, done = 0, 0
@@ -47,6 +74,7 @@ def do(iqueue, cqueue):  # pragma: no cover
                         parent = parent.parent
                 cnt += 1
             except Error as err:  # pragma: no cover
+                monitor.error()
                 sys.stderr.write('Exception\n')
                 sys.stderr.write('  Comment  {}\n'.format(comment.id))
                 extype, exvalue, extrace = sys.exc_info()
@@ -69,11 +97,17 @@ def stream(review_ids, iqueue, num_doers):
 
 
 class UsefulCommentTagger(taggers.Tagger):
-    def __init__(self, settings, num_processes, review_ids):
+    def __init__(self, settings, num_processes, review_ids, mode='parallel'):
         super(UsefulCommentTagger, self).__init__(settings, num_processes)
+        if mode not in MODES:
+            raise ValueError('{} is not a known mode'.format(mode))
         self.review_ids = review_ids
+        self.mode = mode
 
     def tag(self):
+        if self.mode == 'set':
+            return super(UsefulCommentTagger, self).tag()
+
         iqueue = parallel.manager.Queue(self.settings.QUEUE_SIZE)
 
         process = self._start_streaming(iqueue)
@@ -82,11 +116,27 @@ class UsefulCommentTagger(taggers.Tagger):
 
         return count
 
+    def _tag(self):
+        """
+        Tag the reviewer comments that were replied to with "Done." using a
+        single recursive query. Returns the number of replies, which is the
+        same count as returned in the parallel mode.
+        """
+        params = {
+                'review_ids': [int(id) for id in self.review_ids],
+                'pattern': PATTERN
+            }
+        with connection.cursor() as cursor:
+            cursor.execute(QUERY, params)
+            (count, updated) = cursor.fetchone()
+        logger.debug('{:,} comments tagged useful'.format(updated))
+
+        return count
+
     def _start_streaming(self, iqueue):
-        process = multiprocessing.Process(
+        process = parallel.spawn(
                 target=stream,
                 args=(self.review_ids, iqueue, self.num_processes)
             )
-        process.start()
 
         return process
@@ -0,0 +1,339 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import json
+import os
+import subprocess
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import psutil
+
+# Seconds between two samples of the resident set size
+INTERVAL = 0.5
+
+MEBIBYTE = 1024 * 1024
+
+# Hosts on which a database is considered local
+LOCAL_HOSTS = ['', 'localhost', '127.0.0.1', '::1']
+
+# Percentiles of the latencies summarized
+PERCENTILES = [50, 99]
+
+# Metrics compared to flag regressions. Each is a tuple of the form (key,
+# higher) where higher is True if a higher value of the metric is better.
+METRICS = [('ops', True), ('p50', False), ('p99', False)]
+
+# Columns of the table of records. Each is a tuple of the form (key, heading,
+# format) where key is the key of the value in a record.
+COLUMNS = [
+        ('name', 'Stage', lambda value: value),
+        ('count', 'Items', lambda value: '{:,}'.format(value)),
+        ('seconds', 'Seconds', lambda value: '{:,.2f}'.format(value)),
+        ('rate', 'Items/s', lambda value: '{:,.1f}'.format(value)),
+        ('peak_rss', 'Peak RSS (MiB)',
+         lambda value: '{:,.1f}'.format(value / MEBIBYTE)),
+        ('mean_rss', 'Mean RSS (MiB)',
+         lambda value: '{:,.1f}'.format(value / MEBIBYTE))
+    ]
+
+
+class MemorySampler(object):
+    """Samples the memory used by a process while in the context of the
+    sampler.
+
+    The memory used is the sum of the resident set size of the process and
+    of every one of its descendants, i.e. of the processes that the process
+    runs doers, aggregators, and streamers in. Memory shared by processes is
+    counted once for every process that shares it.
+    """
+    def __init__(self, pid=None, interval=INTERVAL):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        pid : int, optional
+            Identifier of the process to sample. Default is the calling
+            process.
+        interval : float, optional
+            Seconds between two samples.
+        """
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples = list()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    @property
+    def peak(self):
+        return max(self.samples) if self.samples else 0
+
+    @property
+    def mean(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+    def sample(self):
+        """Record a sample and return it."""
+        rss = 0
+        for process in [self.process] + self.process.children(recursive=True):
+            try:
+                rss += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                # The process ended after it was listed
+                continue
+        self.samples.append(rss)
+        return rss
+
+    def __enter__(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+def measure(name, function, *args, **kwargs):
+    """Time a function and sample the memory used while it runs.
+
+    Parameters
+    ----------
+    name : str
+        Name of the record.
+    function : function
+        Function to run with the positional and keyword arguments. The
+        function must return the number of items it processed, a dictionary
+        of the number of items of each kind it processed, or None.
+
+    Returns
+    -------
+    record : collections.OrderedDict
+        Dictionary of the name, the number of items processed, the seconds
+        taken, the items processed per second, and the peak and mean memory,
+        in bytes, used. When the function returns a dictionary, the number of
+        items processed is the sum of its values and the dictionary is
+        included as counts.
+    """
+    with MemorySampler() as sampler:
+        begin = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - begin
+
+    counts = result if isinstance(result, dict) else None
+    count = sum(counts.values()) if counts is not None else (result or 0)
+    record = collections.OrderedDict([
+            ('name', name), ('count', count), ('seconds', seconds),
+            ('rate', count / seconds if seconds else 0.0),
+            ('peak_rss', sampler.peak), ('mean_rss', sampler.mean)
+        ])
+    if counts is not None:
+        record['counts'] = counts
+    return record
+
+
+def to_table(records, columns=COLUMNS):
+    """
+    Return the records as lines of a table with a column for each of the
+    columns and a row for each record.
+    """
+    rows = [[heading for (_, heading, _) in columns]]
+    for record in records:
+        rows.append([format(record[key]) for (key, _, format) in columns])
+    widths = [max(len(row[index]) for row in rows) for index in range(
+            len(columns)
+        )]
+
+    lines = list()
+    for (index, row) in enumerate(rows):
+        cells = [row[0].ljust(widths[0])] + [
+                cell.rjust(width) for (cell, width) in zip(row[1:], widths[1:])
+            ]
+        lines.append('  '.join(cells))
+        if index == 0:
+            lines.append('  '.join('-' * width for width in widths))
+    return lines
+
+
+def time_calls(function, items, repeat=1):
+    """
+    Call a function with each of the items, repeat times over, and return the
+    list of seconds each call took.
+    """
+    latencies = list()
+    for _ in range(repeat):
+        for item in items:
+            begin = time.perf_counter()
+            function(item)
+            latencies.append(time.perf_counter() - begin)
+    return latencies
+
+
+def trace_memory(function, items):
+    """
+    Call a function with each of the items and return the peak size, in
+    bytes, of the memory allocated by the calls or None if memory allocations
+    are already being traced, e.g. by a profiler.
+    """
+    if tracemalloc.is_tracing():
+        return None
+    tracemalloc.start()
+    try:
+        for item in items:
+            function(item)
+        (_, peak) = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def summarize(latencies):
+    """
+    Return a dictionary of the number of calls, the calls per second, and the
+    mean and percentiles, in seconds, of the latencies of the calls.
+    """
+    summary = collections.OrderedDict([('calls', len(latencies))])
+    total = sum(latencies)
+    summary['ops'] = len(latencies) / total if total else 0.0
+    summary['mean'] = total / len(latencies) if latencies else 0.0
+    for percentile in PERCENTILES:
+        summary['p{}'.format(percentile)] = float(
+                np.percentile(latencies, percentile)
+            ) if latencies else 0.0
+    return summary
+
+
+def compare(results, baseline, threshold):
+    """Compare results with those of a baseline.
+
+    Parameters
+    ----------
+    results : dict
+        Summaries, as returned by summarize, keyed by the name of what was
+        measured.
+    baseline : dict
+        Summaries of the baseline keyed by the name of what was measured.
+    threshold : float
+        Fraction by which a metric must be worse than that of the baseline to
+        be flagged as a regression.
+
+    Returns
+    -------
+    regressions : list
+        List of tuples of the form (name, metric, before, after, change)
+        where change is the fraction by which the metric changed relative to
+        before. Only what was measured in both is compared.
+    """
+    regressions = list()
+    for (name, summary) in results.items():
+        if name not in baseline:
+            continue
+        for (metric, higher) in METRICS:
+            (before, after) = (baseline[name].get(metric), summary.get(metric))
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (-change if higher else change) > threshold:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+
+def is_local(database):
+    """
+    Return True if a database, given its settings, e.g. connection.
+    settings_dict, is a PostgreSQL database on the local host.
+    """
+    return 'postgresql' in database['ENGINE'] and \
+        (database.get('HOST') or '') in LOCAL_HOSTS
+
+
+def get_revision(path=None):
+    """
+    Return a tuple of the form (revision, dirty) where revision is the git
+    revision checked out in the repository at path, default is the current
+    working directory, and dirty is True if the working tree has changes.
+    revision is None if the path is not in a git repository.
+    """
+    try:
+        revision = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=path,
+                stderr=subprocess.DEVNULL
+            ).decode().strip()
+        status = subprocess.check_output(
+                ['git', 'status', '--porcelain', '--untracked-files=no'],
+                cwd=path, stderr=subprocess.DEVNULL
+            ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return (None, False)
+    return (revision, status != '')
+
+
+class Results(object):
+    """Results of benchmarks saved to a JSON file keyed by git revision.
+
+    Results of a revision replace those saved earlier for the revision. One
+    revision may be marked as the baseline that results are compared with.
+    """
+    def __init__(self, path):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        path : str
+            Path to the JSON file. The results in an existing file are read.
+        """
+        self.path = path
+        self.baseline = None
+        self.revisions = collections.OrderedDict()
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                contents = json.load(
+                        file, object_pairs_hook=collections.OrderedDict
+                    )
+            self.baseline = contents.get('baseline')
+            self.revisions = contents.get('revisions', self.revisions)
+
+    def add(self, revision, results, **attributes):
+        """
+        Add results, a dictionary of summaries, of a revision along with
+        other attributes, e.g. the date, of the run.
+        """
+        entry = collections.OrderedDict(sorted(attributes.items()))
+        entry['results'] = results
+        self.revisions[revision] = entry
+
+    def get(self, revision=None):
+        """
+        Return the results of a revision, default is the baseline, or None if
+        there are none.
+        """
+        revision = self.baseline if revision is None else revision
+        entry = self.revisions.get(revision)
+        return entry['results'] if entry is not None else None
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        contents = collections.OrderedDict([
+                ('baseline', self.baseline), ('revisions', self.revisions)
+            ])
+        return save(contents, self.path)
+
+
+def save(report, path):
+    """Save a report, a JSON-serializable dictionary, to a JSON file."""
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+    return path
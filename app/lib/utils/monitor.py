@@ -0,0 +1,264 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+
+# Environment variable with the path to the JSON-lines file to which samples
+# are appended. Nothing is monitored when it is not set.
+ENVIRONMENT_VARIABLE = 'METRICS'
+
+# Seconds between samples
+INTERVAL = 10.0
+
+# Upper bounds, in seconds, of the buckets of the histogram of the time taken
+# by a doer to process an item
+BUCKETS = [0.001, 0.01, 0.1, 1.0, 10.0, 100.0, float('inf')]
+
+# Reporter of the doer running in the calling process, if any
+_reporter = None
+
+
+def get_path():
+    """
+    Return the path to the file to which samples are appended or None if
+    monitoring is disabled.
+    """
+    return os.environ.get(ENVIRONMENT_VARIABLE) or None
+
+
+def error():
+    """
+    Count an item that the doer running in the calling process failed to
+    process. Does nothing if the doer is not monitored.
+    """
+    if _reporter is not None:
+        _reporter.error()
+
+
+class Stats(object):
+    """Counts of the items processed by a doer since they were last reset."""
+    __slots__ = ['items', 'busy', 'errors', 'histogram']
+
+    def __init__(self):
+        self.reset()
+
+    def add(self, latency):
+        """Count an item that took latency seconds to process."""
+        self.items += 1
+        self.busy += latency
+        for (index, bound) in enumerate(BUCKETS):
+            if latency <= bound:
+                self.histogram[index] += 1
+                break
+
+    def reset(self):
+        self.items = 0
+        self.busy = 0.0
+        self.errors = 0
+        self.histogram = [0] * len(BUCKETS)
+
+    def to_dict(self):
+        return {
+                'items': self.items, 'busy': self.busy, 'errors': self.errors,
+                'histogram': list(self.histogram)
+            }
+
+
+class Reporter(object):
+    """Collects the stats of a doer process and reports them periodically.
+
+    The input queue of the doer is replaced by a proxy that times every item
+    from the moment the doer takes it to the moment the doer asks for the next
+    one. Errors are counted when the doer calls error() after it fails to
+    process an item and when the doer itself raises an exception.
+    """
+    def __init__(self, mqueue, interval=INTERVAL):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        mqueue : multiprocessing.Queue
+            Queue to which the stats are reported.
+        interval : float, optional
+            Minimum number of seconds between two reports.
+        """
+        self.mqueue = mqueue
+        self.interval = interval
+        self.stats = Stats()
+        self._reported = time.monotonic()
+
+    def wrap(self, iqueue):
+        """Return a proxy of the input queue of the doer."""
+        return _Queue(iqueue, self)
+
+    def error(self):
+        """Count an item that the doer failed to process."""
+        self.stats.errors += 1
+
+    def report(self, force=False):
+        """Report the stats if at least interval seconds passed since the last
+        report or if force is True."""
+        now = time.monotonic()
+        if not force and now - self._reported < self.interval:
+            return
+        sample = self.stats.to_dict()
+        sample['worker'] = os.getpid()
+        sample['seconds'] = now - self._reported
+        self.mqueue.put(sample)
+        self.stats.reset()
+        self._reported = now
+
+    def __enter__(self):
+        global _reporter
+        _reporter = self
+        return self
+
+    def __exit__(self, exc_type, *args):
+        global _reporter
+        _reporter = None
+        if exc_type is not None and exc_type is not KeyboardInterrupt:
+            self.error()
+        self.report(force=True)
+
+
+class Monitor(object):
+    """Samples the progress of a run of a pool of doers and an aggregator.
+
+    Every sample records the number of items in the input queue, which is low
+    when the streamer cannot keep up with the doers, and in the queue of
+    intermediate output, which is high when the aggregator cannot keep up with
+    the doers, along with the number of items processed per second by each
+    doer, the histogram of the time taken to process an item, and the number
+    of errors. Samples are appended as JSON lines to a file and summarized in
+    a progress line, with the estimated time remaining when the number of
+    items is known, that is rewritten in place on stderr.
+    """
+    def __init__(self, path, name, queues, mqueue, total=None,
+                 interval=INTERVAL):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        path : str
+            Path to the JSON-lines file to which samples are appended.
+        name : str
+            Name of the run recorded in every sample.
+        queues : dict
+            Queues whose depth is sampled keyed by the name under which the
+            depth is recorded.
+        mqueue : multiprocessing.Queue
+            Queue to which the doers report their stats.
+        total : int, optional
+            Number of items to be processed.
+        interval : float, optional
+            Seconds between samples.
+        """
+        self.path = path
+        self.name = name
+        self.queues = queues
+        self.mqueue = mqueue
+        self.total = total
+        self.interval = interval
+        self.items = 0
+        self.errors = 0
+        self._begin = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        sys.stderr.write('\n')
+
+    def sample(self):
+        """Record a sample and return it."""
+        workers = dict()
+        while not self.mqueue.empty():
+            report = self.mqueue.get()
+            worker = workers.setdefault(report['worker'], {
+                    'items': 0, 'busy': 0.0, 'errors': 0, 'seconds': 0.0,
+                    'histogram': [0] * len(BUCKETS)
+                })
+            for key in ['items', 'busy', 'errors', 'seconds']:
+                worker[key] += report[key]
+            for (index, count) in enumerate(report['histogram']):
+                worker['histogram'][index] += count
+
+        items = sum(worker['items'] for worker in workers.values())
+        self.items += items
+        self.errors += sum(worker['errors'] for worker in workers.values())
+        for worker in workers.values():
+            worker['rate'] = worker['items'] / worker['seconds'] \
+                if worker['seconds'] else 0.0
+
+        elapsed = time.monotonic() - self._begin
+        rate = self.items / elapsed if elapsed else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.items, 0) / rate
+        sample = {
+                'time': datetime.datetime.now().isoformat(),
+                'name': self.name, 'elapsed': elapsed, 'items': self.items,
+                'rate': rate, 'errors': self.errors, 'total': self.total,
+                'eta': eta, 'buckets': [str(bound) for bound in BUCKETS],
+                'workers': {str(pid): w for (pid, w) in workers.items()}
+            }
+        for (name, queue) in self.queues.items():
+            sample[name] = queue.qsize()
+
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(sample) + '\n')
+        sys.stderr.write('\r[MON] {}'.format(self._format(sample)))
+        sys.stderr.flush()
+        return sample
+
+    def _format(self, sample):
+        progress = '{:,}'.format(sample['items'])
+        if sample['total'] is not None:
+            progress += '/{:,}'.format(sample['total'])
+        line = '{} items {:.1f}/s'.format(progress, sample['rate'])
+        for name in sorted(self.queues):
+            line += ' {} {:,}'.format(name, sample[name])
+        line += ' errors {:,}'.format(sample['errors'])
+        if sample['eta'] is not None:
+            line += ' ETA {}'.format(
+                    datetime.timedelta(seconds=int(sample['eta']))
+                )
+        return line
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+class _Queue(object):
+    def __init__(self, queue, reporter):
+        self._queue = queue
+        self._reporter = reporter
+        self._taken = None
+
+    def get(self, *args, **kwargs):
+        if self._taken is not None:
+            self._reporter.stats.add(time.monotonic() - self._taken)
+            self._reporter.report()
+        item = self._queue.get(*args, **kwargs)
+        self._taken = time.monotonic()
+        return item
+
+    def __getattr__(self, name):
+        return getattr(self._queue, name)
+
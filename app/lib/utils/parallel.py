@@ -4,17 +4,32 @@
 
 import multiprocessing
 import contextlib
+import os
+import time
 
 from multiprocessing import Manager, Pool, Process
 
+import psutil
+
+from django.db import connection, connections
+
 from app.lib import helpers
+from app.lib.logger import *
+from app.lib.nlp import resources as nlpresources
+from app.lib.utils import monitor, profiling
 
 manager = Manager()
 EOI = 'ENDOFINPUT'
 DD = 'DOERDONE'
 
+# Connections inherited by a worker from its parent. The connections are held
+# on to, and never closed, by the worker because closing them would close the
+# connections of the parent.
+_inherited = list()
+
 
-def run(doer, aggregator, iqueue, num_doers):
+def run(doer, aggregator, iqueue, num_doers, initializer=None,
+        finalizer=None, resources=None, total=None):
     '''
     Run a pool of doers and an aggregator.
 
@@ -37,7 +52,27 @@ def run(doer, aggregator, iqueue, num_doers):
         Number of inputs to expect to be streamed. The parameter is used when
         creating the pool of doers.
     num_doers: int
-        Number of doers (processes) to spawn.
+        Number of doers (processes) to spawn. The doers and the aggregator
+        each open a database connection of their own and leave those of the
+        calling process untouched. They thus do not see what the calling
+        process has written in a transaction that is yet to be committed.
+    initializer: function, optional
+        Reference to a function that has the signature initializer() and is
+        called by every doer process before the doer, after the process has
+        opened its own database connection.
+    finalizer: function, optional
+        Reference to a function that has the signature finalizer() and is
+        called by every doer process after the doer returns, before the
+        process closes its database connections.
+    resources: list, optional
+        Names of NLP resources, keys of app.lib.nlp.resources.RESOURCES, to
+        load before the doer processes are spawned so that the processes share
+        them instead of each loading them.
+    total: int, optional
+        Number of items that will be streamed to the doers. Used to estimate
+        the time remaining when the run is monitored, i.e. when the METRICS
+        environment variable is set to the path of a file to which samples
+        of the progress of the run are appended (see app.lib.utils.monitor).
 
     Returns
     -------
@@ -52,18 +87,125 @@ def run(doer, aggregator, iqueue, num_doers):
     cqueue = manager.Queue(maxsize=5000)
     oqueue = manager.Queue()
 
+    # Resources loaded before forking are shared by the doers copy on write
+    for (name, seconds) in nlpresources.load(resources or []).items():
+        debug('Loaded {} in {:.2f}s'.format(name, seconds))
+
     # Aggregator Process
-    process = Process(target=aggregator, args=(oqueue, cqueue, num_doers))
+    process = Process(
+            target=_aggregate, args=(aggregator, oqueue, cqueue, num_doers)
+        )
     process.start()
 
     # Doer Processe(s)
-    with Pool(num_doers) as pool:
-        pool.starmap(doer, [(iqueue, cqueue) for i in range(num_doers)], 1)
+    path = monitor.get_path()
+    mqueue = manager.Queue() if path is not None else None
+    initargs = (initializer, time.time())
+    with contextlib.ExitStack() as stack:
+        if mqueue is not None:
+            stack.enter_context(monitor.Monitor(
+                    path, doer.__module__,
+                    {'iqueue': iqueue, 'cqueue': cqueue}, mqueue, total
+                ))
+        pool = stack.enter_context(Pool(num_doers, _initialize, initargs))
+        pool.starmap(
+                _do, [(doer, finalizer, iqueue, cqueue, mqueue)] * num_doers, 1
+            )
 
     process.join()
 
+    if profiling.enabled():
+        for path in profiling.report(_get_stage(doer)):
+            info('Profile written to {}'.format(path))
+
     return_ = None
     if not oqueue.empty():
         return_ = helpers.to_list(oqueue)
         return_ = return_[0] if len(return_) == 1 else return_
     return return_
+
+
+def spawn(target, args=()):
+    """
+    Start a process that calls target(*args), e.g. to stream input to doers,
+    and return the process. The process opens a database connection of its
+    own and leaves those of the calling process untouched, so the calling
+    process need not close its connections before the process is started.
+    """
+    process = Process(target=_spawned, args=(target, args))
+    process.start()
+    return process
+
+
+def detach():  # pragma: no cover
+    """
+    Set aside the database connections that a forked process inherited from
+    its parent and open connections of its own in their place. Opening a
+    connection also resets the state of any transaction that the parent was
+    in when it forked the process.
+    """
+    for conn in connections.all():
+        if conn.connection is not None:
+            _inherited.append(conn.connection)
+            conn.connection = None
+            conn.ensure_connection()
+
+
+def _aggregate(aggregator, oqueue, cqueue, num_doers):  # pragma: no cover
+    detach()
+    connection.ensure_connection()
+    try:
+        aggregator(oqueue, cqueue, num_doers)
+    finally:
+        connections.close_all()
+
+
+def _spawned(target, args):  # pragma: no cover
+    detach()
+    try:
+        target(*args)
+    finally:
+        connections.close_all()
+
+
+def _initialize(initializer, spawned):  # pragma: no cover
+    """
+    Prepare a doer process: set aside the database connections inherited from
+    the parent, open a connection of its own that is kept for the life of the
+    process, and call the initializer.
+    """
+    detach()
+    connection.ensure_connection()
+    if initializer is not None:
+        initializer()
+    debug('Worker {} started in {:.2f}s with {:.1f} MiB RSS'.format(
+            os.getpid(), time.time() - spawned, _get_rss()
+        ))
+
+
+def _do(doer, finalizer, iqueue, cqueue, mqueue):  # pragma: no cover
+    try:
+        with contextlib.ExitStack() as stack:
+            if mqueue is not None:
+                reporter = stack.enter_context(monitor.Reporter(mqueue))
+                iqueue = reporter.wrap(iqueue)
+            if profiling.enabled():
+                stack.enter_context(profiling.Profiler(_get_stage(doer)))
+            doer(iqueue, cqueue)
+        if finalizer is not None:
+            finalizer()
+    finally:
+        debug('Worker {} finished with {:.1f} MiB RSS'.format(
+                os.getpid(), _get_rss()
+            ))
+        connections.close_all()
+
+
+def _get_rss():
+    """Return the resident set size of the calling process in MiB."""
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def _get_stage(doer):
+    """Return the name of the stage of work done by a doer for profiling."""
+    return doer.__module__.rsplit('.', 1)[-1]
@@ -0,0 +1,219 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import contextlib
+import multiprocessing
+import queue
+
+from multiprocessing import Process
+
+from django.db import connections
+
+from app.lib.logger import *
+from app.lib.utils import profiling
+from app.lib.utils.parallel import EOI, detach
+
+# Seconds to wait on a process or queue of a pipeline before checking that
+# none of the processes of the pipeline failed
+TIMEOUT = 1.0
+
+
+class Stage(object):
+    """A stage of a pipeline that is executed by a group of processes.
+
+    Every process of a stage receives items from the queue between the stage
+    and the one before it, does its work on each item, and puts the items it
+    produces in the queue between the stage and the one after it. An item thus
+    flows through the pipeline as soon as a stage is done with it, without
+    waiting for the stage to be done with all items.
+    """
+    def __init__(self, name, doer, num_doers=1, finisher=None, args=()):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage. Used as the key of the count returned by run.
+        doer : function
+            Reference to a function that has the signature doer(item, *args)
+            and returns a tuple (outputs, count) where outputs is a list of
+            items for the next stage and count is the number of things done
+            with the item, e.g. rows saved.
+        num_doers : int, optional
+            Number of processes that execute the stage.
+        finisher : function, optional
+            Reference to a function that has the signature finisher(*args)
+            and returns a count. Called once by every process of the stage
+            after its last item, e.g. to save rows that were batched.
+        args : tuple, optional
+            Additional arguments to doer and finisher.
+        """
+        if num_doers < 1:
+            raise ValueError('A stage must have at least one doer')
+        self.name = name
+        self.doer = doer
+        self.num_doers = num_doers
+        self.finisher = finisher
+        self.args = args
+
+
+def run(streamer, stages, queue_size=0, args=()):
+    """
+    Run a pipeline of stages.
+
+    The streamer and every process of every stage open a database connection
+    of their own and leave those of the calling process untouched. They thus
+    do not see what the calling process has written in a transaction that is
+    yet to be committed.
+
+    An exception is raised if the streamer or a process of a stage raises an
+    exception or is killed, after the processes of the pipeline that are still
+    alive are terminated.
+
+    Parameters
+    ----------
+    streamer: function
+        Reference to a function that has the signature streamer(oqueue, *args)
+        and puts the items for the first stage in oqueue.
+    stages: list
+        List of Stage objects in the order in which an item flows through
+        them. The outputs of the last stage are discarded.
+    queue_size: int, optional
+        Maximum number of items in each queue between two stages. A stage that
+        is ahead of the stage after it blocks until there is room in the queue.
+        Default is no limit.
+    args: tuple, optional
+        Additional arguments to streamer.
+
+    Returns
+    -------
+    counts: collections.OrderedDict
+        The sum of the counts returned by the doers and finishers of each
+        stage, keyed by the name of the stage.
+    """
+    queues = [multiprocessing.Queue(queue_size) for stage in stages]
+    cqueue = multiprocessing.Queue()
+
+    # Streamer Process
+    source = Process(target=_stream, args=(streamer, queues[0], args))
+    source.start()
+
+    # Doer Processes
+    doers = list()
+    for (index, stage) in enumerate(stages):
+        oqueue = queues[index + 1] if index + 1 < len(stages) else None
+        queues_ = (queues[index], oqueue, cqueue)
+        processes = [
+                Process(target=_do, args=(stage,) + queues_)
+                for i in range(stage.num_doers)
+            ]
+        for process in processes:
+            process.start()
+        doers.append(processes)
+
+    processes = [source] + [process for group in doers for process in group]
+    try:
+        # Signal the end of input to a stage only when all processes of the
+        # stage before it are done
+        while source.is_alive():
+            source.join(TIMEOUT)
+            _check(processes)
+        if source.exitcode != 0:
+            raise Exception('Streamer of the pipeline failed')
+        counts = collections.OrderedDict((stage.name, 0) for stage in stages)
+        for (index, stage) in enumerate(stages):
+            for i in range(stage.num_doers):
+                _put(queues[index], EOI, processes)
+            for i in range(stage.num_doers):
+                (name, count, failed) = _get(cqueue, processes)
+                if failed:
+                    raise Exception('Stage {} of the pipeline failed'.format(
+                            name
+                        ))
+                counts[name] += count
+            for process in doers[index]:
+                process.join()
+    finally:
+        # Processes that are still alive are those of a failed pipeline
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if profiling.enabled():
+        for stage in stages:
+            for path in profiling.report(stage.name):
+                info('Profile written to {}'.format(path))
+
+    return counts
+
+
+def _check(processes):
+    """Raise an exception if any of the processes failed or was killed."""
+    for process in processes:
+        if process.exitcode not in (None, 0):
+            raise Exception('Process {} of the pipeline exited with {}'.format(
+                    process.pid, process.exitcode
+                ))
+
+
+def _get(queue_, processes):
+    """
+    Get an item from a queue, checking that none of the processes failed
+    while waiting for it.
+    """
+    while True:
+        try:
+            return queue_.get(timeout=TIMEOUT)
+        except queue.Empty:
+            _check(processes)
+
+
+def _put(queue_, item, processes):
+    """
+    Put an item in a queue, checking that none of the processes failed while
+    waiting for room in it.
+    """
+    while True:
+        try:
+            return queue_.put(item, timeout=TIMEOUT)
+        except queue.Full:
+            _check(processes)
+
+
+def _stream(streamer, oqueue, args):  # pragma: no cover
+    detach()
+    try:
+        streamer(oqueue, *args)
+    finally:
+        connections.close_all()
+
+
+def _do(stage, iqueue, oqueue, cqueue):  # pragma: no cover
+    detach()
+    (count, failed) = (0, True)
+    try:
+        with contextlib.ExitStack() as stack:
+            if profiling.enabled():
+                stack.enter_context(profiling.Profiler(stage.name))
+
+            while True:
+                item = iqueue.get()
+                if isinstance(item, str) and item == EOI:
+                    break
+
+                (outputs, cnt) = stage.doer(item, *stage.args)
+                count += cnt
+                if oqueue is not None:
+                    for output in outputs:
+                        oqueue.put(output)
+
+            if stage.finisher is not None:
+                count += stage.finisher(*stage.args)
+        failed = False
+    finally:
+        connections.close_all()
+        cqueue.put((stage.name, count, failed))
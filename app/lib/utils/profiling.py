@@ -0,0 +1,228 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import cProfile
+import collections
+import glob
+import json
+import os
+import pstats
+import signal
+import tracemalloc
+
+# Environment variable with the profiler to run every doer process under.
+# Nothing is profiled when it is not set.
+#   cprofile  Deterministic profiler, cProfile, of every function call
+#   sample    Statistical profiler that records the stack of the process at
+#             a fixed interval of CPU time
+ENVIRONMENT_VARIABLE = 'PROFILE'
+MODES = ['cprofile', 'sample']
+
+# Environment variable with the path to the directory to which profiles are
+# written. Default is DEFAULT_PATH in the current working directory.
+PATH_VARIABLE = 'PROFILE_PATH'
+DEFAULT_PATH = 'profiles'
+
+# Environment variable with the number of source lines that allocated the most
+# memory to report. Memory allocations are not traced when it is not set.
+TRACEMALLOC_VARIABLE = 'TRACEMALLOC'
+
+# Seconds of CPU time between two samples of the stack
+SAMPLE_INTERVAL = 0.005
+
+# Number of entries in the text reports
+REPORT_SIZE = 50
+
+
+def get_mode():
+    """
+    Return the profiler to run doer processes under or None if profiling is
+    disabled.
+    """
+    mode = os.environ.get(ENVIRONMENT_VARIABLE) or None
+    if mode is not None and mode not in MODES:
+        raise ValueError('{}={} is not one of {}'.format(
+                ENVIRONMENT_VARIABLE, mode, MODES
+            ))
+    return mode
+
+
+def get_top():
+    """
+    Return the number of allocations to report or None if memory allocations
+    are not traced.
+    """
+    top = os.environ.get(TRACEMALLOC_VARIABLE)
+    return int(top) if top else None
+
+
+def enabled():
+    """Return True if doer processes are profiled or traced."""
+    return get_mode() is not None or get_top() is not None
+
+
+def get_directory():
+    return os.environ.get(PATH_VARIABLE) or DEFAULT_PATH
+
+
+class Profiler(object):
+    """Profiles the calling process while in the context of the profiler.
+
+    The profile of the process and, if memory allocations are traced, the top
+    allocations are written to files named after the stage and the process
+    identifier. The files of all processes of a stage are merged by report.
+    """
+    def __init__(self, stage, mode=None, top=None, directory=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage of work done by the process.
+        mode : str, optional
+            Profiler to run, one of MODES. Default is get_mode().
+        top : int, optional
+            Number of allocations to record. Default is get_top().
+        directory : str, optional
+            Path to the directory to which the files are written. Default is
+            get_directory().
+        """
+        self.stage = stage
+        self.mode = mode if mode is not None else get_mode()
+        self.top = top if top is not None else get_top()
+        self.directory = directory or get_directory()
+        self._profile = None
+        self._samples = None
+
+    def __enter__(self):
+        if self.top is not None:
+            tracemalloc.start()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == 'sample':
+            self._samples = collections.Counter()
+            signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(
+                    signal.ITIMER_PROF, SAMPLE_INTERVAL, SAMPLE_INTERVAL
+                )
+        return self
+
+    def __exit__(self, *args):
+        os.makedirs(self.directory, exist_ok=True)
+        prefix = os.path.join(
+                self.directory, '{}.{}'.format(self.stage, os.getpid())
+            )
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(prefix + '.prof')
+        if self._samples is not None:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+            with open(prefix + '.samples.json', 'w') as file:
+                json.dump(self._samples, file)
+        if self.top is not None:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            allocations = [
+                    [str(stat.traceback), stat.size, stat.count]
+                    for stat in snapshot.statistics('lineno')[:self.top]
+                ]
+            with open(prefix + '.malloc.json', 'w') as file:
+                json.dump(allocations, file)
+
+    def _sample(self, signum, frame):
+        stack = list()
+        while frame is not None:
+            code = frame.f_code
+            stack.append('{}:{}:{}'.format(
+                    code.co_filename, code.co_name, frame.f_lineno
+                ))
+            frame = frame.f_back
+        self._samples[';'.join(reversed(stack))] += 1
+
+
+def report(stage, directory=None):
+    """
+    Merge the files written by the processes of a stage into one report per
+    kind of file. A report of a stage that already exists, e.g. from an
+    earlier run of the same stage, is merged with the files. The files are
+    removed once merged.
+
+    The reports are:
+        {stage}.prof         cProfile stats, readable using pstats
+        {stage}.txt          The functions with the most cumulative time
+        {stage}.samples.txt  Stacks and their number of samples, one per line,
+                             in the collapsed format read by flame graph tools
+        {stage}.malloc.txt   The source lines that allocated the most memory
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage.
+    directory : str, optional
+        Path to the directory to which the files were written. Default is
+        get_directory().
+
+    Returns
+    -------
+    paths : list
+        Paths to the reports written.
+    """
+    directory = directory or get_directory()
+    prefix = os.path.join(directory, stage)
+    paths = list()
+
+    files = glob.glob(prefix + '.[0-9]*.prof')
+    if files:
+        existing = [prefix + '.prof'] if os.path.exists(prefix + '.prof') \
+            else []
+        stats = pstats.Stats(*(existing + files))
+        stats.dump_stats(prefix + '.prof')
+        with open(prefix + '.txt', 'w') as file:
+            stats.stream = file
+            stats.sort_stats('cumulative').print_stats(REPORT_SIZE)
+        paths.extend([prefix + '.prof', prefix + '.txt'])
+
+    files = glob.glob(prefix + '.[0-9]*.samples.json')
+    if files:
+        samples = collections.Counter()
+        if os.path.exists(prefix + '.samples.txt'):
+            with open(prefix + '.samples.txt', 'r') as file:
+                for line in file:
+                    (stack, count) = line.rstrip('\n').rsplit(' ', 1)
+                    samples[stack] += int(count)
+        for path in files:
+            with open(path, 'r') as file:
+                samples.update(json.load(file))
+        with open(prefix + '.samples.txt', 'w') as file:
+            for (stack, count) in samples.most_common():
+                file.write('{} {}\n'.format(stack, count))
+        paths.append(prefix + '.samples.txt')
+
+    files = glob.glob(prefix + '.[0-9]*.malloc.json')
+    if files:
+        allocations = collections.defaultdict(lambda: [0, 0])
+        for path in files:
+            with open(path, 'r') as file:
+                for (line, size, count) in json.load(file):
+                    allocations[line][0] += size
+                    allocations[line][1] += count
+        top = sorted(
+                allocations.items(), key=lambda item: item[1][0],
+                reverse=True
+            )
+        with open(prefix + '.malloc.txt', 'a') as file:
+            file.write('{} processes\n'.format(len(files)))
+            for (line, (size, count)) in top[:REPORT_SIZE]:
+                file.write('{:>12,} B {:>9,} blocks  {}\n'.format(
+                        size, count, line
+                    ))
+            file.write('\n')
+        paths.append(prefix + '.malloc.txt')
+
+    for path in glob.glob(prefix + '.[0-9]*.*'):
+        os.remove(path)
+    return paths
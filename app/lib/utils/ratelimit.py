@@ -0,0 +1,79 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Token bucket rate limiter that may be shared by threads and coroutines.
+
+    Tokens are added to the bucket at a constant rate up to a capacity. Every
+    request consumes one token and has to wait for one to be added when the
+    bucket is empty. Waiting is done by reserving a token, which returns the
+    time until the token becomes available, so that the caller may sleep in a
+    manner appropriate to it (time.sleep or asyncio.sleep).
+    """
+    def __init__(self, rate, capacity=None):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        rate : float
+            Number of tokens added to the bucket per second, i.e. the sustained
+            number of requests per second.
+        capacity : float, optional
+            Maximum number of tokens in the bucket, i.e. the largest burst of
+            requests allowed. Default is one second worth of tokens.
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Reserve tokens and return the number of seconds to wait for them.
+
+        The tokens are consumed immediately, which may make the number of
+        tokens in the bucket negative. Subsequent reservations then wait
+        longer, so concurrent callers are spaced out at the rate of the bucket.
+
+        Parameters
+        ----------
+        tokens : float, optional
+            Number of tokens to reserve. Default is 1.
+
+        Returns
+        -------
+        delay : float
+            Number of seconds the caller must wait before using the tokens.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._timestamp) * self.rate
+                )
+            self._timestamp = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """Block the calling thread until the tokens are available.
+
+        Returns
+        -------
+        delay : float
+            Number of seconds the calling thread was blocked.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
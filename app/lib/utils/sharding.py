@@ -0,0 +1,105 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+from django.db.models import Max, Min
+
+from app.lib.utils import parallel
+
+# Number of shards per doer. A doer that is done with its shard takes another
+# so that doers are kept busy when rows are not spread evenly across shards.
+SHARDS_PER_DOER = 4
+
+
+def get_shards(queryset, num_shards):
+    """
+    Split the range of primary keys of the rows of a queryset into shards.
+
+    Parameters
+    ----------
+    queryset : django.db.models.QuerySet
+        Rows to split.
+    num_shards : int
+        Maximum number of shards.
+
+    Returns
+    -------
+    shards : list
+        List of tuples of the form (first, last) where first and last are the
+        smallest and largest primary keys in a shard. The shards are of equal
+        width, except the last, and include every primary key of the rows.
+    """
+    bounds = queryset.aggregate(first=Min('pk'), last=Max('pk'))
+    (first, last) = (bounds['first'], bounds['last'])
+    if first is None:
+        return list()
+    width = -(-(last - first + 1) // max(num_shards, 1))
+    return [
+            (start, min(start + width - 1, last))
+            for start in range(first, last + 1, width)
+        ]
+
+
+def iterate(queryset, shard, fields=(), batch_size=1000):
+    """
+    Iterate over the rows of a queryset in a shard in batches.
+
+    Batches are fetched using keyset pagination, i.e. every batch is the rows
+    whose primary key is greater than the largest in the batch before it, so
+    that every batch is a single index range scan regardless of how far into
+    the shard it is.
+
+    Parameters
+    ----------
+    queryset : django.db.models.QuerySet
+        Rows to iterate over.
+    shard : tuple
+        Tuple of the form (first, last) as returned by get_shards.
+    fields : tuple, optional
+        Names of the fields of the rows to fetch in addition to the primary
+        key.
+    batch_size : int, optional
+        Maximum number of rows in a batch.
+
+    Yields
+    ------
+    rows : list
+        List of tuples of the primary key and the fields of the rows in a
+        batch, in ascending order of the primary key.
+    """
+    (first, last) = shard
+    queryset = queryset.filter(pk__gte=first, pk__lte=last).order_by('pk')
+    previous = None
+    while True:
+        page = queryset if previous is None else \
+            queryset.filter(pk__gt=previous)
+        rows = list(page.values_list('pk', *fields)[:batch_size])
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            break
+        previous = rows[-1][0]
+
+
+def stream(queryset, iqueue, num_doers, args=()):
+    """
+    Put the shards of a queryset in the queue of input to doers followed by
+    an end of input for every doer. Each item is a tuple of the form
+    (query, shard) + args where query is the query of the queryset, which
+    the doers turn back into a queryset using get_queryset. The queryset
+    itself is not put in the queue since pickling it fetches all of its rows.
+    The queue must be large enough to hold all of the items since no doers
+    are running yet.
+    """
+    for shard in get_shards(queryset, num_doers * SHARDS_PER_DOER):
+        iqueue.put((queryset.query, shard) + args)
+
+    for i in range(num_doers):
+        iqueue.put(parallel.EOI)
+
+
+def get_queryset(query):
+    """Return a queryset of the rows selected by a query put by stream."""
+    queryset = query.model._default_manager.all()
+    queryset.query = query
+    return queryset
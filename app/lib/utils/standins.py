@@ -0,0 +1,321 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import ast
+import http.server
+import json
+import math
+import random
+import re
+import socketserver
+import threading
+import time
+import urllib.parse
+import zlib
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 so that clients may keep connections alive
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, method):
+        parsed = urllib.parse.urlparse(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        (status, content) = self.server.owner.dispatch(
+                method, parsed.path, query, body
+            )
+        if isinstance(content, (bytes, str)):
+            (content, type_) = (content, 'text/plain')
+        else:
+            (content, type_) = (json.dumps(content), 'application/json')
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', type_)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class Server(object):
+    """Base class of a local HTTP server that runs on a background thread.
+
+    Subclasses implement handle() to respond to requests. The server may be
+    configured to add latency to every response and to fail the first few
+    requests to every path to exercise the retry logic of clients.
+    """
+    def __init__(self, latency=0.0, failures=0, port=0):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        latency : float, optional
+            Seconds to wait before responding to each request.
+        failures : int, optional
+            Number of times each path responds with HTTP 503 before it
+            responds normally.
+        port : int, optional
+            Port to listen on. Default is an unused port chosen by the OS.
+        """
+        self.latency = latency
+        self.failures = failures
+        self.port = port
+        self.requests = 0
+        self._attempts = dict()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def start(self):
+        self._server = _HTTPServer(('127.0.0.1', self.port), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def dispatch(self, method, path, query, body):
+        with self._lock:
+            self.requests += 1
+            attempts = self._attempts.get(path, 0)
+            self._attempts[path] = attempts + 1
+        if self.latency:
+            time.sleep(self.latency)
+        if attempts < self.failures:
+            return (503, {'error': 'Service Unavailable'})
+        return self.handle(method, path, query, body)
+
+    def handle(self, method, path, query, body):
+        raise NotImplementedError()
+
+
+class CoreNLPServer(Server):
+    """Stand-in for a Stanford CoreNLP server annotating with the sentiment
+    or the parse and depparse annotators.
+
+    A POST to / with the text in the body and the annotators in the
+    properties parameter responds, as CoreNLP does, with the sentences of the
+    text and their tokens along with their sentiment or their parse tree and
+    dependencies. The response to a text in the fixtures is the response
+    recorded for it. Any other text is given a canned response: every word is
+    a noun in a flat noun phrase that depends on the first word, and the
+    sentiment is derived from a checksum of the sentence so that the same
+    sentence always has the same sentiment.
+
+    The time taken to annotate a text is drawn from a distribution of
+    latencies, to which an amount per token is added, and at most concurrency
+    texts are annotated at once, as with the -threads option of CoreNLP, while
+    other requests wait. A fraction of requests fail with HTTP 500. The
+    seconds from the arrival of every request to its response are recorded
+    in latencies.
+    """
+    DISTRIBUTIONS = ['constant', 'uniform', 'exponential', 'lognormal']
+    SENTIMENTS = ['Verynegative', 'Negative', 'Neutral', 'Positive',
+                  'Verypositive']
+    TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+    SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+    def __init__(self, latency=0.0, distribution='constant', jitter=0.0,
+                 per_token=0.0, concurrency=None, error_rate=0.0, seed=None,
+                 fixtures=None, **kwargs):
+        """
+        Constructor.
+
+        Parameters
+        ----------
+        latency : float, optional
+            Median seconds taken to annotate a text.
+        distribution : str, optional
+            Distribution, one of DISTRIBUTIONS, of the seconds taken. uniform
+            is latency plus or minus jitter, exponential has a mean of
+            latency, and lognormal has a median of latency and a shape,
+            i.e. the standard deviation of the logarithm, of jitter.
+        jitter : float, optional
+            Spread of the uniform and lognormal distributions.
+        per_token : float, optional
+            Seconds added to the time taken for every token in the text.
+        concurrency : int, optional
+            Maximum number of texts annotated at once. Default is no limit.
+        error_rate : float, optional
+            Fraction of requests that fail with HTTP 500.
+        seed : int, optional
+            Seed of the random number generator of latencies and errors.
+        fixtures : str, optional
+            Path to a JSON file of responses keyed by the text they are the
+            response to.
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError('{} is not a known distribution'.format(
+                    distribution
+                ))
+        super(CoreNLPServer, self).__init__(**kwargs)
+        self.median = latency
+        self.distribution = distribution
+        self.jitter = jitter
+        self.per_token = per_token
+        self.error_rate = error_rate
+        self.fixtures = dict()
+        if fixtures is not None:
+            with open(fixtures, 'r') as file:
+                self.fixtures = json.load(file)
+        self.errors = 0
+        self.latencies = list()
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(concurrency) \
+            if concurrency else None
+
+    def reset(self):
+        """Forget the requests served so far."""
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.latencies = list()
+            self._attempts = dict()
+
+    def handle(self, method, path, query, body):
+        begin = time.monotonic()
+        if method != 'POST' or path != '/':
+            return (404, {'error': 'Not Found'})
+        text = body.decode('utf-8')
+        properties = self._get_properties(query.get('properties'))
+
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            with self._lock:
+                (delay, failed) = (
+                        self._get_delay(), self._random.random() <
+                        self.error_rate
+                    )
+            delay += self.per_token * len(self.TOKEN_RE.findall(text))
+            if delay > 0:
+                time.sleep(delay)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+        if failed:
+            (status, content) = (500, 'java.lang.RuntimeException: stand-in')
+        elif text in self.fixtures:
+            (status, content) = (200, self.fixtures[text])
+        else:
+            (status, content) = (200, self.annotate(text, properties))
+        with self._lock:
+            self.errors += 1 if failed else 0
+            self.latencies.append(time.monotonic() - begin)
+        return (status, content)
+
+    def annotate(self, text, properties):
+        """
+        Return the canned response to a text annotated with the annotators
+        in the properties.
+        """
+        annotators = [
+                a.strip() for a in properties.get('annotators', '').split(',')
+            ]
+        texts = [text.strip()]
+        if str(properties.get('ssplit.isOneSentence')).lower() != 'true':
+            texts = [t for t in self.SENTENCE_RE.split(text.strip()) if t]
+
+        sentences = list()
+        position = 0
+        for (index, sentence_text) in enumerate(texts):
+            tokens = list()
+            for match in self.TOKEN_RE.finditer(sentence_text):
+                (word, begin) = (match.group(0), text.find(
+                        match.group(0), position
+                    ))
+                position = begin + len(word)
+                tokens.append({
+                        'index': len(tokens) + 1, 'word': word,
+                        'originalText': word, 'characterOffsetBegin': begin,
+                        'characterOffsetEnd': position,
+                        'pos': 'NN' if word[0].isalnum() else '.',
+                        'before': ' ', 'after': ' '
+                    })
+            sentence = {'index': index, 'tokens': tokens}
+            if 'sentiment' in annotators:
+                value = zlib.crc32(sentence_text.encode('utf-8')) % 5
+                sentence['sentimentValue'] = str(value)
+                sentence['sentiment'] = self.SENTIMENTS[value]
+            if 'parse' in annotators:
+                sentence['parse'] = '(ROOT\n  (NP {}))'.format(' '.join(
+                        '({} {})'.format(
+                            token['pos'], token['word']
+                            .replace('(', '-LRB-').replace(')', '-RRB-')
+                        ) for token in tokens
+                    ))
+            if 'depparse' in annotators:
+                dependencies = [
+                        {
+                            'dep': 'ROOT' if token['index'] == 1 else 'dep',
+                            'governor': 0 if token['index'] == 1 else 1,
+                            'governorGloss':
+                                'ROOT' if token['index'] == 1
+                                else tokens[0]['word'],
+                            'dependent': token['index'],
+                            'dependentGloss': token['word']
+                        }
+                        for token in tokens
+                    ]
+                for key in ['basicDependencies', 'enhancedDependencies',
+                            'enhancedPlusPlusDependencies']:
+                    sentence[key] = dependencies
+            sentences.append(sentence)
+        return {'sentences': sentences}
+
+    def _get_delay(self):
+        if self.distribution == 'uniform':
+            return max(0.0, self._random.uniform(
+                    self.median - self.jitter, self.median + self.jitter
+                ))
+        if self.distribution == 'exponential' and self.median > 0:
+            return self._random.expovariate(1.0 / self.median)
+        if self.distribution == 'lognormal' and self.median > 0:
+            return self._random.lognormvariate(
+                    math.log(self.median), self.jitter
+                )
+        return self.median
+
+    def _get_properties(self, properties):
+        # CoreNLP accepts properties as JSON or, as the analyzers send them,
+        # as a Python-like literal with single quotes
+        if not properties:
+            return dict()
+        try:
+            return json.loads(properties)
+        except ValueError:
+            return ast.literal_eval(properties)
@@ -0,0 +1,195 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import os
+import shutil
+import tempfile
+
+from datetime import datetime as dt
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.lib import loaders, synthetic
+from app.lib.helpers import *
+from app.lib.logger import *
+from app.lib.utils import benchmark, parallel
+from app.management.commands import loaddb
+
+# Corpus from which the synthetic corpus is generated
+SEED_PATH = os.path.join(settings.BASE_DIR, 'app/tests/data')
+
+
+class TimedCommand(loaddb.Command):
+    """
+    loaddb with the time taken and memory used by every stage of the load
+    recorded.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Shared with the processes that load a year each
+        self.records = parallel.manager.list()
+
+    def run_stage(self, name, function):
+        record = benchmark.measure(name, function)
+        self.records.append(record)
+        return record.get('counts', record['count'])
+
+
+class Command(BaseCommand):
+    """
+    Sets up command line arguments.
+    """
+    help = 'Generate a synthetic corpus of reviews and bugs, load it into a ' \
+           'test database with loaddb, and report the time taken and memory ' \
+           'used by each stage of loaddb.'
+
+    def add_arguments(self, parser):
+        """
+
+        """
+        parser.add_argument(
+                '--size', dest='size', type=int, default=100,
+                help='Number of reviews to generate for each year. Bugs are '
+                'generated in the ratio of bugs to reviews in the seed '
+                'corpus. Default is 100.'
+            )
+        parser.add_argument(
+                '--year', dest='years', type=int, action='append',
+                default=None, help='Year to generate reviews and bugs for. '
+                'May be specified more than once. Default is 2016.'
+            )
+        parser.add_argument(
+                '--seed', dest='seed', type=int, default=0,
+                help='Seed of the random number generator used to generate '
+                'the corpus. Default is 0.'
+            )
+        parser.add_argument(
+                '--processes', dest='processes', type=int,
+                default=settings.CPU_COUNT,
+                help='Number of processes to spawn. Default is {}'.format(
+                        settings.CPU_COUNT
+                    )
+            )
+        parser.add_argument(
+                '--parallel-years', dest='parallel_years', type=int,
+                default=1, help='Number of years to load at once as loaddb '
+                '--parallel-years does. Default is 1.'
+            )
+        parser.add_argument(
+                '--pipeline', dest='pipeline', action='store_true',
+                help='If specified, the comments, messages, sentences, and '
+                'tokens are loaded by a single pipeline as loaddb '
+                '--pipeline does.'
+            )
+        parser.add_argument(
+                '--mode', dest='mode', default='parallel',
+                choices=loaders.MODES,
+                help='Mode in which bugs, vulnerabilities, and reviews are '
+                'loaded. Default is parallel.'
+            )
+        parser.add_argument(
+                '--writers', dest='writers', type=int, default=1,
+                help='Number of processes that save bugs and reviews in the '
+                'bulk mode. Default is 1.'
+            )
+        parser.add_argument(
+                '--directory', dest='directory', default=None,
+                help='Path to the directory to which the corpus is written. '
+                'Default is a temporary directory.'
+            )
+        parser.add_argument(
+                '--keep', dest='keep', action='store_true',
+                help='If specified, the corpus is not deleted when done.'
+            )
+        parser.add_argument(
+                '--output', dest='output', default=None,
+                help='Path to the JSON file to which the report is written.'
+            )
+
+    def handle(self, *args, **options):
+        """
+
+        """
+        size = options['size']
+        years = options['years'] or [2016]
+        processes = options['processes']
+        parallel_years = options['parallel_years']
+        pipeline = options['pipeline']
+        mode = options['mode']
+        writers = options['writers']
+
+        if settings.ENVIRONMENT == 'PROD':
+            raise CommandError('benchmark must not be run in production')
+        if not benchmark.is_local(connection.settings_dict):
+            raise CommandError(
+                    'benchmark must be run against a local PostgreSQL database'
+                )
+
+        directory = options['directory'] or tempfile.mkdtemp(
+                prefix='benchmark-'
+            )
+        begin = dt.now()
+        try:
+            info('benchmark Command')
+            info('  Years: {}  Size: {:,}  Processes: {}'.format(
+                    years, size, processes
+                ))
+
+            seed = synthetic.get_settings(SEED_PATH, settings.YEARS)
+            generator = synthetic.Generator(seed, seed=options['seed'])
+            corpus = collections.OrderedDict()
+
+            def generate():
+                corpus.update(generator.generate(directory, years, size))
+                return corpus['reviews'] + corpus['bugs']
+
+            record = benchmark.measure('generate', generate)
+            info('  Corpus of {:,.1f} MiB in {}'.format(
+                    corpus['bytes'] / benchmark.MEBIBYTE, directory
+                ))
+
+            corpus_settings = synthetic.get_settings(directory, years)
+            for name in ['BUGS_PATH', 'IDS_PATH', 'REVIEWS_PATH',
+                         'VULNERABILITIES_PATH']:
+                setattr(settings, name, getattr(corpus_settings, name))
+            settings.YEARS = years
+
+            command = TimedCommand()
+            name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+            try:
+                total = benchmark.measure(
+                        'loaddb', call_command, command, processes=processes,
+                        parallel_years=parallel_years, pipeline=pipeline,
+                        mode=mode, writers=writers
+                    )
+            finally:
+                connection.creation.destroy_test_db(name, verbosity=0)
+            records = [record] + list(command.records)
+
+            report = collections.OrderedDict([
+                    ('date', begin.isoformat()), ('years', years),
+                    ('size', size), ('seed', options['seed']),
+                    ('processes', processes),
+                    ('parallel_years', parallel_years),
+                    ('pipeline', pipeline), ('mode', mode),
+                    ('writers', writers), ('corpus', corpus),
+                    ('stages', records), ('seconds', total['seconds'])
+                ])
+            for line in benchmark.to_table(records):
+                info('  {}'.format(line))
+            if options['output'] is not None:
+                path = benchmark.save(report, options['output'])
+                info('  Report saved to {}'.format(path))
+        except KeyboardInterrupt:  # pragma: no cover
+            warning('Attempting to abort.')
+        finally:
+            if not options['keep'] and os.path.exists(directory):
+                shutil.rmtree(directory)
+            info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
@@ -0,0 +1,223 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import collections
+import random
+
+from datetime import datetime as dt
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.lib import taggers
+from app.lib.helpers import *
+from app.lib.logger import *
+from app.lib.nlp import benchmark as nlpbenchmark
+from app.lib.utils import benchmark
+from app.lib.utils.standins import CoreNLPServer
+from app.models import Sentence
+
+# Name of a tagger -> Tagger that sends sentences to CoreNLP
+TAGGERS = collections.OrderedDict([
+        ('sentiment', taggers.SentimentTagger),
+        ('sentenceparse', taggers.SentenceParseTagger)
+    ])
+
+# Columns of the table of records
+COLUMNS = [
+        ('tagger', 'Tagger', lambda value: value),
+        ('processes', 'Processes', lambda value: '{:,}'.format(value)),
+        ('count', 'Sentences', lambda value: '{:,}'.format(value)),
+        ('rate', 'Sentences/s', lambda value: '{:,.1f}'.format(value)),
+        ('p50', 'p50 (ms)', lambda value: '{:,.1f}'.format(value * 1000)),
+        ('p99', 'p99 (ms)', lambda value: '{:,.1f}'.format(value * 1000)),
+        ('errors', 'Errors', lambda value: '{:,}'.format(value)),
+        ('peak_rss', 'Peak RSS (MiB)',
+         lambda value: '{:,.1f}'.format(value / benchmark.MEBIBYTE))
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Sets up command line arguments.
+    """
+    help = 'Tag sentences from reviews using the taggers that send them to ' \
+           'CoreNLP, against a local stand-in for CoreNLP, and report the ' \
+           'throughput and latency at every number of processes.'
+
+    def add_arguments(self, parser):
+        """
+
+        """
+        parser.add_argument(
+                '--tagger', dest='taggers', action='append',
+                choices=list(TAGGERS), default=None,
+                help='Tagger to benchmark. May be specified more than once. '
+                'Default is all taggers.'
+            )
+        parser.add_argument(
+                '--processes', dest='processes', type=int, action='append',
+                default=None, help='Number of processes to run a tagger '
+                'with. May be specified more than once. Default is 1, 2, 4, '
+                'and {}.'.format(settings.CPU_COUNT)
+            )
+        parser.add_argument(
+                '--size', dest='size', type=int, default=500,
+                help='Number of sentences to tag. Default is 500.'
+            )
+        parser.add_argument(
+                '--seed', dest='seed', type=int, default=0,
+                help='Seed of the random number generators used to sample '
+                'the sentences and by the stand-in. Default is 0.'
+            )
+        parser.add_argument(
+                '--latency', dest='latency', type=float, default=0.05,
+                help='Median seconds the stand-in takes to annotate a '
+                'sentence. Default is 0.05.'
+            )
+        parser.add_argument(
+                '--distribution', dest='distribution', default='lognormal',
+                choices=CoreNLPServer.DISTRIBUTIONS,
+                help='Distribution of the seconds the stand-in takes to '
+                'annotate a sentence. Default is lognormal.'
+            )
+        parser.add_argument(
+                '--jitter', dest='jitter', type=float, default=0.5,
+                help='Spread of the uniform and lognormal distributions. '
+                'Default is 0.5.'
+            )
+        parser.add_argument(
+                '--per-token', dest='per_token', type=float, default=0.0,
+                help='Seconds the stand-in adds for every token in a '
+                'sentence. Default is 0.'
+            )
+        parser.add_argument(
+                '--concurrency', dest='concurrency', type=int, default=None,
+                help='Maximum number of sentences the stand-in annotates at '
+                'once, as with the -threads option of CoreNLP. Default is '
+                'no limit.'
+            )
+        parser.add_argument(
+                '--error-rate', dest='error_rate', type=float, default=0.0,
+                help='Fraction of requests to the stand-in that fail. '
+                'Default is 0.'
+            )
+        parser.add_argument(
+                '--fixtures', dest='fixtures', default=None,
+                help='Path to a JSON file of CoreNLP responses keyed by '
+                'sentence that the stand-in responds with.'
+            )
+        parser.add_argument(
+                '--output', dest='output', default=None,
+                help='Path to the JSON file to which the report is written.'
+            )
+
+    def handle(self, *args, **options):
+        """
+
+        """
+        names = options['taggers'] or list(TAGGERS)
+        processes = options['processes'] or \
+            sorted({1, 2, 4, settings.CPU_COUNT})
+
+        if settings.ENVIRONMENT == 'PROD':
+            raise CommandError('benchmark must not be run in production')
+        if not benchmark.is_local(connection.settings_dict):
+            raise CommandError(
+                    'benchmark must be run against a local PostgreSQL database'
+                )
+
+        begin = dt.now()
+        try:
+            info('benchmarkcorenlp Command')
+            texts = self._get_texts(options['size'], options['seed'])
+            info('  {:,} sentences'.format(len(texts)))
+
+            server = CoreNLPServer(
+                    latency=options['latency'],
+                    distribution=options['distribution'],
+                    jitter=options['jitter'], per_token=options['per_token'],
+                    concurrency=options['concurrency'],
+                    error_rate=options['error_rate'], seed=options['seed'],
+                    fixtures=options['fixtures']
+                )
+            name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, serialize=False
+                )
+            try:
+                with server:
+                    settings.CORENLP_URLS = [server.url + '/']
+                    info('  Stand-in serving on {}'.format(server.url))
+                    Sentence.objects.bulk_create(
+                            [Sentence(text=text) for text in texts],
+                            batch_size=settings.BATCH_SIZE
+                        )
+                    sentences = list(Sentence.objects.order_by('id'))
+                    records = self._run(server, sentences, names, processes)
+            finally:
+                connection.creation.destroy_test_db(name, verbosity=0)
+
+            for line in benchmark.to_table(records, COLUMNS):
+                info('  {}'.format(line))
+            if options['output'] is not None:
+                report = collections.OrderedDict([
+                        ('date', begin.isoformat()),
+                        ('sentences', len(texts)),
+                        ('server', collections.OrderedDict(
+                            (key, options[key]) for key in [
+                                'latency', 'distribution', 'jitter',
+                                'per_token', 'concurrency', 'error_rate',
+                                'seed', 'fixtures'
+                            ]
+                        )),
+                        ('runs', records)
+                    ])
+                path = benchmark.save(report, options['output'])
+                info('  Report saved to {}'.format(path))
+        except KeyboardInterrupt:  # pragma: no cover
+            warning('Attempting to abort.')
+        finally:
+            info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
+
+    def _get_texts(self, size, seed):
+        """
+        Return a sample, uniformly at random, of the sentences, prose and
+        code-heavy alike, in the comments and messages of the reviews.
+        """
+        sentences = nlpbenchmark.get_sentences(settings)
+        population = sorted(set().union(*sentences.values()))
+        return random.Random(seed).sample(
+                population, min(size, len(population))
+            )
+
+    def _run(self, server, sentences, names, processes):
+        """
+        Tag the sentences using every tagger with every number of processes
+        and return a record of every run. The latencies are those of the
+        requests as seen by the stand-in, including the time spent waiting
+        for a slot when its concurrency is limited.
+        """
+        records = list()
+        for name in names:
+            for count in processes:
+                server.reset()
+                tagger = TAGGERS[name](settings, count, sentences)
+                record = benchmark.measure(
+                        '{}:{}'.format(name, count), tagger.tag
+                    )
+                summary = benchmark.summarize(server.latencies)
+                record.update([
+                        ('tagger', name), ('processes', count),
+                        ('requests', server.requests),
+                        ('errors', server.errors), ('mean', summary['mean'])
+                    ] + [
+                        ('p{}'.format(p), summary['p{}'.format(p)])
+                        for p in benchmark.PERCENTILES
+                    ])
+                info('  {:<16} {:>3} processes {:>10,.1f} sentences/s'.format(
+                        name, count, record['rate']
+                    ))
+                records.append(record)
+        return records
@@ -0,0 +1,170 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+from datetime import datetime as dt
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.lib.helpers import *
+from app.lib.logger import *
+from app.lib.nlp import benchmark as nlpbenchmark
+from app.lib.utils import benchmark
+
+# Path to the file, relative to the current working directory, to which
+# results are saved by default
+RESULTS_PATH = 'benchmarks/nlp.json'
+
+# Columns of the table of results
+COLUMNS = [
+        ('name', 'Component', lambda value: value),
+        ('calls', 'Calls', lambda value: '{:,}'.format(value)),
+        ('ops', 'Ops/s', lambda value: '{:,.1f}'.format(value)),
+        ('p50', 'p50 (ms)', lambda value: '{:,.3f}'.format(value * 1000)),
+        ('p99', 'p99 (ms)', lambda value: '{:,.3f}'.format(value * 1000)),
+        ('memory', 'Memory (KiB)',
+         lambda value: '-' if value is None else '{:,.1f}'.format(
+                value / 1024
+            )),
+        ('change', 'Ops/s vs. Baseline',
+         lambda value: '-' if value is None else '{:+.1%}'.format(value))
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Sets up command line arguments.
+    """
+    help = 'Measure the throughput, latency, and memory of the components ' \
+           'of the NLP pipeline on sentences from reviews and compare them ' \
+           'with a baseline.'
+
+    def add_arguments(self, parser):
+        """
+
+        """
+        parser.add_argument(
+                '--component', dest='components', action='append',
+                choices=list(nlpbenchmark.COMPONENTS), default=None,
+                help='Component to measure. May be specified more than once. '
+                'Default is all components.'
+            )
+        parser.add_argument(
+                '--size', dest='size', type=int, default=200,
+                help='Number of sentences of each kind, prose and code-heavy, '
+                'to measure the components on. Default is 200.'
+            )
+        parser.add_argument(
+                '--repeat', dest='repeat', type=int, default=3,
+                help='Number of times every sentence is run through a '
+                'component. Default is 3.'
+            )
+        parser.add_argument(
+                '--seed', dest='seed', type=int, default=0,
+                help='Seed of the random number generator used to sample '
+                'the sentences. Default is 0.'
+            )
+        parser.add_argument(
+                '--results', dest='results', default=RESULTS_PATH,
+                help='Path to the JSON file to which results are saved keyed '
+                'by git revision. Default is {}.'.format(RESULTS_PATH)
+            )
+        parser.add_argument(
+                '--baseline', dest='baseline', default=None,
+                help='Git revision whose results are compared with. Default '
+                'is the revision saved as the baseline.'
+            )
+        parser.add_argument(
+                '--save-baseline', dest='save_baseline', action='store_true',
+                help='If specified, the results are saved as the baseline.'
+            )
+        parser.add_argument(
+                '--threshold', dest='threshold', type=float, default=0.1,
+                help='Fraction by which ops/s, p50, or p99 must be worse '
+                'than that of the baseline to be flagged as a regression. '
+                'Default is 0.1.'
+            )
+        parser.add_argument(
+                '--fail', dest='fail', action='store_true',
+                help='If specified, the command fails when a regression is '
+                'flagged.'
+            )
+
+    def handle(self, *args, **options):
+        """
+
+        """
+        begin = dt.now()
+        regressions = list()
+        try:
+            info('benchmarknlp Command')
+            (revision, dirty) = benchmark.get_revision(settings.BASE_DIR)
+            if revision is None:
+                warning('  Not a git repository. Results are saved as local.')
+                revision = 'local'
+            info('  Revision: {}{}'.format(
+                    revision, ' (dirty)' if dirty else ''
+                ))
+
+            samples = nlpbenchmark.get_samples(
+                    settings, options['size'], options['seed']
+                )
+            info('  {:,} sentences ({})'.format(len(samples), ', '.join(
+                    '{:,} {}'.format(
+                        len([s for s in samples if s.kind == kind]), kind
+                    ) for kind in nlpbenchmark.KINDS
+                )))
+
+            results = nlpbenchmark.run(
+                    samples, options['components'], options['repeat']
+                )
+
+            store = benchmark.Results(options['results'])
+            baseline = store.get(options['baseline'])
+            if options['baseline'] is not None and baseline is None:
+                raise CommandError('No results of {}'.format(
+                        options['baseline']
+                    ))
+
+            rows = list()
+            for (name, summary) in results.items():
+                row = dict(summary, name=name, change=None)
+                if baseline is not None and name in baseline and \
+                        baseline[name]['ops']:
+                    row['change'] = \
+                        summary['ops'] / baseline[name]['ops'] - 1
+                rows.append(row)
+            for line in benchmark.to_table(rows, COLUMNS):
+                info('  {}'.format(line))
+
+            if baseline is not None:
+                regressions = benchmark.compare(
+                        results, baseline, options['threshold']
+                    )
+                for (name, metric, before, after, change) in regressions:
+                    warning('  Regression: {} {} {:.6g} -> {:.6g} '
+                            '({:+.1%})'.format(
+                                name, metric, before, after, change
+                            ))
+                if not regressions:
+                    info('  No regressions against {}'.format(
+                            options['baseline'] or store.baseline
+                        ))
+
+            store.add(
+                    revision, results, date=begin.isoformat(), dirty=dirty,
+                    size=options['size'], repeat=options['repeat'],
+                    seed=options['seed']
+                )
+            if options['save_baseline']:
+                store.baseline = revision
+            path = store.save()
+            info('  Results saved to {}'.format(path))
+        except KeyboardInterrupt:  # pragma: no cover
+            warning('Attempting to abort.')
+        finally:
+            info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
+
+        if regressions and options['fail']:
+            raise CommandError('{} regressions'.format(len(regressions)))
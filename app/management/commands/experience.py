@@ -9,7 +9,7 @@ from datetime import datetime as dt
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import connection, connections
+from django.db import connection
 
 from app.lib import loaders, taggers
 from app.lib.helpers import *
@@ -53,7 +53,6 @@ class Command(BaseCommand):
                     .filter(patch__patchset__review_id__in=review_ids)
             comments = comments.iterator()
 
-            connections.close_all()  # Hack
             tagger = taggers.ExperienceTagger(settings, processes, comments)
             tagger.tag()
         except KeyboardInterrupt:
@@ -51,6 +51,16 @@ class Command(BaseCommand):
                 help='If specified, only sentences in the given year will be'
                 'tagged with the given "--metrics".'
             )
+        parser.add_argument(
+                '--mode', dest='mode', default='parallel',
+                choices=taggers.baselines.MODES,
+                help='Mode in which the metrics are computed. In the '
+                'vectorized mode, the metrics of batches of sentences are '
+                'computed with array operations and saved in bulk. In the '
+                'sharded mode, the batches are fetched by the processes '
+                'themselves from ranges of sentence identifiers. Default is '
+                'parallel.'
+            )
 
     def handle(self, *args, **options):
         """
@@ -59,6 +69,7 @@ class Command(BaseCommand):
         processes = options['processes']
         metrics = options['metrics']
         year = options['year']
+        mode = options['mode']
         begin = dt.now()
         try:
             sentences = []
@@ -67,7 +78,9 @@ class Command(BaseCommand):
             else:
                 sentences = qs.query_all('sentence', ids=False).exclude(text='')
             connections.close_all()
-            tagger = taggers.BaselinesTagger(settings, processes, sentences, metrics)
+            tagger = taggers.BaselinesTagger(
+                    settings, processes, sentences, metrics, mode=mode
+                )
             tagger.tag()
         except KeyboardInterrupt: # pragma: no cover
             warning('Attempting to abort.')
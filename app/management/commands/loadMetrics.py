@@ -49,6 +49,13 @@ class Command(BaseCommand):
                 help='If specified, only sentences in the given year will be'
                 'tagged with the given "--metrics".'
             )
+        parser.add_argument(
+                '--mode', dest='mode', default='parallel',
+                choices=taggers.metrics.MODES,
+                help='Mode in which the metrics are computed. In the sharded '
+                'mode, the processes fetch their own batches of sentences '
+                'from ranges of sentence identifiers. Default is parallel.'
+            )
 
     def handle(self, *args, **options):
         """
@@ -57,6 +64,7 @@ class Command(BaseCommand):
         processes = options['processes']
         metrics = options['metrics']
         year = options['year']
+        mode = options['mode']
         begin = dt.now()
         try:
             sentences = []
@@ -65,7 +73,9 @@ class Command(BaseCommand):
             else:
                 sentences = qs.query_all('sentence', ids=False).exclude(text='')
             connections.close_all()
-            tagger = taggers.MetricsTagger(settings, processes, sentences, metrics)
+            tagger = taggers.MetricsTagger(
+                    settings, processes, sentences, metrics, mode=mode
+                )
             tagger.tag()
         except KeyboardInterrupt: # pragma: no cover
             warning('Attempting to abort.')
@@ -3,16 +3,18 @@
 """
 
 import multiprocessing
+import queue
 
 from datetime import datetime as dt
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.db import connection, connections
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
-from app.lib import loaders, taggers
+from app.lib import deltas, loaders, taggers
 from app.lib.helpers import *
 from app.lib.logger import *
+from app.lib.utils import parallel
 from app.models import *
 
 import app.queryStrings as qs
@@ -41,76 +43,327 @@ class Command(BaseCommand):
                 help='If specified, only the given year will be loaded.'
             )
 
+        parser.add_argument(
+                '--parallel-years', dest='parallel_years', type=int,
+                default=1, help='Number of years to load at once. Each year '
+                'is loaded by an independent pipeline with its own streamers '
+                'and aggregators and an equal share of the processes. '
+                'Default is 1.'
+            )
+
+        parser.add_argument(
+                '--pipeline', dest='pipeline', action='store_true',
+                help='If specified, the comments, messages, sentences, and '
+                'tokens of a review are loaded by a single pipeline as soon '
+                'as the review is read instead of by one loader after '
+                'another.'
+            )
+
+        parser.add_argument(
+                '--mode', dest='mode', default='parallel',
+                choices=loaders.MODES,
+                help='Mode in which bugs, vulnerabilities, and reviews are '
+                'loaded. In the bulk mode, the rows referred to are read once '
+                'and the rows loaded are saved in batches. Default is '
+                'parallel.'
+            )
+
+        parser.add_argument(
+                '--writers', dest='writers', type=int, default=1,
+                help='Number of processes that save bugs and reviews in the '
+                'bulk mode. Default is 1.'
+            )
+
+        parser.add_argument(
+                '--delta', dest='delta', default=None,
+                help='Path to a delta written by savereviews/savebugs '
+                '--refresh. If specified, only the reviews (and the rows '
+                'derived from them) or bugs in the delta are replaced.'
+            )
+
     def handle(self, *args, **options):
         """
 
         """
         processes = options['processes']
         year = options['year']
+        delta = options['delta']
+        parallel_years = options['parallel_years']
+        self.pipeline = options['pipeline']
+        self.mode = options['mode']
+        self.writers = options['writers']
         begin = dt.now()
         try:
             info('loaddb Command')
+            if delta is not None:
+                self._load_delta(delta, processes)
+                return
+
             info('  Years: {}'.format(settings.YEARS))
 
             if year != 0:
                 settings.YEARS = [year]
 
-            loader = loaders.BugLoader(settings, processes)
-            count = loader.load()
+            loader = loaders.BugLoader(
+                    settings, processes, mode=self.mode,
+                    num_writers=self.writers
+                )
+            count = self.run_stage('bugs', loader.load)
             info('  {:,} bugs loaded'.format(count))
 
-            loader = loaders.VulnerabilityLoader(settings, processes)
-            count = loader.load()
+            loader = loaders.VulnerabilityLoader(
+                    settings, processes, mode=self.mode
+                )
+            count = self.run_stage('vulnerabilities', loader.load)
             info('  {:,} vulnerabilities loaded'.format(count))
 
-            loader = loaders.ReviewLoader(settings, processes)
-            count = loader.load()
+            if parallel_years > 1 and len(settings.YEARS) > 1:
+                self.timings = self._load_years(
+                        settings.YEARS, processes, parallel_years
+                    )
+                failed = [
+                        year for (year, (_, success)) in self.timings.items()
+                        if not success
+                    ]
+                if failed:
+                    raise CommandError(
+                            'Failed to load the reviews of {}'.format(failed)
+                        )
+                return
+
+            loader = loaders.ReviewLoader(
+                    settings, processes, mode=self.mode,
+                    num_writers=self.writers
+                )
+            count = self.run_stage('reviews', loader.load)
             info('  {:,} reviews loaded'.format(count))
 
             tagger = taggers.MissedVulnerabilityTagger(settings, processes)
-            count = tagger.tag()
+            count = self.run_stage('missed', tagger.tag)
             info('  {:,} reviews missed a vulnerability'.format(count))
 
             if year != 0:
                 ids = qs.query_by_year(year, 'review', True)
             else:
                 ids = qs.query_all('review', True)
-            connections.close_all()  # Hack
-
-            # Comments
-            loader = loaders.CommentLoader(settings, processes, ids)
-            count = loader.load()
-            info('  {:,} comments loaded'.format(count))
-            connections.close_all()  # Hack
-            loader = loaders.SentenceCommentLoader(settings, processes, ids)
-            count = loader.load()
-            info('  {:,} sentences loaded'.format(count))
-            connections.close_all()  # Hack
-
-            tagger = taggers.UsefulCommentTagger(settings, processes, ids)
-            count = tagger.tag()
-            info('  {:,} comments were useful'.format(count))
-
-            # Messages
-            connections.close_all()  # Hack
-            loader = loaders.MessageLoader(settings, processes, ids)
-            count = loader.load()
-            info('  {:,} messages loaded'.format(count))
-            connections.close_all()  # Hack
-            loader = loaders.SentenceMessageLoader(settings, processes, ids)
-            count = loader.load()
-            info('  {:,} sentences loaded'.format(count))
-            connections.close_all()  # Hack
-
-            # Tokens
-            loader = loaders.TokenLoader(settings, processes, ids)
-            count = loader.load()
-            info('  {:,} tokens loaded'.format(count))
-
-            with connection.cursor() as cursor:
-                cursor.execute('REFRESH MATERIALIZED VIEW {};'.format('vw_review_token'))
-                cursor.execute('REFRESH MATERIALIZED VIEW {};'.format('vw_review_lemma'))
+
+            self._load_reviews(ids, processes)
         except KeyboardInterrupt: # pragma: no cover
             warning('Attempting to abort.')
         finally:
             info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
+
+    def _load_delta(self, path, processes):
+        """
+        Replace the bugs or reviews, and the rows derived from them, with
+        those in a delta written by a refresh.
+        """
+        (switch, ids) = deltas.get_ids(path)
+        info('  Delta: {:,} {} in {}'.format(len(ids), switch, path))
+
+        if switch == 'bugs':
+            count = deltas.delete_bugs(ids)
+            info('  {:,} vulnerability associations deleted'.format(count))
+            loader = loaders.BugLoader(
+                    settings, processes, delta=path, mode=self.mode,
+                    num_writers=self.writers
+                )
+            count = self.run_stage('bugs', loader.load)
+            info('  {:,} bugs loaded'.format(count))
+        else:
+            count = deltas.delete_reviews(ids)
+            info('  {:,} reviews deleted'.format(count))
+            loader = loaders.ReviewLoader(
+                    settings, processes, delta=path, cluster=False,
+                    mode=self.mode, num_writers=self.writers
+                )
+            count = self.run_stage('reviews', loader.load)
+            info('  {:,} reviews loaded'.format(count))
+
+        tagger = taggers.MissedVulnerabilityTagger(settings, processes)
+        count = self.run_stage('missed', tagger.tag)
+        info('  {:,} reviews missed a vulnerability'.format(count))
+
+        if switch == 'reviews':
+            self._load_reviews(ids, processes)
+
+    def _load_reviews(self, ids, processes, prefix='  ', refresh=True):
+        """
+        Load the comments, messages, sentences, and tokens of the reviews
+        identified by the specified IDs.
+        """
+        stage = prefix.lstrip()
+        if self.pipeline:
+            self._ingest_reviews(ids, processes, prefix)
+            if refresh:
+                self.run_stage('views', self._refresh_views)
+            return
+
+        # Comments
+        loader = loaders.CommentLoader(settings, processes, ids)
+        count = self.run_stage(stage + 'comments', loader.load)
+        info('{}{:,} comments loaded'.format(prefix, count))
+        loader = loaders.SentenceCommentLoader(settings, processes, ids)
+        count = self.run_stage(stage + 'comment sentences', loader.load)
+        info('{}{:,} sentences loaded'.format(prefix, count))
+
+        tagger = taggers.UsefulCommentTagger(
+                settings, processes, ids, mode='set'
+            )
+        count = self.run_stage(stage + 'useful', tagger.tag)
+        info('{}{:,} comments were useful'.format(prefix, count))
+
+        # Messages
+        loader = loaders.MessageLoader(settings, processes, ids)
+        count = self.run_stage(stage + 'messages', loader.load)
+        info('{}{:,} messages loaded'.format(prefix, count))
+        loader = loaders.SentenceMessageLoader(settings, processes, ids)
+        count = self.run_stage(stage + 'message sentences', loader.load)
+        info('{}{:,} sentences loaded'.format(prefix, count))
+
+        # Tokens
+        loader = loaders.TokenLoader(settings, processes, ids)
+        count = self.run_stage(stage + 'tokens', loader.load)
+        info('{}{:,} tokens loaded'.format(prefix, count))
+
+        if refresh:
+            self.run_stage('views', self._refresh_views)
+
+    def _ingest_reviews(self, ids, processes, prefix='  '):
+        """
+        Load the comments, messages, sentences, and tokens of the reviews
+        identified by the specified IDs using a single pipeline.
+        """
+        stage = prefix.lstrip()
+        loader = loaders.IngestLoader(settings, processes, ids)
+        counts = self.run_stage(stage + 'ingest', loader.load)
+        info('{}{:,} comments and messages loaded'.format(
+                prefix, counts['texts']
+            ))
+        info('{}{:,} sentences loaded'.format(prefix, counts['sentences']))
+        info('{}{:,} tokens loaded'.format(prefix, counts['tokens']))
+
+        tagger = taggers.UsefulCommentTagger(
+                settings, processes, ids, mode='set'
+            )
+        count = self.run_stage(stage + 'useful', tagger.tag)
+        info('{}{:,} comments were useful'.format(prefix, count))
+
+    def _load_year(self, year, processes, results):
+        """
+        Load the reviews created in a year, and the rows derived from them,
+        in a pipeline of its own. Runs in a process of its own and puts a
+        tuple of the form (year, elapsed, success) in results when done.
+        """
+        begin = dt.now()
+        success = False
+        prefix = '  [{}] '.format(year)
+        try:
+            settings.YEARS = [year]
+
+            loader = loaders.ReviewLoader(
+                    settings, processes, cluster=False, mode=self.mode,
+                    num_writers=self.writers
+                )
+            count = self.run_stage(prefix.lstrip() + 'reviews', loader.load)
+            info('{}{:,} reviews loaded'.format(prefix, count))
+
+            ids = qs.query_by_year(year, 'review', True)
+
+            self._load_reviews(ids, processes, prefix, refresh=False)
+            success = True
+        except KeyboardInterrupt:  # pragma: no cover
+            pass
+        finally:
+            results.put((year, get_elapsed(begin, dt.now()), success))
+
+    def _load_years(self, years, processes, parallel_years):
+        """
+        Load the reviews created in several years, and the rows derived from
+        them, using up to parallel_years pipelines at once. The steps that
+        span all years (clustering, tagging of reviews that missed a
+        vulnerability, and refreshing of views) are done once all pipelines
+        are done and only if all of them succeeded. Returns a dictionary of
+        tuples of the form (elapsed, success) keyed by year.
+        """
+        parallel_years = min(parallel_years, len(years))
+        share = max(1, processes // parallel_years)
+        info('  {} pipelines of {} processes each'.format(
+                parallel_years, share
+            ))
+
+        results = multiprocessing.Queue()
+        (pending, running, timings) = (list(years), dict(), dict())
+        while pending or running:
+            while pending and len(running) < parallel_years:
+                year = pending.pop(0)
+                process = parallel.spawn(
+                        self._load_year, (year, share, results)
+                    )
+                running[year] = (process, dt.now())
+
+            try:
+                (year, elapsed, success) = results.get(timeout=10)
+            except queue.Empty:
+                # A pipeline that died without reporting is a failure
+                for (year, (process, begin)) in list(running.items()):
+                    if not process.is_alive():
+                        process.join()
+                        del running[year]
+                        timings[year] = (get_elapsed(begin, dt.now()), False)
+                        error('  [{}] Pipeline died ({})'.format(
+                                year, process.exitcode
+                            ))
+                continue
+            if year not in running:  # pragma: no cover
+                continue  # Reported after it was taken to have died
+            running.pop(year)[0].join()
+            timings[year] = (elapsed, success)
+            if success:
+                info('  [{}] Done in {:.2f} mins'.format(year, elapsed))
+            else:
+                error('  [{}] Failed after {:.2f} mins'.format(year, elapsed))
+
+        if all(success for (_, success) in timings.values()):
+            begin = dt.now()
+            self.run_stage('clustering', loaders.review.cluster)
+            info('  Reviews clustered in {:.2f} mins'.format(
+                    get_elapsed(begin, dt.now())
+                ))
+
+            tagger = taggers.MissedVulnerabilityTagger(settings, processes)
+            count = self.run_stage('missed', tagger.tag)
+            info('  {:,} reviews missed a vulnerability'.format(count))
+
+            begin = dt.now()
+            self.run_stage('views', self._refresh_views)
+            info('  Views refreshed in {:.2f} mins'.format(
+                    get_elapsed(begin, dt.now())
+                ))
+        else:
+            warning('  Reviews not clustered, tagged, or refreshed into '
+                    'views because a pipeline failed')
+
+        info('  Per-year Timings')
+        for year in sorted(timings):
+            (elapsed, success) = timings[year]
+            info('    {}  {:.2f} mins  {}'.format(
+                    year, elapsed, 'Done' if success else 'Failed'
+                ))
+        return timings
+
+    def run_stage(self, name, function):
+        """
+        Run a stage of the load, a function that returns the number of rows
+        it loaded, and return what the function returns. The stages of a
+        year loaded by a pipeline of its own run in the process of the
+        pipeline and are named after the year, e.g. '[2016] tokens'. Commands
+        that build on loaddb, e.g. benchmark, override this method to time
+        every stage.
+        """
+        return function()
+
+    def _refresh_views(self):
+        with connection.cursor() as cursor:
+            cursor.execute('REFRESH MATERIALIZED VIEW {};'.format('vw_review_token'))
+            cursor.execute('REFRESH MATERIALIZED VIEW {};'.format('vw_review_lemma'))
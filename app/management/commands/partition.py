@@ -0,0 +1,71 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+from datetime import datetime as dt
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from app.lib import partitions
+from app.lib.helpers import *
+from app.lib.logger import *
+
+
+class Command(BaseCommand):
+    """
+    Sets up command line arguments.
+    """
+    help = 'Manage the year-partitioned sentence and token tables.'
+
+    def add_arguments(self, parser):
+        """
+
+        """
+        parser.add_argument(
+                '--create', dest='create', type=int, default=None,
+                help='Create the partitions for the specified year. Rows of '
+                'the year are moved out of the default partition.'
+            )
+        parser.add_argument(
+                '--truncate', dest='truncate', type=int, default=None,
+                help='Remove all sentences and tokens of the specified year. '
+                'The partitions are truncated if the tables are partitioned.'
+            )
+
+    def handle(self, *args, **options):
+        """
+
+        """
+        create = options['create']
+        truncate = options['truncate']
+
+        begin = dt.now()
+        try:
+            if create is not None:
+                for partition in partitions.create(create):
+                    info('  Created {}'.format(partition))
+            if truncate is not None:
+                if partitions.truncate(truncate):
+                    info('  Truncated partitions of {}'.format(truncate))
+                else:
+                    info('  Deleted rows of {}'.format(truncate))
+
+            with connection.cursor() as cursor:
+                for table in partitions.TABLES:
+                    if not partitions.is_partitioned(table, cursor):
+                        info('{} is not partitioned'.format(table))
+                        continue
+                    info(table)
+                    for partition in partitions.get_partitions(table):
+                        cursor.execute(
+                                'SELECT reltuples::bigint FROM pg_class '
+                                'WHERE relname = %s;', [partition]
+                            )
+                        info('  {:<20} ~{:,} rows'.format(
+                                partition, cursor.fetchone()[0]
+                            ))
+        except KeyboardInterrupt:  # pragma: no cover
+            warning('Attempting to abort.')
+        finally:
+            info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
@@ -0,0 +1,107 @@
+"""
+@AUTHOR: nuthanmunaiah
+"""
+
+import os
+import time
+
+from datetime import datetime as dt
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.lib.files import *
+from app.lib.helpers import *
+from app.lib.logger import *
+
+MEBIBYTE = 1024 * 1024
+
+
+class Command(BaseCommand):
+    """
+    Sets up command line arguments.
+    """
+    help = 'Compress (or decompress) the chunk files of bugs and reviews ' \
+           'and report the compression ratio and load throughput.'
+
+    def add_arguments(self, parser):
+        """
+
+        """
+        parser.add_argument(
+                'compression', choices=sorted(COMPRESSIONS) + ['none'],
+                help='Compression to rewrite the chunk files using. none '
+                'decompresses the chunk files.'
+            )
+        parser.add_argument(
+                '--switch', dest='switches', action='append',
+                choices=['bugs', 'reviews'], default=None,
+                help='Rewrite chunk files of bugs or reviews. May be '
+                'specified more than once. Default is both.'
+            )
+        parser.add_argument(
+                '--year', dest='years', type=int, action='append',
+                default=None, help='Rewrite chunk files of the specified '
+                'year. May be specified more than once. Default is all years '
+                'in settings.'
+            )
+
+    def handle(self, *args, **options):
+        """
+
+        """
+        compression = options['compression']
+        compression = None if compression == 'none' else compression
+        switches = options['switches'] or ['bugs', 'reviews']
+        years = options['years'] or settings.YEARS
+
+        begin = dt.now()
+        files = Files(settings)
+        try:
+            (total_before, total_after) = (0, 0)
+            for switch in switches:
+                for year in years:
+                    directory = files.get_reviews_path(year) \
+                        if switch == 'reviews' else files.get_bugs_path(year)
+                    if not os.path.exists(directory):
+                        continue
+
+                    before = files.get_size(year, switch)
+                    (count, rate) = self._measure(files, year, switch)
+                    sizes = files.recompress(year, switch, compression)
+                    after = files.get_size(year, switch)
+                    (_, _rate) = self._measure(files, year, switch)
+
+                    info('{} {}: {} chunk file(s) rewritten'.format(
+                            switch, year, len(sizes)
+                        ))
+                    info('  Size   {:,.1f} MiB -> {:,.1f} MiB ({:.2f}x)'
+                         .format(
+                            before / MEBIBYTE, after / MEBIBYTE,
+                            before / after if after else 0
+                         ))
+                    info('  Load   {:,} {} at {:,.0f}/s -> {:,.0f}/s'.format(
+                            count, switch, rate, _rate
+                        ))
+                    total_before += before
+                    total_after += after
+            if total_after:
+                info('Total  {:,.1f} MiB -> {:,.1f} MiB ({:.2f}x)'.format(
+                        total_before / MEBIBYTE, total_after / MEBIBYTE,
+                        total_before / total_after
+                    ))
+        except KeyboardInterrupt:
+            warning('Attempting to abort.')
+        finally:
+            info('Time: {:.2f} mins'.format(get_elapsed(begin, dt.now())))
+
+    def _measure(self, files, year, switch):
+        """
+        Return the number of bugs or reviews of the specified year and the
+        number loaded per second.
+        """
+        load = files.get_reviews if switch == 'reviews' else files.get_bugs
+        begin = time.perf_counter()
+        count = sum(1 for _ in load(year))
+        elapsed = time.perf_counter() - begin
+        return (count, count / elapsed if elapsed else 0)
@@ -11,10 +11,11 @@ from datetime import datetime as dt
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from app.lib import deltas
 from app.lib.files import *
 from app.lib.helpers import *
 from app.lib.logger import *
-from app.lib.monorail import *
+from app.lib.monorail import MODES, Monorail
 
 
 class Command(BaseCommand):
@@ -26,12 +27,35 @@ class Command(BaseCommand):
         """
         parser.add_argument(
                 '-p', type=int, dest='processes', default=6, help='Number of '
-                'processes to spawn when running in parallel. Default is 6.'
+                'processes (or threads) to spawn when running in parallel. '
+                'Default is 6.'
             )
         parser.add_argument(
                 '-s', type=int, dest='chunksize', default=5000,
-                help='Maximum number of reviews per file before a new (chunk) '
-                'file is created. Default is 5000.'
+                help='Maximum number of bugs per file before a new (chunk) '
+                'file is created. Bugs are appended to the file as they are '
+                'retrieved. Default is 5000.'
+            )
+        parser.add_argument(
+                '--mode', choices=MODES, default='process', help='Retrieve '
+                'bugs using a pool of processes or a pool of threads (that '
+                'share credentials). Default is process.'
+            )
+        parser.add_argument(
+                '--url', default=settings.MONORAIL_URL, help='URL of the '
+                'discovery document of the Monorail API. Default is '
+                'MONORAIL_URL in settings.'
+            )
+        parser.add_argument(
+                '--unauthenticated', action='store_true', help='Do not '
+                'authenticate requests to the Monorail API, e.g. when using a '
+                'local stand-in of the API.'
+            )
+        parser.add_argument(
+                '--refresh', action='store_true', help='Retrieve only the '
+                'bugs that changed, or were not saved, since they were saved '
+                'and write them to a delta for loaddb --delta. Implies --mode '
+                'thread.'
             )
         parser.add_argument(
                 'year', type=int, help='Restrict the retrieval to only those '
@@ -44,19 +68,34 @@ class Command(BaseCommand):
         chunksize = options['chunksize']
 
         begin = dt.now()
-        monorail = Monorail(settings.MONORAIL_URL, settings.GOOGLESA_KEYFILE)
+        keyfile = None
+        if not options['unauthenticated']:
+            keyfile = settings.GOOGLESA_KEYFILE
+        # The predicate used when refreshing is costly to send to processes
+        mode = 'thread' if options['refresh'] else options['mode']
+        monorail = Monorail(options['url'], keyfile, mode)
         files = Files(settings)
         try:
-            ids = files.get_ids(year, switch='bugs')
-            chunks = list(chunk(ids, chunksize))
-            for (i, chnk) in enumerate(chunks):
-                (bugs, errors) = monorail.get_bugs(chnk, processes)
-                debug('[Chunk {}/{}] {} bugs and {} errors'.format(
-                        (i + 1), len(chunks), len(bugs), len(errors)
+            if options['refresh']:
+                def crawl(ids, on_bug, on_error, predicate):
+                    monorail.crawl(ids, processes, on_bug, on_error, predicate)
+                writer = deltas.refresh(files, year, 'bugs', chunksize, crawl)
+                info('{:,} changed bugs and {:,} errors written to {}'.format(
+                        writer.count, writer.errors, writer.directory
                     ))
-                files.save_bugs(year, (i + 1), bugs, errors)
-            info('Bugs written to {} file(s) in {}'.format(
-                    len(chunks), files.get_bugs_path(year)
+                return
+            with files.get_writer(year, 'bugs', chunksize) as writer:
+                ids = [
+                        id for id in files.get_ids(year, switch='bugs')
+                        if int(id) not in writer.saved
+                    ]
+                if len(writer.saved) > 0:
+                    info('Resuming after {:,} bugs saved'.format(
+                            len(writer.saved)
+                        ))
+                monorail.crawl(ids, processes, writer.write, writer.error)
+            info('{:,} bugs and {:,} errors written to {}'.format(
+                    writer.count, writer.errors, files.get_bugs_path(year)
                 ))
         except KeyboardInterrupt:
             warning('Attempting to abort.')
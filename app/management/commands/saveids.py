@@ -10,10 +10,10 @@ from datetime import datetime as dt
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from app.lib.crawler import BASE_URL, INTERVALS, Crawler
 from app.lib.files import *
 from app.lib.helpers import *
 from app.lib.logger import *
-from app.lib.rietveld import *
 
 
 class Command(BaseCommand):
@@ -27,6 +27,24 @@ class Command(BaseCommand):
         """
 
         """
+        parser.add_argument(
+                '--interval', choices=INTERVALS, default='month',
+                help='Length of the windows of creation dates into which the '
+                'year is split. Windows are searched concurrently. Default '
+                'is month.'
+            )
+        parser.add_argument(
+                '--rate', type=float, default=5.0, help='Maximum number of '
+                'search requests per second. Default is 5.'
+            )
+        parser.add_argument(
+                '--concurrency', type=int, default=8, help='Maximum number '
+                'of search requests in flight. Default is 8.'
+            )
+        parser.add_argument(
+                '--url', default=BASE_URL, help='URL of the Rietveld '
+                'instance to search. Default is {}.'.format(BASE_URL)
+            )
         parser.add_argument(
                 'year', type=int, help='Restrict the search to retrieve only '
                 'those code reviews that were created in the specified year.'
@@ -39,12 +57,30 @@ class Command(BaseCommand):
         year = options['year']
 
         begin = dt.now()
-        rietveld = Rietveld()
+        crawler = Crawler(
+                options['url'], options['rate'], options['concurrency']
+            )
         files = Files(settings)
         try:
-            ids = rietveld.get_ids(year)
-            filepath = files.save_ids(year, ids, switch='reviews')
-            info('Code review identifiers written to {}'.format(filepath))
+            progress = os.path.join(
+                    files.get_ids_path(switch='reviews'),
+                    '{}.progress.json'.format(year)
+                )
+            (ids, failed) = crawler.get_ids(
+                    year, options['interval'], progress
+                )
+            if failed > 0:
+                warning(
+                    'Search of {} window(s) failed. Run again to resume.'
+                    .format(failed)
+                )
+            else:
+                filepath = files.merge_ids(year, ids, switch='reviews')
+                if os.path.exists(progress):
+                    os.remove(progress)
+                info('{:,} code review identifiers written to {}'.format(
+                        len(ids), filepath
+                    ))
         except KeyboardInterrupt:
             warning('Attempting to abort.')
         finally:
@@ -11,6 +11,8 @@ from datetime import datetime as dt
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from app.lib import deltas
+from app.lib.crawler import BASE_URL, Crawler
 from app.lib.files import *
 from app.lib.helpers import *
 from app.lib.logger import *
@@ -34,7 +36,34 @@ class Command(BaseCommand):
         parser.add_argument(
                 '-s', type=int, dest='chunksize', default=5000,
                 help='Maximum number of reviews per file before a new (chunk) '
-                'file is created. Default is 5000.'
+                'file is created. Reviews are appended to the file as they '
+                'are retrieved. Default is 5000.'
+            )
+        parser.add_argument(
+                '--async', action='store_true', dest='async',
+                help='Retrieve code reviews using the concurrent crawler '
+                'instead of a pool of processes.'
+            )
+        parser.add_argument(
+                '--rate', type=float, default=5.0, help='Maximum number of '
+                'requests per second issued by the concurrent crawler. '
+                'Default is 5.'
+            )
+        parser.add_argument(
+                '--concurrency', type=int, default=16, help='Maximum number '
+                'of requests in flight when using the concurrent crawler. '
+                'Default is 16.'
+            )
+        parser.add_argument(
+                '--url', default=BASE_URL, help='URL of the Rietveld '
+                'instance to crawl using the concurrent crawler. Default is '
+                '{}.'.format(BASE_URL)
+            )
+        parser.add_argument(
+                '--refresh', action='store_true', help='Retrieve only the '
+                'code reviews that changed, or were not saved, since they '
+                'were saved and write them to a delta for loaddb --delta. '
+                'Implies --async.'
             )
         parser.add_argument(
                 'year', type=int, help='Restrict the retrieval to only those '
@@ -50,19 +79,36 @@ class Command(BaseCommand):
         chunksize = options['chunksize']
 
         begin = dt.now()
-        rietveld = Rietveld()
+        if options['async'] or options['refresh']:
+            crawler = Crawler(
+                    options['url'], options['rate'], options['concurrency']
+                )
+        else:
+            rietveld = Rietveld()
         files = Files(settings)
         try:
-            ids = files.get_ids(year, switch='reviews')
-            chunks = list(chunk(ids, chunksize))
-            for (i, chnk) in enumerate(chunks):
-                (reviews, errors) = rietveld.get_reviews(chnk, processes)
-                debug('[Chunk {}/{}] {} reviews and {} errors'.format(
-                        (i + 1), len(chunks), len(reviews), len(errors)
-                    ))
-                files.save_reviews(year, (i + 1), reviews, errors)
-            info('Code reviews written to {} file(s) in {}'.format(
-                    len(chunks), files.get_reviews_path(year)
+            if options['refresh']:
+                writer = deltas.refresh(
+                        files, year, 'reviews', chunksize, crawler.crawl
+                    )
+                info('{:,} changed code reviews and {:,} errors written to {}'
+                     .format(writer.count, writer.errors, writer.directory))
+                return
+            with files.get_writer(year, 'reviews', chunksize) as writer:
+                ids = [
+                        id for id in files.get_ids(year, switch='reviews')
+                        if int(id) not in writer.saved
+                    ]
+                if len(writer.saved) > 0:
+                    info('Resuming after {:,} code reviews saved'.format(
+                            len(writer.saved)
+                        ))
+                if options['async']:
+                    crawler.crawl(ids, writer.write, writer.error)
+                else:
+                    rietveld.crawl(ids, processes, writer.write, writer.error)
+            info('{:,} code reviews and {:,} errors written to {}'.format(
+                    writer.count, writer.errors, files.get_reviews_path(year)
                 ))
         except KeyboardInterrupt:
             warning('Attempting to abort.')
@@ -10,10 +10,9 @@ from datetime import datetime as dt
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import connections
 
 from app import TFIDF_TOKENS_PATH, TFIDF_LEMMAS_PATH
-from app.lib import helpers
+from app.lib import helpers, sampling
 from app.lib.logger import *
 from app.lib.nlp import tfidf, tokenremover
 from app.models import *
@@ -109,26 +108,50 @@ def load_tfidf_dict(review_ids, idf_dict, num_procs=8, key='lemma'):
     return tf_idfs
 
 
-def get_random_sample(population, pop_review_ids, rand):
-    sample_review_ids = []
-
-    if population == 'all':
-        sample_review_ids += query_rIDs_random(query_rIDs_neutral(), rand)
-        sample_review_ids += query_rIDs_random(query_rIDs_fixed(), rand)
-        sample_review_ids += query_rIDs_random(query_rIDs_missed(), rand)
-    elif population == 'fm':
-        sample_review_ids += query_rIDs_random(query_rIDs_fixed(), rand)
-        sample_review_ids += query_rIDs_random(query_rIDs_missed(), rand)
-    elif population == 'nf':
-        sample_review_ids += query_rIDs_random(query_rIDs_neutral(), rand)
-        sample_review_ids += query_rIDs_random(query_rIDs_fixed(), rand)
-    elif population == 'nm':
-        sample_review_ids += query_rIDs_random(query_rIDs_neutral(), rand)
-        sample_review_ids += query_rIDs_random(query_rIDs_missed(), rand)
+def get_random_sample(population, pop_review_ids, rand, seed=None,
+                      method=None):
+    """
+    Return a random sample of 1/rand of the reviews in the population. The
+    populations that are a union of other populations are sampled by
+    stratum, i.e. 1/rand of the reviews in each of the constituent populations
+    are sampled.
+
+    Parameters
+    ----------
+    population: str
+        Name of the population to sample from.
+    pop_review_ids: list
+        Identifiers of the reviews in the population. Only used when the
+        population is not stratified.
+    rand: float
+        Inverse of the fraction of reviews to sample.
+    seed: int, optional
+        Seed of the random number generator. The same sample is returned
+        every time the same seed is used.
+    method: str, optional
+        If specified, the sample is drawn in the database using the TABLESAMPLE
+        clause with the method specified. A seed is required in this case.
+    """
+    strata = {
+            'all': ['neutral', 'fixed', 'missed'], 'fm': ['fixed', 'missed'],
+            'nf': ['neutral', 'fixed'], 'nm': ['neutral', 'missed']
+        }
+    if population in strata:
+        strata = {
+                stratum: query_rIDs(stratum) for stratum in strata[population]
+            }
     else:
-        sample_review_ids += query_rIDs_random(pop_review_ids, rand)
+        strata = {population: pop_review_ids}
+
+    if method is None:
+        return sampling.stratify(strata, rand, seed=seed).tolist()
 
-    return sample_review_ids
+    sample = set()
+    for ids in strata.values():
+        sample |= set(sampling.tablesample(
+                'review', 100.0 / rand, seed, ids=ids, method=method
+            ).tolist())
+    return sorted(sample)
 
 
 class Command(BaseCommand):
@@ -177,6 +200,18 @@ class Command(BaseCommand):
                 help='If specified, a random sampling of the given size will '
                 'be printed to stdout or saved to disk. Default is 1000.'
             )
+        parser.add_argument(
+                '--seed', type=int, default=None,
+                help='Seed of the random number generator used to draw the '
+                'sample. The same sample is drawn for the same seed.'
+            )
+        parser.add_argument(
+                '--tablesample', type=str, default=None,
+                choices=sampling.METHODS,
+                help='If specified, the sample is drawn by the database using '
+                'the TABLESAMPLE clause with the specified method. The size '
+                'of the sample is approximate. Requires --seed.'
+            )
 
     def handle(self, *args, **options):
         # Grab the command line arguments.
@@ -187,6 +222,11 @@ class Command(BaseCommand):
         max_length = options['maxlength']
         top = options['top']
         random = options['random']
+        seed = options['seed']
+        method = options['tablesample']
+
+        if method is not None and seed is None:
+            raise CommandError('--tablesample requires --seed')
 
         begin = dt.now()
         try:
@@ -199,8 +239,9 @@ class Command(BaseCommand):
             sample_review_ids = pop_review_ids
             if random is not None:
                 sample_review_ids = get_random_sample(
-                        population, pop_review_ids, random
+                        population, pop_review_ids, random, seed, method
                     )
+                info('  Sample has {:,} reviews'.format(len(sample_review_ids)))
             sample_num_docs = len(sample_review_ids)
 
             info('  Computing the denominator of IDF')
@@ -209,7 +250,6 @@ class Command(BaseCommand):
             info('  Computing the IDF in TF-IDF')
             idf = get_idf_dict(df, pop_num_docs, key=key)
 
-            connections.close_all()  # Hack
             tfidfs = load_tfidf_dict(
                     sample_review_ids, idf, processes, key=key
                 )
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from app.lib import partitions
+
+YEARS = list(range(2008, 2017))
+
+
+def partition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitions.partition(cursor, YEARS)
+
+
+def unpartition(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitions.unpartition(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_add_jsonb_field_to_sentence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sentence',
+            name='year',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='token',
+            name='year',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='token',
+            name='sentence',
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to='app.Sentence'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='sentences',
+            field=models.ManyToManyField(
+                db_constraint=False, to='app.Sentence'
+            ),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='sentences',
+            field=models.ManyToManyField(
+                db_constraint=False, to='app.Sentence'
+            ),
+        ),
+        migrations.RunSQL(
+            'UPDATE sentence s SET year = EXTRACT(YEAR FROM r.created) '
+            'FROM message_sentences ms '
+            '   JOIN message m ON m.id = ms.message_id '
+            '   JOIN review r ON r.id = m.review_id '
+            'WHERE ms.sentence_id = s.id;',
+            migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            'UPDATE sentence s SET year = EXTRACT(YEAR FROM r.created) '
+            'FROM comment_sentences cs '
+            '   JOIN comment c ON c.id = cs.comment_id '
+            '   JOIN patch p ON p._id = c.patch_id '
+            '   JOIN patchset ps ON ps._id = p.patchset_id '
+            '   JOIN review r ON r.id = ps.review_id '
+            'WHERE cs.sentence_id = s.id;',
+            migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            'UPDATE token t SET year = s.year '
+            'FROM sentence s WHERE s.id = t.sentence_id;',
+            migrations.RunSQL.noop
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -74,7 +74,8 @@ class Comment(models.Model):
     # Navigation Fields
     patch = models.ForeignKey('patch')
     parent = models.ForeignKey('comment', null=True)
-    sentences = models.ManyToManyField('Sentence')
+    # No constraint because sentence may be partitioned (see 0023)
+    sentences = models.ManyToManyField('Sentence', db_constraint=False)
 
     def to_dict(self):  # pragma: no cover
         d = {}
@@ -173,7 +174,8 @@ class Message(models.Model):
 
     # Navigation Fields
     review = models.ForeignKey('Review')
-    sentences = models.ManyToManyField('Sentence')
+    # No constraint because sentence may be partitioned (see 0023)
+    sentences = models.ManyToManyField('Sentence', db_constraint=False)
 
     class Meta:
         db_table = 'message'
@@ -184,6 +186,9 @@ class Sentence(models.Model):
     id = models.AutoField(primary_key=True)
     text = models.TextField(default='')
     clean_text = models.TextField(default='')
+    # Year in which the review the sentence belongs to was created. Used as
+    # the partition key when the table is partitioned.
+    year = models.PositiveSmallIntegerField(default=0)
 
     parses = jsonb.JSONField(default=dict)
     clean_parses = jsonb.JSONField(default=dict)
@@ -208,9 +213,12 @@ class Token(models.Model):
     chunk = models.CharField(max_length=10, default='')
     uncertainty = models.CharField(max_length=1, default='C')
     is_code = models.BooleanField(default=False)
+    # Year in which the review the token belongs to was created. Used as the
+    # partition key when the table is partitioned.
+    year = models.PositiveSmallIntegerField(default=0)
 
     # Navigation Fields
-    sentence = models.ForeignKey('Sentence')
+    sentence = models.ForeignKey('Sentence', db_constraint=False)
 
     class Meta:
         db_table = 'token'
@@ -5,7 +5,7 @@ from app.lib import loaders
 from app.models import *
 
 
-class BugLoaderTestCase(test.TestCase):
+class BugLoaderTestCase(test.TransactionTestCase):
     def setUp(self):
         self.loader = loaders.BugLoader(settings, num_processes=2)
 
@@ -94,3 +94,33 @@ class BugLoaderTestCase(test.TestCase):
                 'vulnerability_id', 'bug_id'
             ))
         self.assertCountEqual(expected, actual, msg='Data: VulnerabilityBug')
+
+    def test_load_bulk(self):
+        expected_count = self.loader.load()
+        expected = self._get_rows()
+        VulnerabilityBug.objects.all().delete()
+        Vulnerability.objects.all().delete()
+        Bug.objects.all().delete()
+
+        # Sub-Test 1
+        loader = loaders.BugLoader(
+                settings, num_processes=2, mode='bulk', num_writers=2
+            )
+        actual_count = loader.load()
+        actual = self._get_rows()
+        self.assertEqual(expected_count, actual_count)
+        self.assertEqual(expected, actual)
+
+        # Sub-Test 2
+        self.assertRaises(
+                ValueError, loaders.BugLoader, settings, 2, mode='serial'
+            )
+
+    def _get_rows(self):
+        return (
+                sorted(Bug.objects.values_list('id', 'type', 'status')),
+                sorted(Vulnerability.objects.values_list('id', 'source')),
+                sorted(VulnerabilityBug.objects.values_list(
+                    'vulnerability_id', 'bug_id'
+                ))
+            )
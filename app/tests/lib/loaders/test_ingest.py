@@ -0,0 +1,50 @@
+from django import test
+from django.conf import settings
+
+from app.lib import loaders
+from app.models import *
+
+
+class IngestLoaderTestCase(test.TransactionTestCase):
+    def setUp(self):
+        loader = loaders.ReviewLoader(settings, num_processes=2)
+        _ = loader.load()
+        self.review_ids = [1259853004]
+
+    def test_load(self):
+        # Expected
+        expected = dict()
+        for loader in [loaders.CommentLoader, loaders.MessageLoader]:
+            expected['texts'] = expected.get('texts', 0) + \
+                loader(settings, 2, self.review_ids).load()
+        expected['sentences'] = sum(
+                loader(settings, 2, self.review_ids).load()
+                for loader in [
+                    loaders.SentenceCommentLoader,
+                    loaders.SentenceMessageLoader
+                ]
+            )
+        expected['tokens'] = loaders.TokenLoader(
+                settings, 2, self.review_ids
+            ).load()
+        expected_tokens = self._get_tokens()
+
+        for model in [Token, Sentence, Message, PatchSet]:
+            model.objects.all().delete()
+
+        # Actual
+        with self.settings(BATCH_SIZE=10):
+            loader = loaders.IngestLoader(settings, 4, self.review_ids)
+            actual = loader.load()
+        actual_tokens = self._get_tokens()
+
+        self.assertGreater(expected['tokens'], 10)
+        self.assertDictEqual(expected, dict(actual))
+        self.assertListEqual(expected_tokens, actual_tokens)
+
+    def _get_tokens(self):
+        return sorted(
+                Token.objects.values_list(
+                    'sentence__text', 'position', 'token', 'lemma', 'year'
+                )
+            )
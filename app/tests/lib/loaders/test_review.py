@@ -5,13 +5,10 @@ from app.lib import loaders
 from app.models import *
 
 
-class BugLoaderTestCase(test.TestCase):
-    @classmethod
-    def setUpTestData(cls):
+class BugLoaderTestCase(test.TransactionTestCase):
+    def setUp(self):
         loader = loaders.BugLoader(settings, num_processes=2)
         _ = loader.load()
-
-    def setUp(self):
         self.loader = loaders.ReviewLoader(settings, num_processes=2)
 
     def test_load(self):
@@ -71,3 +68,31 @@ class BugLoaderTestCase(test.TestCase):
             )
         actual = list(ReviewBug.objects.values_list('review_id', 'bug_id'))
         self.assertCountEqual(expected, actual)
+
+    def test_load_bulk(self):
+        expected_count = self.loader.load()
+        expected = self._get_rows()
+        ReviewBug.objects.all().delete()
+        Review.objects.all().delete()
+
+        # Sub-Test 1
+        loader = loaders.ReviewLoader(
+                settings, num_processes=2, mode='bulk', num_writers=2
+            )
+        actual_count = loader.load()
+        actual = self._get_rows()
+        self.assertEqual(expected_count, actual_count)
+        self.assertEqual(expected, actual)
+
+        # Sub-Test 2
+        self.assertRaises(
+                ValueError, loaders.ReviewLoader, settings, 2, mode='serial'
+            )
+
+    def _get_rows(self):
+        return (
+                sorted(Review.objects.values_list(
+                    'id', 'created', 'is_open', 'num_messages'
+                )),
+                sorted(ReviewBug.objects.values_list('review_id', 'bug_id'))
+            )
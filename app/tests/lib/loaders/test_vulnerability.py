@@ -5,7 +5,7 @@ from app.lib import loaders
 from app.models import *
 
 
-class VulnerabilityLoaderTestCase(test.TestCase):
+class VulnerabilityLoaderTestCase(test.TransactionTestCase):
     def setUp(self):
         self.loader = loaders.VulnerabilityLoader(settings, num_processes=2)
 
@@ -42,3 +42,33 @@ class VulnerabilityLoaderTestCase(test.TestCase):
                 'vulnerability_id', 'bug_id'
             ))
         self.assertCountEqual(expected, actual, msg='Data: VulnerabilityBug')
+
+    def test_load_bulk(self):
+        expected_count = self.loader.load()
+        expected = self._get_rows()
+        VulnerabilityBug.objects.all().delete()
+        Vulnerability.objects.all().delete()
+        Bug.objects.all().delete()
+
+        # Sub-Test 1
+        loader = loaders.VulnerabilityLoader(
+                settings, num_processes=2, mode='bulk'
+            )
+        actual_count = loader.load()
+        actual = self._get_rows()
+        self.assertEqual(expected_count, actual_count)
+        self.assertEqual(expected, actual)
+
+        # Sub-Test 2
+        actual_count = loader.load()
+        self.assertEqual(expected_count, actual_count)
+        self.assertEqual(expected, self._get_rows())
+
+    def _get_rows(self):
+        return (
+                sorted(Bug.objects.values_list('id', 'type', 'status')),
+                sorted(Vulnerability.objects.values_list('id', 'source')),
+                sorted(VulnerabilityBug.objects.values_list(
+                    'vulnerability_id', 'bug_id'
+                ))
+            )
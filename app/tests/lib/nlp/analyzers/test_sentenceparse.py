@@ -3,6 +3,7 @@ from unittest import TestCase
 from json import JSONDecodeError
 
 from app.lib.nlp import analyzers
+from app.lib.utils.standins import CoreNLPServer
 
 
 class SentenceParseAnalyzerTestCase(TestCase):
@@ -133,3 +134,32 @@ class SentenceParseAnalyzerTestCase(TestCase):
         actual = analyzers.SentenceParseAnalyzer(data).analyze()
         self.assertEqual(expected['trees'], actual['trees'])
         self.assertListEqual(expected['deps'], actual['deps'])
+
+    def test_analyze_standin(self):
+        data = 'Move foo() to bar.'
+        expected = {
+                'trees': '(ROOT\n  (NP (NN Move) (NN foo) (. -LRB-) '
+                         '(. -RRB-) (NN to) (NN bar) (. .)))',
+                'deps': [
+                    {
+                        'dep': 'ROOT', 'governorGloss': 'ROOT',
+                        'dependentGloss': 'Move', 'governor': 0,
+                        'dependent': 1
+                    }
+                ] + [
+                    {
+                        'dep': 'dep', 'governorGloss': 'Move',
+                        'dependentGloss': word, 'governor': 1,
+                        'dependent': index
+                    }
+                    for (index, word) in enumerate(
+                        ['foo', '(', ')', 'to', 'bar', '.'], start=2
+                    )
+                ]
+            }
+        with CoreNLPServer() as server:
+            actual = analyzers.SentenceParseAnalyzer(
+                    data, server.url + '/'
+                ).analyze()
+        self.assertEqual(expected['trees'], actual['trees'])
+        self.assertListEqual(expected['deps'], actual['deps'])
@@ -3,6 +3,7 @@ from unittest import TestCase
 from json import JSONDecodeError
 
 from app.lib.nlp import analyzers
+from app.lib.utils.standins import CoreNLPServer
 
 
 class SentimentAnalyzerTestCase(TestCase):
@@ -74,3 +75,54 @@ class SentimentAnalyzerTestCase(TestCase):
         expected = {'vpos': 0, 'pos': 0, 'neut': 1, 'neg': 0, 'vneg': 0}
         actual = analyzers.SentimentAnalyzer(data).analyze()
         self.assertEqual(expected, actual, msg=data[:50])
+
+    def test_analyze_standin(self):
+        with CoreNLPServer() as server:
+            url = server.url + '/'
+
+            # Sub-Test 1
+            data = 'The World is an amazing place.'
+            expected = {'vpos': 1, 'pos': 0, 'neut': 0, 'neg': 0, 'vneg': 0}
+            actual = analyzers.SentimentAnalyzer(data, url).analyze()
+            self.assertEqual(expected, actual, msg=data[:50])
+
+            # Sub-Test 2 - The same sentence has the same sentiment
+            actual = analyzers.SentimentAnalyzer(data, url).analyze()
+            self.assertEqual(expected, actual, msg=data[:50])
+
+            # Sub-Test 3
+            data = 'The World is a terrible place.'
+            expected = {'vpos': 0, 'pos': 0, 'neut': 1, 'neg': 0, 'vneg': 0}
+            actual = analyzers.SentimentAnalyzer(data, url).analyze()
+            self.assertEqual(expected, actual, msg=data[:50])
+
+            self.assertEqual(3, server.requests)
+            self.assertEqual(3, len(server.latencies))
+            self.assertEqual(0, server.errors)
+
+            # Sub-Test 4
+            server.reset()
+            self.assertEqual(0, server.requests)
+            self.assertListEqual([], server.latencies)
+
+    def test_analyze_standin_errors(self):
+        data = 'The World is an amazing place.'
+
+        # Sub-Test 1 - Sentences that fail keep the default sentiment
+        with CoreNLPServer(error_rate=1.0) as server:
+            expected = {'vpos': 'null', 'pos': 'null', 'neut': 'null',
+                        'neg': 'null', 'vneg': 'null'}
+            actual = analyzers.SentimentAnalyzer(
+                    data, server.url + '/'
+                ).analyze()
+            self.assertEqual(expected, actual)
+            self.assertEqual(1, server.errors)
+
+        # Sub-Test 2 - Latency is added to every response
+        with CoreNLPServer(latency=0.05, per_token=0.01) as server:
+            analyzers.SentimentAnalyzer(data, server.url + '/').analyze()
+            self.assertGreaterEqual(server.latencies[0], 0.05 + 7 * 0.01)
+
+        # Sub-Test 3
+        with self.assertRaises(ValueError):
+            CoreNLPServer(distribution='pareto')
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from nltk.tree import Tree
+
+from app.lib.nlp import benchmark
+
+
+class BenchmarkTestCase(TestCase):
+    def setUp(self):
+        self.samples = [
+                benchmark.Sample('The patch looks good to me.', 'prose'),
+                benchmark.Sample(
+                    'Use base::Bind(&Foo::OnDone, weak_ptr_) here.', 'code'
+                )
+            ]
+
+    def test_get_kind(self):
+        self.assertEqual('prose', benchmark.get_kind('LGTM, thanks!'))
+        self.assertEqual(
+                'prose', benchmark.get_kind('Could you add a test for this?')
+            )
+        self.assertEqual(
+                'code', benchmark.get_kind('Call foo->Bar() instead.')
+            )
+        self.assertEqual(
+                'code', benchmark.get_kind('if (kMaxSize > 10) return;')
+            )
+
+    def test_sample(self):
+        sample = self.samples[1]
+        self.assertEqual(len(sample.tokens), len(sample.tags))
+        self.assertEqual(len(sample.tokens), len(sample.chunks))
+
+        tree = Tree.fromstring(sample.tree)
+        self.assertEqual('ROOT', tree.label())
+        self.assertEqual(len(sample.tokens), len(tree.leaves()))
+        self.assertIn('-LRB-', tree.leaves())
+
+    def test_run(self):
+        # Sub-Test 1
+        results = benchmark.run(
+                self.samples, ['tokenizer', 'yngve', 'word'], repeat=2
+            )
+        self.assertListEqual(
+                [
+                    'tokenizer:prose', 'tokenizer:code', 'tokenizer',
+                    'yngve:prose', 'yngve:code', 'yngve',
+                    'word:prose', 'word:code', 'word'
+                ],
+                list(results)
+            )
+        self.assertEqual(2, results['tokenizer:prose']['calls'])
+        self.assertEqual(4, results['tokenizer']['calls'])
+        for summary in results.values():
+            self.assertGreater(summary['ops'], 0)
+            self.assertLessEqual(summary['p50'], summary['p99'])
+
+        # Sub-Test 2
+        self.assertRaises(ValueError, benchmark.run, self.samples, ['foo'])
@@ -0,0 +1,17 @@
+from unittest import TestCase
+
+from app.lib.nlp import resources
+
+
+class ResourcesTestCase(TestCase):
+    def test_load(self):
+        # Sub-Test 1
+        self.assertRaises(ValueError, resources.load, ['punkt', 'unknown'])
+
+        # Sub-Test 2
+        actual = resources.load(['stopwords'])
+        self.assertEqual(['stopwords'], list(actual))
+
+        # Sub-Test 3
+        actual = resources.load(['stopwords'])
+        self.assertEqual([], list(actual))
@@ -0,0 +1,96 @@
+import difflib
+import json
+import os
+import re
+import tempfile
+
+from unittest import TestCase
+
+from splat.complexity import levenshtein_distance
+from splat.corpora import CMUDICT
+
+from app.lib.nlp import syllables
+
+
+def get_syllable_count(tokens):
+    """
+    Count syllables by comparing every word that is not in the dictionary with
+    all words in it, as helpers.get_syllable_count once did.
+    """
+    total = 0
+    for token in tokens:
+        word = token.strip('\n').lower()
+        if word in CMUDICT:
+            pron = CMUDICT[word]
+        elif re.search(r'[aeiouy]', word) is not None:
+            matches = difflib.get_close_matches(word, CMUDICT.keys(), 5)
+            pron = CMUDICT['to']
+            if matches:
+                distances = [levenshtein_distance(m, word) for m in matches]
+                pron = CMUDICT[matches[distances.index(min(distances))]]
+        else:
+            pron = CMUDICT['to']
+
+        count = max(len([y for y in x if y[-1].isdigit()]) for x in pron)
+        if len(re.findall(r'[aeiouy]', word)) == 1 and len(pron) > 1:
+            total += 1
+        else:
+            total += count
+    return total
+
+
+class SyllableCounterTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.counter = syllables.SyllableCounter()
+
+    def test_count(self):
+        tokens = [
+                'The', 'hello\n', 'review', 'reviewer', 'syllable', 'the',
+                'getFooBar', 'kiosk_mode', 'should_send_uma_', 'DCHECK',
+                'UMA_HISTOGRAM_ENUMERATION', 'nullptr', 'ptr', 'xyzzy', '',
+                '(', 'std::unique_ptr', 'ActionBoxButtonController', 'lgtm'
+            ]
+
+        # Sub-Test 1
+        for token in tokens:
+            expected = get_syllable_count([token])
+            actual = self.counter.count(token)
+            self.assertEqual(expected, actual, msg='Token: {}'.format(token))
+
+        # Sub-Test 2
+        expected = [self.counter.count(token) for token in tokens]
+        actual = self.counter.counts(tokens)
+        self.assertListEqual(expected, actual)
+        self.assertEqual(sum(expected), self.counter.total(tokens))
+
+    def test_save(self):
+        dictionary = {
+                'to': [['T', 'UW1'], ['T', 'IH0'], ['T', 'AH0']],
+                'review': [['R', 'IY0', 'V', 'Y', 'UW1']],
+                'pointer': [['P', 'OY1', 'N', 'T', 'ER0']]
+            }
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'nlp', 'syllables.json')
+            counter = syllables.SyllableCounter(dictionary, path)
+
+            # Sub-Test 1
+            self.assertEqual(2, counter.count('reviews'))
+            self.assertEqual(2, counter.count('pointers'))
+            self.assertEqual(1, counter.count('ptr'))
+            self.assertEqual(1, counter.count('qwxzzyq'))
+            self.assertFalse(os.path.exists(path))
+
+            # Sub-Test 2
+            counter.save()
+            with open(path, 'r') as file:
+                expected = {
+                        'reviews': 'review', 'pointers': 'pointer',
+                        'ptr': 'to', 'qwxzzyq': 'to'
+                    }
+                self.assertDictEqual(expected, json.load(file))
+
+            # Sub-Test 3
+            counter = syllables.SyllableCounter(dictionary, path)
+            self.assertEqual('review', counter.get_match('reviews'))
+            self.assertEqual(0, counter._unsaved)
@@ -0,0 +1,49 @@
+from django import test
+from django.conf import settings
+
+from app.lib import loaders, taggers
+from app.models import *
+
+
+class UsefulCommentTaggerTestCase(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        loader = loaders.ReviewLoader(settings, num_processes=2)
+        _ = loader.load()
+        cls.review_ids = list(Review.objects.values_list('id', flat=True))
+        loader = loaders.CommentLoader(
+                settings, num_processes=2, review_ids=cls.review_ids
+            )
+        _ = loader.load()
+
+    def test_tag(self):
+        # Sub-Test 1
+        tagger = taggers.UsefulCommentTagger(
+                settings, num_processes=2, review_ids=self.review_ids
+            )
+        expected_count = tagger.tag()
+        expected = sorted(
+                Comment.objects.filter(is_useful=True)
+                       .values_list('id', flat=True)
+            )
+        self.assertGreater(len(expected), 0)
+
+        # Sub-Test 2
+        Comment.objects.update(is_useful=False)
+        tagger = taggers.UsefulCommentTagger(
+                settings, num_processes=2, review_ids=self.review_ids,
+                mode='set'
+            )
+        actual_count = tagger.tag()
+        actual = sorted(
+                Comment.objects.filter(is_useful=True)
+                       .values_list('id', flat=True)
+            )
+        self.assertEqual(expected_count, actual_count)
+        self.assertListEqual(expected, actual)
+
+        # Sub-Test 3
+        self.assertRaises(
+                ValueError, taggers.UsefulCommentTagger, settings, 2,
+                self.review_ids, 'serial'
+            )
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+
+from unittest import TestCase, mock
+
+from app.lib.crawler import Crawler, get_windows
+from app.tests.servers import RietveldServer
+
+
+class CrawlerTestCase(TestCase):
+    def test_get_reviews(self):
+        with RietveldServer() as server:
+            crawler = Crawler(server.url, rate=1000, concurrency=8)
+            ids = sorted(server.reviews.keys())
+
+            (reviews, errors) = crawler.get_reviews(ids + [1])
+
+            # Sub-Test 1
+            self.assertListEqual([1], errors)
+            self.assertCountEqual(ids, [review['issue'] for review in reviews])
+
+            # Sub-Test 2 - Reviews are identical to those in the test data
+            for review in reviews:
+                expected = server.reviews[review['issue']]
+                self.assertDictEqual(expected, json.loads(json.dumps(review)))
+
+    def test_retry(self):
+        # Sub-Test 1
+        with RietveldServer(failures=2) as server:
+            crawler = Crawler(
+                    server.url, rate=1000, concurrency=4, retries=2,
+                    backoff=0.01
+                )
+            (reviews, errors) = crawler.get_reviews([1259853004])
+            self.assertEqual(1, len(reviews))
+            self.assertListEqual([], errors)
+
+        # Sub-Test 2
+        with RietveldServer(failures=2) as server:
+            crawler = Crawler(
+                    server.url, rate=1000, concurrency=4, retries=1,
+                    backoff=0.01
+                )
+            (reviews, errors) = crawler.get_reviews([1259853004])
+            self.assertListEqual([], reviews)
+            self.assertListEqual([1259853004], errors)
+
+    def test_get_ids(self):
+        with RietveldServer() as server:
+            crawler = Crawler(server.url, rate=1000, concurrency=8)
+            expected = sorted(
+                    rid for (rid, review) in server.reviews.items()
+                    if review['created'].startswith('2016')
+                )
+
+            with tempfile.TemporaryDirectory() as tempdir:
+                progress = os.path.join(tempdir, '2016.progress.json')
+
+                # Sub-Test 1 - Windows are paged through
+                with mock.patch('app.lib.crawler.SEARCH_LIMIT', 2):
+                    (actual, failed) = crawler.get_ids(2016, 'week', progress)
+                self.assertEqual(0, failed)
+                self.assertListEqual(expected, actual)
+                with open(progress, 'r') as file:
+                    self.assertEqual(53, len(json.load(file)['windows']))
+
+                # Sub-Test 2 - Completed windows are not searched again
+                requests = server.requests
+                (actual, failed) = crawler.get_ids(2016, 'week', progress)
+                self.assertEqual(requests, server.requests)
+                self.assertListEqual(expected, actual)
+
+    def test_get_windows(self):
+        # Sub-Test 1
+        windows = get_windows(2016, 'month')
+        self.assertEqual(12, len(windows))
+        self.assertEqual(
+                ('2016-01-01 00:00:00', '2016-02-01 00:00:00'), windows[0]
+            )
+        self.assertEqual(
+                ('2016-12-01 00:00:00', '2017-01-01 00:00:00'), windows[-1]
+            )
+
+        # Sub-Test 2
+        windows = get_windows(2016, 'week')
+        self.assertEqual(53, len(windows))
+        self.assertEqual(
+                ('2016-12-30 00:00:00', '2017-01-01 00:00:00'), windows[-1]
+            )
+
+        # Sub-Test 3
+        self.assertEqual(366, len(get_windows(2016, 'day')))
+        self.assertRaises(ValueError, get_windows, 2016, 'year')
@@ -0,0 +1,114 @@
+import os
+import tempfile
+
+from django import test
+from django.conf import settings
+from django.db.models import Q
+
+from app.lib import deltas, files, loaders
+from app.lib.crawler import Crawler
+from app.models import *
+from app.tests.servers import RietveldServer
+
+
+class DeltasTestCase(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        loader = loaders.BugLoader(settings, num_processes=2)
+        _ = loader.load()
+        loader = loaders.VulnerabilityLoader(settings, num_processes=2)
+        _ = loader.load()
+        loader = loaders.ReviewLoader(settings, num_processes=2)
+        _ = loader.load()
+        for Loader in [loaders.MessageLoader, loaders.SentenceMessageLoader,
+                       loaders.CommentLoader, loaders.SentenceCommentLoader,
+                       loaders.TokenLoader]:
+            loader = Loader(
+                    settings, num_processes=2, review_ids=[1259853004]
+                )
+            _ = loader.load()
+
+    def test_delete_bugs(self):
+        ids = list(
+                VulnerabilityBug.objects.values_list('bug_id', flat=True)
+            )
+        self.assertGreater(len(ids), 0)
+
+        count = deltas.delete_bugs(ids[:1])
+
+        self.assertEqual(1, count)
+        self.assertEqual(len(ids) - 1, VulnerabilityBug.objects.count())
+
+    def test_delete_reviews(self):
+        q1 = Q(message__review_id=1259853004)
+        q2 = Q(comment__patch__patchset__review_id=1259853004)
+        sentences = list(
+                Sentence.objects.filter(q1 | q2).distinct()
+                        .values_list('id', flat=True)
+            )
+        self.assertGreater(len(sentences), 0)
+        reviews = Review.objects.count()
+
+        count = deltas.delete_reviews([1259853004])
+
+        # Sub-Test 1
+        self.assertEqual(1, count)
+        self.assertEqual(reviews - 1, Review.objects.count())
+
+        # Sub-Test 2
+        self.assertFalse(
+                PatchSet.objects.filter(review_id=1259853004).exists()
+            )
+        self.assertFalse(Message.objects.filter(review_id=1259853004).exists())
+        self.assertFalse(Sentence.objects.filter(id__in=sentences).exists())
+        self.assertFalse(
+                Token.objects.filter(sentence_id__in=sentences).exists()
+            )
+
+    def test_refresh(self):
+        with RietveldServer() as server:
+            crawler = Crawler(server.url, rate=1000, concurrency=8)
+            with tempfile.TemporaryDirectory() as tempdir:
+                with self.settings(
+                        REVIEWS_PATH=os.path.join(tempdir, '{year}')):
+                    f = files.Files(settings)
+                    with f.get_writer(2015, 'reviews', 100) as writer:
+                        crawler.crawl(
+                                f.get_ids(2015, 'reviews'), writer.write,
+                                writer.error
+                            )
+
+                    # Sub-Test 1 - Nothing changed
+                    writer = deltas.refresh(
+                            f, 2015, 'reviews', 100, crawler.crawl
+                        )
+                    self.assertEqual(0, writer.count)
+                    self.assertFalse(os.path.exists(writer.directory))
+
+                    # Sub-Test 2
+                    review = server.reviews[1259853004]
+                    review['modified'] = '2017-01-01 00:00:00.000000'
+                    review['messages'].append(review['messages'][-1])
+                    writer = deltas.refresh(
+                            f, 2015, 'reviews', 100, crawler.crawl
+                        )
+                    self.assertEqual(1, writer.count)
+                    self.assertEqual(
+                            ('reviews', [1259853004]),
+                            deltas.get_ids(writer.directory)
+                        )
+                    actual = [
+                            r for r in f.get_reviews(2015)
+                            if r['issue'] == 1259853004
+                        ]
+                    self.assertEqual(1, len(actual))
+                    self.assertEqual(
+                            len(review['messages']),
+                            len(actual[0]['messages'])
+                        )
+
+                    # Sub-Test 3 - Fingerprints were updated
+                    writer = deltas.refresh(
+                            f, 2015, 'reviews', 100, crawler.crawl
+                        )
+                    self.assertEqual(0, writer.count)
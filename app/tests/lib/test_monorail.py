@@ -1,8 +1,14 @@
-from unittest import TestCase
+import multiprocessing
+import os
 
+from unittest import TestCase, mock
+
+from apiclient.discovery import build_from_document
 from django.conf import settings
 
 from app.lib.monorail import *
+from app.lib.monorail import MAX_RETRIES, MODES
+from app.tests.servers import MonorailServer
 
 MONORAIL_URL = 'https://monorail-staging.appspot.com/_ah/api/discovery/v1/' \
                'apis/{api}/{apiVersion}/rest'
@@ -30,3 +36,65 @@ class MonorailTestCase(TestCase):
         self.assertCountEqual([5608, 1678], [bug['id'] for bug in bugs])
         self.assertCountEqual([7, 10], [len(bug['comments']) for bug in bugs])
         self.assertEquals(list(), errors)
+
+
+class MonorailServerTestCase(TestCase):
+    def test_get_bugs(self):
+        with MonorailServer() as server:
+            url = server.url + MonorailServer.DISCOVERY_PATH
+            ids = sorted(server.bugs.keys())
+            for mode in MODES:
+                monorail = Monorail(url, keyfile=None, mode=mode)
+                requests = server.requests
+
+                (bugs, errors) = monorail.get_bugs(ids + [1], processes=4)
+
+                # Sub-Test 1
+                self.assertListEqual([1], errors)
+                self.assertCountEqual(ids, [bug['id'] for bug in bugs])
+                for bug in bugs:
+                    self.assertDictEqual(server.bugs[bug['id']], bug)
+
+                # Sub-Test 2 - One request for the bug and one for comments
+                self.assertLessEqual(
+                        server.requests - requests,
+                        2 * len(ids) + MAX_RETRIES + 1
+                    )
+
+    def test_get_bugs_process(self):
+        builds = multiprocessing.Manager().list()
+
+        def build(*args, **kwargs):
+            builds.append(os.getpid())
+            return build_from_document(*args, **kwargs)
+
+        with MonorailServer() as server:
+            url = server.url + MonorailServer.DISCOVERY_PATH
+            ids = sorted(server.bugs.keys())
+            monorail = Monorail(url, keyfile=None, mode='process')
+
+            with mock.patch(
+                    'app.lib.monorail.build_from_document', side_effect=build
+                ):
+                (bugs, errors) = monorail.get_bugs(ids, processes=2)
+
+            # Sub-Test 1
+            self.assertCountEqual(ids, [bug['id'] for bug in bugs])
+
+            # Sub-Test 2 - The service client is built once per process
+            self.assertLessEqual(len(builds), 2)
+            self.assertCountEqual(set(builds), builds)
+
+    def test_get_comments(self):
+        with MonorailServer() as server:
+            url = server.url + MonorailServer.DISCOVERY_PATH
+            monorail = Monorail(url, keyfile=None, mode='thread')
+            bug = server.bugs[576270]
+
+            with mock.patch('app.lib.monorail.MAX_RESULTS', 2):
+                actual = monorail._get_comments(576270)
+
+            self.assertListEqual(bug['comments'], actual)
+
+    def test_mode(self):
+        self.assertRaises(ValueError, Monorail, MONORAIL_URL, None, 'serial')
@@ -0,0 +1,78 @@
+from django import test
+from django.conf import settings
+from django.db.models import Q
+
+from app.lib import loaders, partitions
+from app.models import *
+
+
+class PartitionsTestCase(test.TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        loader = loaders.ReviewLoader(settings, num_processes=2)
+        _ = loader.load()
+        loader = loaders.MessageLoader(
+                settings, num_processes=2, review_ids=[1259853004]
+            )
+        _ = loader.load()
+        loader = loaders.SentenceMessageLoader(
+                settings, num_processes=2, review_ids=[1259853004]
+            )
+        _ = loader.load()
+        loader = loaders.CommentLoader(
+                settings, num_processes=2, review_ids=[1259853004]
+            )
+        _ = loader.load()
+        loader = loaders.SentenceCommentLoader(
+                settings, num_processes=2, review_ids=[1259853004]
+            )
+        _ = loader.load()
+        loader = loaders.TokenLoader(
+                settings, num_processes=2, review_ids=[1259853004]
+            )
+        _ = loader.load()
+
+    def test_get_partition(self):
+        self.assertEqual('token_2015', partitions.get_partition('token', 2015))
+        self.assertEqual(
+                'sentence_default',
+                partitions.get_partition('sentence', 'default')
+            )
+        self.assertRaises(ValueError, partitions.get_partition, 'review', 2015)
+
+    def test_year(self):
+        q1 = Q(message__review_id=1259853004)
+        q2 = Q(comment__patch__patchset__review_id=1259853004)
+        sentences = Sentence.objects.filter(q1 | q2).distinct()
+
+        # Sub-Test 1
+        self.assertGreater(sentences.count(), 0)
+        self.assertEqual(
+                [2015], list(sentences.values_list('year', flat=True).distinct())
+            )
+
+        # Sub-Test 2
+        tokens = Token.objects.filter(sentence__in=sentences)
+        self.assertGreater(tokens.count(), 0)
+        self.assertEqual(
+                [2015], list(tokens.values_list('year', flat=True).distinct())
+            )
+
+    def test_truncate(self):
+        _ = partitions.truncate(2016)
+        self.assertGreater(Sentence.objects.filter(year=2015).count(), 0)
+        self.assertGreater(Token.objects.filter(year=2015).count(), 0)
+
+        _ = partitions.truncate(2015)
+        self.assertEqual(0, Sentence.objects.filter(year=2015).count())
+        self.assertEqual(0, Token.objects.filter(year=2015).count())
+        self.assertEqual(
+                0, Message.sentences.through.objects.filter(
+                    message__review_id=1259853004
+                ).count()
+            )
+        self.assertEqual(
+                0, Comment.sentences.through.objects.filter(
+                    comment__patch__patchset__review_id=1259853004
+                ).count()
+            )
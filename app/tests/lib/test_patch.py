@@ -132,3 +132,57 @@ class PatchTestCase(TestCase):
         expected = [100, 6, 105, 14]
         actual = p.get_chunk_by_line(113).get_hunk()
         self.assertListEqual(expected, actual)
+
+    def test_get_chunk_by_line(self):
+        with open(DIFF_4001_5001_PATH, 'r') as f:
+            patch_text = f.read()
+
+        p = Patch(patch_text)
+
+        # Sub-Test 1
+        for line_number in range(0, 300):
+            expected = None
+            for chunk in p.get_chunks():
+                if line_number in chunk.get_lines():
+                    expected = chunk
+                    break
+            actual = p.get_chunk_by_line(line_number)
+            self.assertIs(expected, actual, msg='Line: {}'.format(line_number))
+
+        # Sub-Test 2
+        expected = p.get_chunks()[3]
+        actual = p.get_chunk_by_base_hunk([100, 6])
+        self.assertIs(expected, actual)
+        self.assertIsNone(p.get_chunk_by_base_hunk([101, 6]))
+
+        # Sub-Test 3
+        self.assertEqual((105, 118), p.get_chunks()[3].get_range())
+        self.assertRaises(AttributeError, setattr, p.get_chunks()[3], 'x', 1)
+
+    def test_patch_cache(self):
+        with open(DIFF_4001_5001_PATH, 'r') as f:
+            patch_a = f.read()
+        with open(DIFF_10001_11001_PATH, 'r') as f:
+            patch_b = f.read()
+
+        cache = PatchCache(size=1)
+
+        # Sub-Test 1
+        expected = cache.get(patch_a, key=4001)
+        actual = cache.get(patch_a, key=4001)
+        self.assertIs(expected, actual)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        # Sub-Test 2
+        _ = cache.get(patch_b, key=10001)
+        actual = cache.get(patch_a, key=4001)
+        self.assertIsNot(expected, actual)
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+        self.assertEqual(1, len(cache))
+
+        # Sub-Test 3
+        self.assertIs(cache.get(patch_b), cache.get(patch_b))
+
+        # Sub-Test 4
+        cache.clear()
+        self.assertEqual((0, 0, 0), (cache.hits, cache.misses, len(cache)))
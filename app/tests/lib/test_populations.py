@@ -0,0 +1,152 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from django.conf import settings
+from django.db import connections
+
+from app.lib import loaders, taggers
+from app.lib.populations import Registry
+from app.models import *
+from app.tests import testcases
+
+
+class PopulationsTestCase(testcases.SpecialTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        loader = loaders.BugLoader(settings, num_processes=2)
+        _ = loader.load()
+        loader = loaders.VulnerabilityLoader(settings, num_processes=2)
+        _ = loader.load()
+        loader = loaders.ReviewLoader(settings, num_processes=2)
+        _ = loader.load()
+        review_ids = list(Review.objects.all().values_list('id', flat=True))
+
+        tagger = taggers.MissedVulnerabilityTagger(settings, num_processes=2)
+        _ = tagger.tag()
+
+        connections.close_all()
+
+        loader = loaders.MessageLoader(
+                settings, num_processes=2, review_ids=review_ids
+            )
+        _ = loader.load()
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_reviews(self):
+        registry = Registry(self.path)
+
+        all = registry.get_reviews('all')
+        fixed = registry.get_reviews('fixed')
+        missed = registry.get_reviews('missed')
+
+        # Sub-Test 1
+        expected = sorted(Review.objects.values_list('id', flat=True))
+        self.assertListEqual(expected, all.tolist())
+        self.assertEqual(np.int64, all.dtype)
+
+        # Sub-Test 2
+        expected = sorted(
+                Review.objects.filter(missed_vulnerability=True)
+                      .values_list('id', flat=True)
+            )
+        self.assertListEqual(expected, missed.tolist())
+
+        # Sub-Test 3
+        expected = sorted(set(all) - set(fixed) - set(missed))
+        self.assertListEqual(expected, registry.get_reviews('neutral').tolist())
+        expected = sorted(set(fixed) | set(missed))
+        self.assertListEqual(expected, registry.get_reviews('fm').tolist())
+        expected = sorted(set(all) - set(missed))
+        self.assertListEqual(expected, registry.get_reviews('nf').tolist())
+        expected = sorted(set(all) - set(fixed))
+        self.assertListEqual(expected, registry.get_reviews('nm').tolist())
+
+        # Sub-Test 4
+        expected = sorted(
+                Review.objects.filter(created__year=2016)
+                      .values_list('id', flat=True)
+            )
+        self.assertListEqual(expected, registry.get_reviews('2016').tolist())
+        self.assertRaises(ValueError, registry.get_reviews, '2007')
+
+    def test_get_messages(self):
+        registry = Registry(self.path)
+
+        # Sub-Test 1
+        expected = sorted(Message.objects.values_list('id', flat=True))
+        self.assertListEqual(expected, registry.get_messages('all').tolist())
+
+        # Sub-Test 2
+        reviews = registry.get_reviews('missed').tolist()
+        expected = sorted(
+                Message.objects.filter(review_id__in=reviews)
+                       .values_list('id', flat=True)
+            )
+        self.assertListEqual(expected, registry.get_messages('missed').tolist())
+
+        # Sub-Test 3
+        expected = sorted(
+                Message.objects.filter(posted__year=2016)
+                       .values_list('id', flat=True)
+            )
+        self.assertListEqual(expected, registry.get_messages('2016').tolist())
+
+    def test_persistence(self):
+        registry = Registry(self.path)
+        expected = registry.get_reviews('neutral')
+
+        # Sub-Test 1
+        self.assertEqual(1, len(os.listdir(self.path)))
+
+        # Sub-Test 2
+        registry = Registry(self.path)
+        self.assertIsNotNone(registry._load(registry.get_fingerprint()))
+        self.assertListEqual(
+                expected.tolist(), registry.get_reviews('neutral').tolist()
+            )
+
+        # Sub-Test 3
+        fingerprint = registry.get_fingerprint() + 1
+        self.assertIsNone(registry._load(fingerprint))
+
+        # Sub-Test 4
+        registry = Registry()
+        self.assertListEqual(
+                expected.tolist(), registry.get_reviews('neutral').tolist()
+            )
+
+    def test_fingerprint(self):
+        registry = Registry()
+        (first, second) = Review.objects.order_by('id')[:2]
+        Review.objects.filter(id__in=[first.id, second.id]) \
+                      .update(missed_vulnerability=False)
+        Review.objects.filter(id=first.id).update(missed_vulnerability=True)
+        expected = registry.get_fingerprint()
+
+        # Sub-Test 1 - A review missed a vulnerability instead of another
+        Review.objects.filter(id=first.id).update(missed_vulnerability=False)
+        Review.objects.filter(id=second.id).update(missed_vulnerability=True)
+        registry.clear()
+        actual = registry.get_fingerprint()
+        self.assertFalse(np.array_equal(expected, actual))
+
+        # Sub-Test 2 - A review is associated with a bug instead of another
+        expected = actual
+        review_bug = ReviewBug.objects.order_by('id').first()
+        bug = Bug.objects.exclude(id=review_bug.bug_id).first()
+        ReviewBug.objects.filter(id=review_bug.id).update(bug_id=bug.id)
+        registry.clear()
+        actual = registry.get_fingerprint()
+        self.assertFalse(np.array_equal(expected, actual))
+
+        # Sub-Test 3
+        registry.clear()
+        self.assertTrue(np.array_equal(actual, registry.get_fingerprint()))
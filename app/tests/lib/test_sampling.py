@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+import numpy as np
+
+from app.lib import sampling
+
+
+class SamplingTestCase(TestCase):
+    def setUp(self):
+        self.ids = np.arange(1000, 2000, 3, dtype=np.int64)
+
+    def test_sample(self):
+        # Sub-Test 1
+        actual = sampling.sample(self.ids, 25, seed=7)
+        self.assertEqual(25, actual.size)
+        self.assertEqual(25, np.unique(actual).size)
+        self.assertTrue(set(actual.tolist()) <= set(self.ids.tolist()))
+        self.assertListEqual(sorted(actual.tolist()), actual.tolist())
+
+        # Sub-Test 2
+        expected = actual
+        actual = sampling.sample(self.ids.tolist(), 25, seed=7)
+        self.assertListEqual(expected.tolist(), actual.tolist())
+
+        # Sub-Test 3
+        actual = sampling.sample(self.ids, 25, seed=8)
+        self.assertNotEqual(expected.tolist(), actual.tolist())
+
+        # Sub-Test 4
+        actual = sampling.sample(self.ids, self.ids.size + 10, seed=7)
+        self.assertListEqual(self.ids.tolist(), actual.tolist())
+        self.assertEqual(0, sampling.sample([], 10, seed=7).size)
+
+    def test_sample_fraction(self):
+        actual = sampling.sample_fraction(self.ids, 4, seed=7)
+        self.assertEqual(self.ids.size // 4, actual.size)
+
+    def test_stratify(self):
+        strata = {'a': self.ids[:100], 'b': self.ids[100:]}
+
+        # Sub-Test 1
+        actual = sampling.stratify(strata, 2, seed=7)
+        self.assertEqual(50, np.intersect1d(actual, strata['a']).size)
+        self.assertEqual(
+                strata['b'].size // 2, np.intersect1d(actual, strata['b']).size
+            )
+
+        # Sub-Test 2
+        expected = actual
+        actual = sampling.stratify(strata, 2, seed=7)
+        self.assertListEqual(expected.tolist(), actual.tolist())
+
+        # Sub-Test 3 - Sample from a stratum is independent of other strata
+        expected = np.intersect1d(expected, strata['a'])
+        actual = sampling.stratify({'a': strata['a']}, 2, seed=7)
+        self.assertListEqual(expected.tolist(), actual.tolist())
+
+    def test_tablesample(self):
+        self.assertRaises(
+                ValueError, sampling.tablesample, 'review', 10, 7,
+                method='RANDOM'
+            )
+        self.assertRaises(ValueError, sampling.tablesample, 'review', 110, 7)
@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from django.conf import settings
+
+from app.lib import files, helpers, synthetic
+
+
+class SyntheticTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.generator = synthetic.Generator(settings, seed=7)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate(self):
+        counts = self.generator.generate(
+                self.directory, [2015, 2016], 30, chunksize=20
+            )
+        corpus = files.Files(synthetic.get_settings(self.directory, []))
+
+        # Sub-Test 1
+        self.assertEqual(60, counts['reviews'])
+        self.assertEqual(
+                2 * int(round(30 * self.generator.ratio)), counts['bugs']
+            )
+        reviews = {
+                year: list(corpus.get_reviews(year)) for year in [2015, 2016]
+            }
+        bugs = {
+                year: list(corpus.get_bugs(year)) for year in [2015, 2016]
+            }
+        for year in [2015, 2016]:
+            self.assertEqual(30, len(reviews[year]))
+            self.assertListEqual(
+                    [str(review['issue']) for review in reviews[year]],
+                    corpus.get_ids(year, 'reviews')
+                )
+            self.assertListEqual(
+                    [str(bug['id']) for bug in bugs[year]],
+                    corpus.get_ids(year, 'bugs')
+                )
+            for review in reviews[year]:
+                self.assertTrue(review['created'].startswith(str(year)))
+            for bug in bugs[year]:
+                self.assertTrue(bug['published'].startswith(str(year)))
+        self.assertEqual(2, len(os.listdir(corpus.get_reviews_path(2015))))
+
+        # Sub-Test 2
+        ids = {bug['id'] for year in bugs for bug in bugs[year]}
+        references = [
+                id for year in reviews for review in reviews[year]
+                for id in helpers.parse_bugids(review['description'])
+            ]
+        self.assertTrue(references)
+        self.assertTrue(all(id in ids for id in references))
+
+        # Sub-Test 3
+        vulnerabilities = corpus.get_vulnerabilities()
+        self.assertEqual(counts['vulnerabilities'], len(vulnerabilities))
+        labels = {
+                label for year in bugs for bug in bugs[year]
+                for label in bug['labels']
+            }
+        for (source, cve, id) in vulnerabilities:
+            self.assertEqual(synthetic.VULNERABILITIES_SOURCE, source)
+            self.assertIn(int(id), ids)
+            self.assertIn(cve, labels)
+
+    def test_make_review(self):
+        review = self.generator.make_review(1, 2014, [2, 3])
+
+        # Sub-Test 1
+        self.assertEqual(1, review['issue'])
+        self.assertListEqual([2, 3], helpers.parse_bugids(
+                review['description']
+            ))
+        self.assertTrue(review['created'].startswith('2014'))
+
+        # Sub-Test 2
+        responses = 0
+        for patchset in review['patchsets'].values():
+            self.assertEqual(1, patchset['issue'])
+            for file in patchset['files'].values():
+                index = helpers.ThreadIndex()
+                for message in file.get('messages') or list():
+                    comment = _Comment(message)
+                    parent = index.get_parent(message['text'], comment.line)
+                    match = helpers.RESPONSE_HEAD_RE.match(message['text'])
+                    if match is not None:
+                        responses += 1
+                        self.assertEqual(
+                                helpers._get_timestamp(match.group(0)),
+                                helpers._truncate_posted(parent.posted)
+                            )
+                    index.add(comment)
+        self.assertEqual(
+                responses, sum(
+                    1 for patchset in review['patchsets'].values()
+                    for file in patchset['files'].values()
+                    for message in file.get('messages') or list()
+                    if helpers.RESPONSE_HEAD_RE.match(message['text'])
+                )
+            )
+
+    def test_make_bug(self):
+        bug = self.generator.make_bug(1, 2014, cve='CVE-2014-00001')
+        self.assertEqual(1, bug['id'])
+        self.assertTrue(bug['published'].startswith('2014'))
+        self.assertIn('Type-Bug-Security', bug['labels'])
+        self.assertListEqual(['CVE-2014-00001'], [
+                label for label in bug['labels'] if label.startswith('CVE-')
+            ])
+
+        bug = self.generator.make_bug(2, 2014)
+        self.assertFalse(any(
+                label.startswith('CVE-') for label in bug['labels']
+            ))
+        self.assertTrue(any(
+                label.startswith('Type-') for label in bug['labels']
+            ))
+
+
+class _Comment(object):
+    def __init__(self, message):
+        self.line = message['lineno']
+        self.posted = message['date']
+        self.text = helpers.clean(message['text'])
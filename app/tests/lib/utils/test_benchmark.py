@@ -0,0 +1,143 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from unittest import TestCase
+
+from app.lib.utils import benchmark
+
+
+class BenchmarkTestCase(TestCase):
+    def test_memory_sampler(self):
+        with benchmark.MemorySampler(interval=0.01) as sampler:
+            time.sleep(0.05)
+        self.assertGreater(len(sampler.samples), 2)
+        self.assertGreater(sampler.peak, 0)
+        self.assertLessEqual(sampler.mean, sampler.peak)
+
+    def test_measure(self):
+        # Sub-Test 1
+        record = benchmark.measure('sleep', _sleep, 10, seconds=0.05)
+        self.assertEqual('sleep', record['name'])
+        self.assertEqual(10, record['count'])
+        self.assertGreaterEqual(record['seconds'], 0.05)
+        self.assertAlmostEqual(10 / record['seconds'], record['rate'])
+        self.assertGreater(record['peak_rss'], 0)
+        self.assertNotIn('counts', record)
+
+        # Sub-Test 2
+        record = benchmark.measure('dict', lambda: {'a': 2, 'b': 3})
+        self.assertEqual(5, record['count'])
+        self.assertDictEqual({'a': 2, 'b': 3}, record['counts'])
+
+        # Sub-Test 3
+        record = benchmark.measure('none', lambda: None)
+        self.assertEqual(0, record['count'])
+
+    def test_to_table(self):
+        records = [
+                benchmark.measure('first', lambda: 1000),
+                benchmark.measure('second stage', lambda: 5)
+            ]
+        lines = benchmark.to_table(records)
+        self.assertEqual(4, len(lines))
+        self.assertTrue(lines[0].startswith('Stage'))
+        self.assertTrue(lines[2].startswith('first '))
+        self.assertIn('1,000', lines[2])
+        self.assertEqual(1, len({len(line) for line in lines}))
+
+    def test_time_calls(self):
+        latencies = benchmark.time_calls(lambda item: item * 2, [1, 2, 3], 2)
+        self.assertEqual(6, len(latencies))
+        self.assertTrue(all(latency >= 0 for latency in latencies))
+
+    def test_trace_memory(self):
+        peak = benchmark.trace_memory(lambda size: bytearray(size), [1000])
+        self.assertGreaterEqual(peak, 1000)
+
+    def test_summarize(self):
+        # Sub-Test 1
+        summary = benchmark.summarize([0.1] * 99 + [1.1])
+        self.assertEqual(100, summary['calls'])
+        self.assertAlmostEqual(100 / 11.0, summary['ops'])
+        self.assertAlmostEqual(0.11, summary['mean'])
+        self.assertAlmostEqual(0.1, summary['p50'])
+        self.assertAlmostEqual(0.11, summary['p99'])
+
+        # Sub-Test 2
+        summary = benchmark.summarize([])
+        self.assertEqual(0, summary['calls'])
+        self.assertEqual(0.0, summary['ops'])
+        self.assertEqual(0.0, summary['p99'])
+
+    def test_compare(self):
+        baseline = {
+                'a': {'ops': 100.0, 'p50': 0.01, 'p99': 0.02},
+                'b': {'ops': 100.0, 'p50': 0.01, 'p99': 0.02}
+            }
+        results = {
+                'a': {'ops': 95.0, 'p50': 0.0105, 'p99': 0.03},
+                'b': {'ops': 80.0, 'p50': 0.008, 'p99': 0.02},
+                'c': {'ops': 1.0, 'p50': 1.0, 'p99': 1.0}
+            }
+        regressions = benchmark.compare(results, baseline, 0.1)
+        self.assertListEqual(
+                [('a', 'p99'), ('b', 'ops')],
+                sorted((name, metric) for (name, metric, *_) in regressions)
+            )
+        self.assertListEqual([], benchmark.compare(results, baseline, 0.6))
+
+    def test_results(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'results', 'nlp.json')
+        try:
+            # Sub-Test 1
+            results = benchmark.Results(path)
+            self.assertIsNone(results.get())
+            results.add('abc', {'a': {'ops': 1.0}}, dirty=False)
+            results.baseline = 'abc'
+            results.save()
+
+            # Sub-Test 2
+            results = benchmark.Results(path)
+            self.assertEqual('abc', results.baseline)
+            self.assertDictEqual({'a': {'ops': 1.0}}, results.get())
+            results.add('def', {'a': {'ops': 2.0}})
+            results.add('abc', {'a': {'ops': 3.0}})
+            results.save()
+
+            # Sub-Test 3
+            results = benchmark.Results(path)
+            self.assertListEqual(['abc', 'def'], list(results.revisions))
+            self.assertDictEqual({'a': {'ops': 3.0}}, results.get())
+            self.assertDictEqual({'a': {'ops': 2.0}}, results.get('def'))
+            self.assertIsNone(results.get('ghi'))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_get_revision(self):
+        directory = tempfile.mkdtemp()
+        try:
+            self.assertEqual(
+                    (None, False), benchmark.get_revision(directory)
+                )
+        finally:
+            shutil.rmtree(directory)
+
+    def test_save(self):
+        (descriptor, path) = tempfile.mkstemp()
+        os.close(descriptor)
+        try:
+            report = {'stages': [benchmark.measure('first', lambda: 1)]}
+            benchmark.save(report, path)
+            with open(path, 'r') as file:
+                self.assertEqual('first', json.load(file)['stages'][0]['name'])
+        finally:
+            os.remove(path)
+
+
+def _sleep(count, seconds):
+    time.sleep(seconds)
+    return count
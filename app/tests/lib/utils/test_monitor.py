@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import queue
+import sys
+import tempfile
+
+from unittest import TestCase
+
+from app.lib.utils import monitor
+
+
+class MonitorTestCase(TestCase):
+    def setUp(self):
+        (descriptor, self.path) = tempfile.mkstemp()
+        os.close(descriptor)
+        self.stderr = sys.stderr
+        sys.stderr = io.StringIO()
+
+    def tearDown(self):
+        sys.stderr = self.stderr
+        os.remove(self.path)
+
+    def test_stats(self):
+        stats = monitor.Stats()
+        for latency in [0.0005, 0.05, 0.05, 5000.0]:
+            stats.add(latency)
+
+        self.assertEqual(4, stats.items)
+        self.assertAlmostEqual(5000.1005, stats.busy)
+        self.assertEqual([1, 0, 2, 0, 0, 0, 1], stats.histogram)
+
+        stats.reset()
+        self.assertEqual(0, stats.items)
+        self.assertEqual([0] * len(monitor.BUCKETS), stats.histogram)
+
+    def test_reporter(self):
+        mqueue = queue.Queue()
+        iqueue = queue.Queue()
+        for item in ['a', 'b', 'c']:
+            iqueue.put(item)
+
+        with monitor.Reporter(mqueue, interval=3600) as reporter:
+            proxy = reporter.wrap(iqueue)
+            self.assertEqual('a', proxy.get())
+            monitor.error()
+            sys.stderr.write('Exception\n')
+            self.assertEqual('b', proxy.get())
+            self.assertEqual('c', proxy.get())
+            self.assertEqual(0, proxy.qsize())
+            self.assertTrue(mqueue.empty())
+
+        # Sub-Test 1
+        self.assertEqual(1, mqueue.qsize())
+        report = mqueue.get()
+        self.assertEqual(os.getpid(), report['worker'])
+        self.assertEqual(2, report['items'])
+        self.assertEqual(1, report['errors'])
+        self.assertEqual(2, sum(report['histogram']))
+
+        # Sub-Test 2 - Errors are not counted outside of a reporter
+        monitor.error()
+        self.assertTrue(mqueue.empty())
+
+        # Sub-Test 3 - A doer that raises an exception counts as an error
+        with self.assertRaises(ValueError):
+            with monitor.Reporter(mqueue, interval=3600):
+                raise ValueError()
+        self.assertEqual(1, mqueue.get()['errors'])
+
+    def test_monitor(self):
+        (mqueue, iqueue) = (queue.Queue(), queue.Queue())
+        iqueue.put('item')
+        mqueue.put({
+                'worker': 1, 'items': 10, 'busy': 1.0, 'errors': 1,
+                'seconds': 2.0, 'histogram': [0, 10, 0, 0, 0, 0, 0]
+            })
+        mqueue.put({
+                'worker': 1, 'items': 6, 'busy': 1.0, 'errors': 0,
+                'seconds': 2.0, 'histogram': [0, 6, 0, 0, 0, 0, 0]
+            })
+        mqueue.put({
+                'worker': 2, 'items': 4, 'busy': 1.0, 'errors': 0,
+                'seconds': 1.0, 'histogram': [4, 0, 0, 0, 0, 0, 0]
+            })
+
+        with monitor.Monitor(
+                self.path, 'test', {'iqueue': iqueue}, mqueue, total=40,
+                interval=3600
+            ):
+            pass
+
+        with open(self.path, 'r') as file:
+            samples = [json.loads(line) for line in file]
+
+        self.assertEqual(1, len(samples))
+        sample = samples[0]
+        self.assertEqual('test', sample['name'])
+        self.assertEqual(20, sample['items'])
+        self.assertEqual(1, sample['errors'])
+        self.assertEqual(1, sample['iqueue'])
+        self.assertEqual(40, sample['total'])
+        self.assertIsNotNone(sample['eta'])
+        self.assertEqual(4.0, sample['workers']['1']['rate'])
+        self.assertEqual([0, 16, 0, 0, 0, 0, 0],
+                         sample['workers']['1']['histogram'])
+        self.assertEqual(4.0, sample['workers']['2']['rate'])
+        self.assertIn('20/40 items', sys.stderr.getvalue())
+        self.assertIn('ETA', sys.stderr.getvalue())
+
+    def test_get_path(self):
+        environ = dict(os.environ)
+        try:
+            os.environ.pop(monitor.ENVIRONMENT_VARIABLE, None)
+            self.assertIsNone(monitor.get_path())
+            os.environ[monitor.ENVIRONMENT_VARIABLE] = self.path
+            self.assertEqual(self.path, monitor.get_path())
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
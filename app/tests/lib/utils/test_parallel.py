@@ -1,10 +1,18 @@
 import multiprocessing
+import os
 import time
 
 from unittest import TestCase
 
+from django import test
+from django.db import connection
+
 from app.lib.utils import parallel
 
+# Identifiers of the processes that called the finalizer
+finalized = parallel.manager.Queue()
+initialized = False
+
 
 def aggregate_with_return(oqueue, cqueue, num_doers):
     done = 0
@@ -38,6 +46,34 @@ def do(iqueue, cqueue):
         cqueue.put(item)
 
 
+def do_initialized(iqueue, cqueue):
+    while True:
+        item = iqueue.get()
+        if item == parallel.EOI:
+            cqueue.put(parallel.DD)
+            break
+        cqueue.put(item if initialized else -1)
+
+
+def get_pid():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+def put_pid(oqueue):
+    oqueue.put(get_pid())
+
+
+def initialize():
+    global initialized
+    initialized = True
+
+
+def finalize():
+    finalized.put(os.getpid())
+
+
 def stream(items, iqueue, num_doers):
     for item in items:
         iqueue.put(item)
@@ -79,3 +115,40 @@ class ParallelTestCase(TestCase):
         self.assertIsNone(actual)
 
         process.join()
+
+    def test_run_with_hooks(self):
+        iqueue = parallel.manager.Queue()
+
+        process = multiprocessing.Process(
+                target=stream, args=(list(range(self.count)), iqueue, 2)
+            )
+        process.start()
+
+        expected = [(i + 10) for i in range(self.count)]
+        aggregate = aggregate_with_return
+        actual = parallel.run(
+                do_initialized, aggregate, iqueue, 2, initializer=initialize,
+                finalizer=finalize
+            )
+        self.assertCountEqual(expected, actual)
+        self.assertFalse(initialized)
+        self.assertEqual(2, finalized.qsize())
+        self.assertNotIn(os.getpid(), [finalized.get(), finalized.get()])
+
+        process.join()
+
+
+class SpawnTestCase(test.TransactionTestCase):
+    def test_spawn(self):
+        pid = get_pid()
+        oqueue = parallel.manager.Queue()
+
+        process = parallel.spawn(put_pid, (oqueue,))
+        process.join()
+
+        # Sub-Test 1 - The process has a connection of its own
+        self.assertEqual(0, process.exitcode)
+        self.assertNotEqual(pid, oqueue.get())
+
+        # Sub-Test 2 - The connection of the caller is left open
+        self.assertEqual(pid, get_pid())
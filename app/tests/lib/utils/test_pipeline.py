@@ -0,0 +1,120 @@
+from unittest import TestCase
+
+from django import test
+from django.db import connection
+
+from app.lib.utils import pipeline
+
+# Items batched in a process of the last stage
+batch = list()
+
+
+def stream(oqueue, count):
+    for item in range(count):
+        oqueue.put(item)
+
+
+def split(item, offset):
+    return ([item + offset, -(item + offset)], 1)
+
+
+def keep(item, offset):
+    return ([item], 1) if item > 0 else (list(), 0)
+
+
+def collect(item, offset):
+    batch.append(item)
+    if len(batch) >= 7:
+        del batch[:]
+        return (list(), 7)
+    return (list(), 0)
+
+
+def finish(offset):
+    count = len(batch)
+    del batch[:]
+    return count
+
+
+def fail(item, offset):
+    if item == offset:
+        raise ValueError()
+    return ([item], 1)
+
+
+def stream_fail(oqueue, count):
+    stream(oqueue, count)
+    raise ValueError()
+
+
+def get_pid():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+def stream_pid(oqueue, pid):
+    oqueue.put(get_pid() != pid)
+
+
+def check_pid(item, pid):
+    return ([item], 1 if item and get_pid() != pid else 0)
+
+
+class PipelineTestCase(TestCase):
+    def setUp(self):
+        self.count = 100
+
+    def test_run(self):
+        # Sub-Test 1
+        stages = [
+                pipeline.Stage('split', split, 2, args=(1,)),
+                pipeline.Stage('keep', keep, 3, args=(1,)),
+                pipeline.Stage('collect', collect, 2, finish, args=(1,))
+            ]
+        expected = [
+                ('split', self.count), ('keep', self.count),
+                ('collect', self.count)
+            ]
+        actual = pipeline.run(stream, stages, 5, args=(self.count,))
+        self.assertListEqual(expected, list(actual.items()))
+
+        # Sub-Test 2
+        stages = [pipeline.Stage('split', split, args=(1,))]
+        actual = pipeline.run(stream, stages, args=(0,))
+        self.assertDictEqual({'split': 0}, dict(actual))
+
+        # Sub-Test 3
+        self.assertRaises(ValueError, pipeline.Stage, 'split', split, 0)
+
+    def test_run_failure(self):
+        # Sub-Test 1 - A stage fails while the stages around it are blocked
+        # on full queues
+        stages = [
+                pipeline.Stage('split', split, 2, args=(1,)),
+                pipeline.Stage('fail', fail, 2, args=(10,)),
+                pipeline.Stage('keep', keep, args=(1,))
+            ]
+        with self.assertRaises(Exception):
+            pipeline.run(stream, stages, 1, args=(self.count,))
+
+        # Sub-Test 2 - The streamer fails
+        stages = [pipeline.Stage('split', split, args=(1,))]
+        with self.assertRaises(Exception):
+            pipeline.run(stream_fail, stages, args=(self.count,))
+
+
+class PipelineConnectionTestCase(test.TransactionTestCase):
+    def test_run(self):
+        pid = get_pid()
+
+        # Sub-Test 1 - Every process has a connection of its own
+        stages = [
+                pipeline.Stage('first', check_pid, args=(pid,)),
+                pipeline.Stage('second', check_pid, args=(pid,))
+            ]
+        actual = pipeline.run(stream_pid, stages, args=(pid,))
+        self.assertDictEqual({'first': 1, 'second': 1}, dict(actual))
+
+        # Sub-Test 2 - The connection of the caller is left open
+        self.assertEqual(pid, get_pid())
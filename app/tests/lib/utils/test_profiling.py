@@ -0,0 +1,94 @@
+import os
+import pstats
+import shutil
+import tempfile
+import time
+
+from unittest import TestCase
+
+from app.lib.utils import profiling
+
+
+def work():
+    begin = time.process_time()
+    total = 0
+    while time.process_time() - begin < 0.1:
+        total += sum(range(1000))
+    return total
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cprofile(self):
+        # Sub-Test 1
+        for i in range(2):
+            with profiling.Profiler('stage', 'cprofile', 5, self.directory):
+                work()
+        # The processes are the same, so the second profile overwrites the
+        # first, as does a process that runs a stage again
+        paths = profiling.report('stage', self.directory)
+
+        expected = [
+                os.path.join(self.directory, name)
+                for name in ['stage.prof', 'stage.txt', 'stage.malloc.txt']
+            ]
+        self.assertEqual(expected, paths)
+        self.assertEqual(
+                sorted(['stage.prof', 'stage.txt', 'stage.malloc.txt']),
+                sorted(os.listdir(self.directory))
+            )
+        stats = pstats.Stats(paths[0])
+        functions = [function for (_, _, function) in stats.stats]
+        self.assertIn('work', functions)
+        with open(paths[1], 'r') as file:
+            self.assertIn('work', file.read())
+
+        # Sub-Test 2
+        with profiling.Profiler('stage', 'cprofile', None, self.directory):
+            work()
+        profiling.report('stage', self.directory)
+        stats = pstats.Stats(paths[0])
+        calls = [
+                stat[1] for (function, stat) in stats.stats.items()
+                if function[2] == 'work'
+            ]
+        self.assertEqual([2], calls)
+
+    def test_sample(self):
+        with profiling.Profiler('stage', 'sample', None, self.directory):
+            work()
+        paths = profiling.report('stage', self.directory)
+
+        self.assertEqual(
+                [os.path.join(self.directory, 'stage.samples.txt')], paths
+            )
+        with open(paths[0], 'r') as file:
+            lines = file.read().splitlines()
+        self.assertTrue(len(lines) > 0)
+        self.assertTrue(any(':work:' in line for line in lines))
+        for line in lines:
+            (stack, count) = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+
+    def test_get_mode(self):
+        environ = dict(os.environ)
+        try:
+            os.environ.pop(profiling.ENVIRONMENT_VARIABLE, None)
+            os.environ.pop(profiling.TRACEMALLOC_VARIABLE, None)
+            self.assertIsNone(profiling.get_mode())
+            self.assertFalse(profiling.enabled())
+
+            os.environ[profiling.ENVIRONMENT_VARIABLE] = 'sample'
+            self.assertEqual('sample', profiling.get_mode())
+            self.assertTrue(profiling.enabled())
+
+            os.environ[profiling.ENVIRONMENT_VARIABLE] = 'unknown'
+            self.assertRaises(ValueError, profiling.get_mode)
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
@@ -0,0 +1,40 @@
+import threading
+import time
+
+from unittest import TestCase
+
+from app.lib.utils.ratelimit import TokenBucket
+
+
+class TokenBucketTestCase(TestCase):
+    def test_reserve(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        # Sub-Test 1 - Burst up to the capacity is not delayed
+        self.assertEqual(0.0, bucket.reserve())
+        self.assertEqual(0.0, bucket.reserve())
+
+        # Sub-Test 2 - Subsequent reservations are spaced out at the rate
+        self.assertAlmostEqual(0.1, bucket.reserve(), delta=0.02)
+        self.assertAlmostEqual(0.2, bucket.reserve(), delta=0.02)
+
+        # Sub-Test 3
+        self.assertRaises(ValueError, TokenBucket, 0)
+
+    def test_acquire(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        def acquire():
+            for _ in range(5):
+                bucket.acquire()
+
+        threads = [threading.Thread(target=acquire) for _ in range(4)]
+        begin = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - begin
+
+        # 20 tokens, one of which is available immediately, at 50 per second
+        self.assertGreaterEqual(elapsed, 19 / 50 - 0.02)
@@ -0,0 +1,80 @@
+from django import test
+
+from app.lib.utils import parallel, sharding
+from app.models import *
+
+
+class ShardingTestCase(test.TestCase):
+    def setUp(self):
+        Sentence.objects.bulk_create(
+                Sentence(text='Sentence {}'.format(i)) for i in range(25)
+            )
+        self.ids = sorted(Sentence.objects.values_list('id', flat=True))
+
+    def test_get_shards(self):
+        (first, last) = (self.ids[0], self.ids[-1])
+
+        # Sub-Test 1
+        actual = sharding.get_shards(Sentence.objects.all(), 3)
+        self.assertEqual(3, len(actual))
+        self.assertEqual(first, actual[0][0])
+        self.assertEqual(last, actual[-1][1])
+        for (shard, next) in zip(actual, actual[1:]):
+            self.assertEqual(shard[1] + 1, next[0])
+
+        # Sub-Test 2
+        actual = sharding.get_shards(Sentence.objects.all(), 100)
+        self.assertEqual(25, len(actual))
+
+        # Sub-Test 3
+        actual = sharding.get_shards(Sentence.objects.none(), 3)
+        self.assertEqual([], actual)
+
+    def test_iterate(self):
+        sentences = Sentence.objects.all()
+        shards = sharding.get_shards(sentences, 2)
+
+        # Sub-Test 1
+        actual = list()
+        for shard in shards:
+            for rows in sharding.iterate(sentences, shard, ('text',), 4):
+                self.assertTrue(0 < len(rows) <= 4)
+                actual.extend(rows)
+        expected = [
+                (id, 'Sentence {}'.format(index))
+                for (index, id) in enumerate(self.ids)
+            ]
+        self.assertEqual(expected, actual)
+
+        # Sub-Test 2
+        sentences = Sentence.objects.filter(text__endswith='0')
+        actual = [
+                row
+                for shard in shards
+                for rows in sharding.iterate(sentences, shard, batch_size=1)
+                for row in rows
+            ]
+        self.assertEqual([(self.ids[i],) for i in [0, 10, 20]], actual)
+
+    def test_stream(self):
+        iqueue = parallel.manager.Queue()
+        sentences = Sentence.objects.filter(text__endswith='0')
+
+        # Sub-Test 1 - Only the bounds of the shards are queried
+        with self.assertNumQueries(1):
+            sharding.stream(sentences, iqueue, 2, ('arg',))
+        self.assertIsNone(sentences._result_cache)
+
+        items = [iqueue.get() for i in range(iqueue.qsize())]
+        self.assertEqual([parallel.EOI] * 2, items[-2:])
+        shards = [shard for (query, shard, arg) in items[:-2]]
+        self.assertEqual(
+                sharding.get_shards(sentences, 2 * sharding.SHARDS_PER_DOER),
+                shards
+            )
+
+        # Sub-Test 2
+        (query, shard, arg) = items[0]
+        actual = sharding.get_queryset(query)
+        self.assertEqual('arg', arg)
+        self.assertCountEqual(sentences, actual)
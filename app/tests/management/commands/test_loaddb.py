@@ -3,15 +3,19 @@ import signal
 import subprocess
 
 from datetime import datetime
+from unittest import mock
 
 from django.conf import settings
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db import transaction
 from django.test import TransactionTestCase, override_settings
 from django.utils.six import StringIO
 
 from app.models import *
-from app.lib import helpers
+from app.lib import helpers, loaders
+from app.lib.utils import parallel
+from app.management.commands import loaddb
 from app.queryStrings import *
 
 
@@ -19,6 +23,35 @@ def to_datetime(text):
     return datetime.strptime(text, '%Y-%m-%d %H:%M:%S.%f')
 
 
+def get_rows():
+    """Return the rows loaded by loaddb keyed by what they are."""
+    return {
+            'reviews': sorted(
+                Review.objects.values_list('id', 'missed_vulnerability')
+            ),
+            'review_bugs': sorted(
+                ReviewBug.objects.values_list('review_id', 'bug_id')
+            ),
+            'comments': sorted(
+                Comment.objects.values_list('text', 'is_useful')
+            ),
+            'messages': sorted(
+                Message.objects.values_list('review_id', 'posted', 'text')
+            ),
+            'sentences': sorted(
+                Sentence.objects.values_list('text', 'year')
+            ),
+            'tokens': sorted(
+                Token.objects.values_list(
+                    'sentence__text', 'position', 'token', 'lemma'
+                )
+            ),
+            'vw_review_lemma': sorted(
+                ReviewLemmaView.objects.values_list('review_id', 'lemma')
+            )
+        }
+
+
 class LoaddbTestCase(TransactionTestCase):
     def setUp(self):
         pass
@@ -406,3 +439,84 @@ class LoaddbTestCase(TransactionTestCase):
                         review__id=2211423003, bug__id=528486
                     ).exists()
                 )
+
+    def test_handle_parallel_years(self):
+        with self.settings(YEARS=[2015, 2016]):
+            call_command('loaddb', processes=4)
+            expected = get_rows()
+            call_command('flush', verbosity=0, interactive=False)
+
+            command = loaddb.Command()
+            call_command(command, processes=4, parallel_years=2)
+            actual = get_rows()
+
+        # Sub-Test 1
+        self.assertGreater(len(expected['tokens']), 0)
+        for key in expected:
+            self.assertListEqual(expected[key], actual[key], msg=key)
+
+        # Sub-Test 2
+        self.assertCountEqual([2015, 2016], command.timings)
+        for (elapsed, success) in command.timings.values():
+            self.assertTrue(success)
+            self.assertGreaterEqual(elapsed, 0)
+
+    def test_handle_parallel_years_failure(self):
+        load = loaders.ReviewLoader.load
+
+        def fail(loader):
+            if loader.settings.YEARS == [2015]:
+                raise RuntimeError('Failed to load reviews')
+            return load(loader)
+
+        command = loaddb.Command()
+        with self.settings(YEARS=[2015, 2016]):
+            with mock.patch.object(loaders.ReviewLoader, 'load', fail):
+                with self.assertRaises(CommandError):
+                    call_command(command, processes=4, parallel_years=2)
+
+        # Sub-Test 1
+        self.assertFalse(command.timings[2015][1])
+        self.assertTrue(command.timings[2016][1])
+
+        # Sub-Test 2 - Steps that span all years are not done
+        self.assertTrue(Review.objects.exists())
+        self.assertFalse(
+                Review.objects.filter(missed_vulnerability=True).exists()
+            )
+
+    def test_run_stage(self):
+        class Command(loaddb.Command):
+            def __init__(self):
+                super().__init__()
+                self.stages = parallel.manager.list()
+
+            def run_stage(self, name, function):
+                self.stages.append(name)
+                return function()
+
+        # Sub-Test 1
+        command = Command()
+        with self.settings(YEARS=[2015, 2016]):
+            call_command(command, processes=4)
+        expected = [
+                'bugs', 'vulnerabilities', 'reviews', 'missed', 'comments',
+                'comment sentences', 'useful', 'messages',
+                'message sentences', 'tokens', 'views'
+            ]
+        self.assertListEqual(expected, list(command.stages))
+
+        # Sub-Test 2 - Stages of a year are run in the pipeline of the year
+        call_command('flush', verbosity=0, interactive=False)
+        command = Command()
+        with self.settings(YEARS=[2015, 2016]):
+            call_command(command, processes=4, parallel_years=2)
+        stages = list(command.stages)
+        self.assertListEqual(['bugs', 'vulnerabilities'], stages[:2])
+        self.assertListEqual(['clustering', 'missed', 'views'], stages[-3:])
+        expected = [
+                '[{}] {}'.format(year, stage)
+                for year in [2015, 2016] for stage in expected[2:-1]
+                if stage != 'missed'
+            ]
+        self.assertCountEqual(expected, stages[2:-3])
@@ -0,0 +1,249 @@
+"""
+Local stand-ins for the web services that the crawlers retrieve data from. The
+servers respond with the data in app/tests/data so that the crawlers can be
+tested, and their throughput benchmarked, without network access. The
+stand-in for CoreNLP is in app.lib.utils.standins so that the benchmarkcorenlp
+command does not depend on the tests.
+
+Run a server from the command line using:
+
+    python -m app.tests.servers rietveld --port 8000
+    python -m app.tests.servers monorail --port 8001
+    python -m app.tests.servers corenlp --port 41194 --latency 0.05
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+from app.lib.utils.standins import CoreNLPServer, Server
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+class RietveldServer(Server):
+    """Stand-in for the Rietveld API serving the reviews in the test data.
+
+    /api/{rid} responds with the review, where patchsets is the list of
+    patchset identifiers, and /api/{rid}/{psid} responds with the patchset.
+    /search responds with pages of identifiers of reviews created in a window
+    where the cursor is the offset of the next page.
+    """
+    REVIEW_RE = re.compile(r'^/api/(?P<rid>\d+)/?$')
+    PATCHSET_RE = re.compile(r'^/api/(?P<rid>\d+)/(?P<psid>\d+)/?$')
+
+    def __init__(self, path=os.path.join(DATA_PATH, 'reviews'), **kwargs):
+        super(RietveldServer, self).__init__(**kwargs)
+        self.reviews = dict()
+        for filepath in glob.glob(os.path.join(path, '*', 'reviews.*.json')):
+            with open(filepath, 'r') as file:
+                for review in json.load(file):
+                    self.reviews[review['issue']] = review
+
+    def handle(self, method, path, query, body):
+        if path == '/search':
+            return (200, self.search(query))
+
+        match = self.PATCHSET_RE.match(path)
+        if match:
+            review = self.reviews.get(int(match.group('rid')))
+            patchsets = review['patchsets'] if review is not None else {}
+            patchset = patchsets.get(match.group('psid'))
+            if patchset is None:
+                return (404, {'error': 'Not Found'})
+            return (200, patchset)
+
+        match = self.REVIEW_RE.match(path)
+        if match:
+            review = self.reviews.get(int(match.group('rid')))
+            if review is None:
+                return (404, {'error': 'Not Found'})
+            review = dict(review)
+            review['patchsets'] = sorted(int(i) for i in review['patchsets'])
+            return (200, review)
+
+        return (404, {'error': 'Not Found'})
+
+    def search(self, query):
+        (after, before) = (query['created_after'], query['created_before'])
+        ids = sorted(
+                review['issue'] for review in self.reviews.values()
+                if after <= review['created'][:19] < before
+            )
+        offset = int(query.get('cursor') or 0)
+        limit = int(query.get('limit', 1000))
+        results = ids[offset:offset + limit]
+        return {'results': results, 'cursor': str(offset + len(results))}
+
+
+class MonorailServer(Server):
+    """Stand-in for the Monorail API serving the bugs in the test data.
+
+    The discovery document describes the issues.get and issues.comments.list
+    methods, which respond with the bug (without comments) and a page of the
+    comments made on the bug respectively. Authentication is not required.
+    """
+    DISCOVERY_PATH = '/_ah/api/discovery/v1/apis/{api}/{apiVersion}/rest'
+    ISSUE_RE = re.compile(
+            r'^/_ah/api/monorail/v1/projects/(?P<project>[^/]+)/issues/'
+            r'(?P<id>\d+)(?P<comments>/comments)?/?$'
+        )
+
+    def __init__(self, path=os.path.join(DATA_PATH, 'bugs'), **kwargs):
+        super(MonorailServer, self).__init__(**kwargs)
+        self.bugs = dict()
+        for filepath in glob.glob(os.path.join(path, '*', 'bugs.*.json')):
+            with open(filepath, 'r') as file:
+                for bug in json.load(file):
+                    self.bugs[bug['id']] = bug
+
+    @property
+    def discovery_url(self):
+        return self.url + self.DISCOVERY_PATH
+
+    def get_document(self):
+        parameter = {'type': 'string', 'required': True, 'location': 'path'}
+        return {
+                'kind': 'discovery#restDescription',
+                'discoveryVersion': 'v1', 'id': 'monorail:v1',
+                'name': 'monorail', 'version': 'v1', 'protocol': 'rest',
+                'rootUrl': self.url + '/_ah/api/',
+                'servicePath': 'monorail/v1/', 'batchPath': 'batch',
+                'parameters': {},
+                'schemas': {
+                    'Issue': {'id': 'Issue', 'type': 'object'},
+                    'IssuesCommentsList': {
+                        'id': 'IssuesCommentsList', 'type': 'object'
+                    }
+                },
+                'resources': {'issues': {
+                    'methods': {'get': {
+                        'id': 'monorail.issues.get', 'httpMethod': 'GET',
+                        'path': 'projects/{projectId}/issues/{issueId}',
+                        'parameters': {
+                            'projectId': parameter,
+                            'issueId': dict(parameter, type='integer')
+                        },
+                        'parameterOrder': ['projectId', 'issueId'],
+                        'response': {'$ref': 'Issue'}
+                    }},
+                    'resources': {'comments': {'methods': {'list': {
+                        'id': 'monorail.issues.comments.list',
+                        'httpMethod': 'GET',
+                        'path': 'projects/{projectId}/issues/{issueId}/'
+                                'comments',
+                        'parameters': {
+                            'projectId': parameter,
+                            'issueId': dict(parameter, type='integer'),
+                            'maxResults': {
+                                'type': 'integer', 'location': 'query'
+                            },
+                            'startIndex': {
+                                'type': 'integer', 'location': 'query'
+                            }
+                        },
+                        'parameterOrder': ['projectId', 'issueId'],
+                        'response': {'$ref': 'IssuesCommentsList'}
+                    }}}}
+                }}
+            }
+
+    def handle(self, method, path, query, body):
+        if path == self.DISCOVERY_PATH.format(api='monorail', apiVersion='v1'):
+            return (200, self.get_document())
+
+        match = self.ISSUE_RE.match(path)
+        if match:
+            bug = self.bugs.get(int(match.group('id')))
+            if bug is None:
+                return (404, {'error': 'Not Found'})
+            if match.group('comments') is None:
+                issue = dict(bug)
+                del issue['comments']
+                return (200, issue)
+            index = int(query.get('startIndex', 0))
+            size = int(query.get('maxResults', 100))
+            return (200, {
+                    'kind': 'monorail#issuesCommentsList',
+                    'totalResults': len(bug['comments']),
+                    'items': bug['comments'][index:index + size]
+                })
+
+        return (404, {'error': 'Not Found'})
+
+
+SERVERS = {
+        'corenlp': CoreNLPServer, 'monorail': MonorailServer,
+        'rietveld': RietveldServer
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('server', choices=sorted(SERVERS))
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+            '--latency', type=float, default=0.0,
+            help='Seconds to wait before responding to each request.'
+        )
+    parser.add_argument(
+            '--failures', type=int, default=0,
+            help='Number of times each path fails before it succeeds.'
+        )
+    group = parser.add_argument_group('corenlp')
+    group.add_argument(
+            '--distribution', default='constant',
+            choices=CoreNLPServer.DISTRIBUTIONS,
+            help='Distribution of the seconds taken to annotate a text.'
+        )
+    group.add_argument(
+            '--jitter', type=float, default=0.0,
+            help='Spread of the uniform and lognormal distributions.'
+        )
+    group.add_argument(
+            '--per-token', type=float, default=0.0,
+            help='Seconds added for every token in a text.'
+        )
+    group.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Maximum number of texts annotated at once.'
+        )
+    group.add_argument(
+            '--error-rate', type=float, default=0.0,
+            help='Fraction of requests that fail with HTTP 500.'
+        )
+    group.add_argument('--seed', type=int, default=None)
+    group.add_argument(
+            '--fixtures', default=None,
+            help='Path to a JSON file of responses keyed by text.'
+        )
+    args = parser.parse_args()
+
+    kwargs = {
+            'latency': args.latency, 'failures': args.failures,
+            'port': args.port
+        }
+    if args.server == 'corenlp':
+        kwargs.update({
+                'distribution': args.distribution, 'jitter': args.jitter,
+                'per_token': args.per_token,
+                'concurrency': args.concurrency,
+                'error_rate': args.error_rate, 'seed': args.seed,
+                'fixtures': args.fixtures
+            })
+    server = SERVERS[args.server](**kwargs)
+    with server:
+        print('Serving {} on {}'.format(args.server, server.url))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print('{:,} requests served'.format(server.requests))
+
+
+if __name__ == '__main__':
+    main()
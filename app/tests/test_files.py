@@ -1,6 +1,8 @@
 import csv
+import gzip
 import json
 import os
+import shutil
 import tempfile
 
 from collections import OrderedDict
@@ -224,6 +226,195 @@ class FilesTestCase(TestCase):
                     actual['errors'].append(int(row[0]))
             self.assertCountEqual(expected, actual)
 
+    def test_get_delta_writer(self):
+        data = [{'issue': id, 'version': 1} for id in range(100001, 100005)]
+        expected = data[:2] + [{'issue': 100003, 'version': 2}, data[3]] + \
+            [{'issue': 100005, 'version': 2}]
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with self.settings(REVIEWS_PATH=os.path.join(tempdir, '{year}')):
+                f = files.Files(settings)
+                with f.get_writer(9999, 'reviews', chunksize=3) as writer:
+                    for review in data:
+                        writer.write(review)
+                with f.get_delta_writer(9999, 'reviews', 3) as writer:
+                    writer.write({'issue': 100003, 'version': 2})
+                    writer.write({'issue': 100005, 'version': 2})
+
+                # Sub-Test 1
+                self.assertCountEqual(
+                        expected[2:], list(f.get_delta(writer.directory))
+                    )
+
+                # Sub-Test 2 - Delta supersedes reviews saved earlier
+                self.assertCountEqual(expected, list(f.get_reviews(9999)))
+
+    def test_get_fingerprint(self):
+        review = self.files.get_review(1999153002, year=2016)
+
+        # Sub-Test 1
+        expected = [review['modified'], 10, [1], True]
+        actual = self.files.get_fingerprint(review, 'reviews')
+        self.assertListEqual(expected, actual)
+
+        # Sub-Test 2 - Review as retrieved, before retrieving patchsets
+        review = dict(review, patchsets=[1])
+        self.assertListEqual(
+                expected, self.files.get_fingerprint(review, 'reviews')
+            )
+
+        # Sub-Test 3
+        bug = self.files.get_bug(576270, year=2016)
+        expected = [bug['updated'], bug['status'], bug['state']]
+        self.assertListEqual(expected, self.files.get_fingerprint(bug, 'bugs'))
+
+        # Sub-Test 4
+        self.assertRaises(ValueError, self.files.get_fingerprint, bug, 'foo')
+
+    def test_get_writer(self):
+        data = [{'issue': id} for id in range(100001, 100008)]
+        expected = data
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with self.settings(REVIEWS_PATH=os.path.join(tempdir, '{year}')):
+                f = files.Files(settings)
+                with f.get_writer(9999, 'reviews', chunksize=3) as writer:
+                    for review in data:
+                        writer.write(review)
+                    writer.error(100008)
+                directory = os.path.join(tempdir, '9999')
+
+                # Sub-Test 1
+                self.assertCountEqual(
+                        ['reviews.1.jsonl', 'reviews.2.jsonl',
+                         'reviews.3.jsonl', 'manifest.json', 'errors.csv'],
+                        os.listdir(directory)
+                    )
+                self.assertEqual(7, writer.count)
+                self.assertEqual(1, writer.errors)
+
+                # Sub-Test 2
+                with open(os.path.join(directory, 'manifest.json')) as file:
+                    manifest = json.load(file)
+                self.assertListEqual(
+                        [3, 3, 1],
+                        [chunk['count'] for chunk in manifest['chunks']]
+                    )
+
+                # Sub-Test 3
+                actual = list(f.get_reviews(year=9999))
+                self.assertCountEqual(expected, actual)
+                self.assertEqual(
+                        {'issue': 100005}, f.get_review(100005, year=9999)
+                    )
+
+        # Sub-Test 4
+        self.assertRaises(ValueError, self.files.get_writer, 9999, 'foo', 3)
+
+    def test_get_writer_recover(self):
+        data = [{'id': id} for id in range(100001, 100006)]
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with self.settings(BUGS_PATH=os.path.join(tempdir, '{year}')):
+                f = files.Files(settings)
+                writer = f.get_writer(9999, 'bugs', chunksize=3)
+                for bug in data:
+                    writer.write(bug)
+                # Simulate a crash while the last bug was being written
+                writer._file.write('{"id": 1000')
+                writer._file.flush()
+                writer._file.close()
+
+                writer = f.get_writer(9999, 'bugs', chunksize=3)
+
+                # Sub-Test 1
+                self.assertSetEqual(set(range(100001, 100006)), writer.saved)
+                self.assertCountEqual(
+                        ['bugs.1.jsonl', 'bugs.2.jsonl', 'manifest.json'],
+                        os.listdir(os.path.join(tempdir, '9999'))
+                    )
+
+                # Sub-Test 2
+                writer.write({'id': 100006})
+                writer.close()
+                self.assertCountEqual(
+                        data + [{'id': 100006}], f.get_bugs(year=9999)
+                    )
+                self.assertTrue(os.path.exists(
+                        os.path.join(tempdir, '9999', 'bugs.3.jsonl')
+                    ))
+
+    def test_recompress(self):
+        expected = sorted(
+                review['issue'] for review in self.files.get_reviews(2016)
+            )
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            shutil.copytree(
+                    self.files.get_reviews_path(2016),
+                    os.path.join(tempdir, '2016')
+                )
+            with self.settings(REVIEWS_PATH=os.path.join(tempdir, '{year}')):
+                f = files.Files(settings)
+                before = f.get_size(2016, 'reviews')
+
+                for (compression, name) in [('gzip', 'reviews.1.json.gz'),
+                                            ('lzma', 'reviews.1.json.xz'),
+                                            (None, 'reviews.1.json')]:
+                    sizes = f.recompress(2016, 'reviews', compression)
+
+                    self.assertEqual(1, len(sizes))
+                    self.assertCountEqual(
+                            [name], os.listdir(os.path.join(tempdir, '2016'))
+                        )
+                    actual = sorted(
+                            review['issue'] for review in f.get_reviews(2016)
+                        )
+                    self.assertListEqual(expected, actual)
+                    if compression is not None:
+                        self.assertLess(f.get_size(2016, 'reviews'), before)
+
+                # Sub-Test 2 - Interrupted after the rewritten chunk file
+                # replaced the original but before the original was removed
+                path = os.path.join(tempdir, '2016', 'reviews.1.json')
+                with open(path, 'rb') as source, \
+                        gzip.open(path + '.gz', 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                actual = sorted(
+                        review['issue'] for review in f.get_reviews(2016)
+                    )
+                self.assertListEqual(expected, actual)
+
+                self.assertListEqual(
+                        list(), f.recompress(2016, 'reviews', None)
+                    )
+                self.assertCountEqual(
+                        ['reviews.1.json'],
+                        os.listdir(os.path.join(tempdir, '2016'))
+                    )
+
+    def test_save_compressed(self):
+        data = [{'issue': id} for id in range(100001, 100010)]
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with self.settings(REVIEWS_PATH=os.path.join(tempdir, '{year}'),
+                               ARCHIVE_COMPRESSION='lzma'):
+                f = files.Files(settings)
+
+                # Sub-Test 1
+                path = f.save_reviews(year=9999, chunk=1, reviews=data[:4])
+                self.assertTrue(path.endswith('reviews.1.json.xz'))
+
+                # Sub-Test 2
+                with f.get_writer(9999, 'reviews', chunksize=5) as writer:
+                    for review in data[4:]:
+                        writer.write(review)
+                self.assertTrue(os.path.exists(
+                        os.path.join(tempdir, '9999', 'reviews.2.jsonl.xz')
+                    ))
+
+                self.assertCountEqual(data, f.get_reviews(year=9999))
+
     def test_save_ids(self):
         data = list(range(100001, 100010))
         expected = [str(item) for item in data]
@@ -241,6 +432,23 @@ class FilesTestCase(TestCase):
                     actual = [row[0] for row in reader]
                 self.assertCountEqual(expected, actual)
 
+    def test_merge_ids(self):
+        expected = [str(item) for item in range(100001, 100010)]
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            with self.settings(IDS_PATH=tempdir):
+                f = files.Files(settings)
+                f.save_ids(
+                        year=9999, ids=range(100005, 100010), switch='reviews'
+                    )
+                f.merge_ids(
+                        year=9999, ids=[100003, 100001, 100002, 100004],
+                        switch='reviews'
+                    )
+
+                actual = f.get_ids(year=9999, switch='reviews')
+                self.assertListEqual(expected, actual)
+
     def test_save_bugs(self):
         data = [{'id': id} for id in range(100001, 100010)]
         expected = data
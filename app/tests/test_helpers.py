@@ -3,7 +3,9 @@
 """
 import csv
 import datetime
+import glob
 import json
+import os
 import queue
 import tempfile
 
@@ -277,6 +279,63 @@ class HelpersTestCase(TestCase):
         self.assertEqual(expected.id, actual.id, msg='ID: Multiple')
         self.assertEqual(expected.text, actual.text, msg='Text: Multiple')
 
+    def test_thread_index(self):
+        # Sub-Test 1
+        index = helpers.ThreadIndex()
+        self.assertIsNone(index.get_parent('Done', 28))
+        self.assertListEqual([], index.get_comments(28))
+
+        # Sub-Test 2
+        messages = list()
+        for path in glob.glob(os.path.join(
+                    os.path.dirname(os.path.abspath(__file__)), 'data',
+                    'reviews', '*', 'reviews.*.json'
+                )):
+            with open(path, 'r') as file:
+                for review in json.load(file):
+                    for patchset in review['patchsets'].values():
+                        for patch in patchset['files'].values():
+                            messages.append(patch.get('messages', list()))
+        self.assertGreater(sum(len(m) for m in messages), 0)
+
+        for _messages in messages:
+            (previous, index) = (dict(), helpers.ThreadIndex())
+            for message in _messages:
+                comment = mocks.Comment()
+                comment.line = message['lineno']
+                comment.posted = message['date']
+                comment.text = helpers.clean(message['text'])
+
+                comments = previous.setdefault(comment.line, list())
+                expected = helpers.get_parent(message['text'], comments)
+                actual = index.get_parent(message['text'], comment.line)
+                self.assertIs(expected, actual)
+
+                comments.append(comment)
+                index.add(comment)
+
+        # Sub-Test 3
+        (comments, index) = (list(), helpers.ThreadIndex())
+        for (id, posted, text) in [
+                    (1, '2017-05-24 23:09:18.829590', 'Done'),
+                    (2, '2017-05-24 23:09:18.990390', 'Done.'),
+                    (3, '2017-05-24 23:09:19.000000', 'Worthwhile adding a '
+                                                     'DCHECK?')
+                ]:
+            comment = mocks.Comment()
+            (comment.id, comment.line) = (id, 28)
+            (comment.posted, comment.text) = (posted, text)
+            comments.append(comment)
+            index.add(comment)
+        for (data, id) in [
+                    ('On 2017/05/24 at 23:09:18, Randy wrote:\n> Done.\n', 1),
+                    ('On 2017/05/24 at 23:09:18, Randy wrote:\n> Ok\n', 3),
+                    ('On 2017/05/24 at 23:09:19, Randy wrote:\n> Ok\n', 3),
+                    ('Ok', 3)
+                ]:
+            self.assertEqual(id, helpers.get_parent(data, comments).id)
+            self.assertEqual(id, index.get_parent(data, 28).id)
+
     def test_get_parent_no_quote(self):
         # Mocking Data
         # Reference URI: /1282313002/diff/180001/content/common/gpu/
@@ -343,6 +402,28 @@ class HelpersTestCase(TestCase):
         actual = helpers.line_changed(line_number, patch_a, patch_b)
         self.assertEqual(expected, actual)
 
+    def test_lines_changed(self):
+        with open(DIFF_4001_5001_PATH, 'r') as f:
+            patch_a = f.read()
+        with open(DIFF_10001_11001_PATH, 'r') as f:
+            patch_b = f.read()
+        line_numbers = [5, 8, 24, 51, 113, 240, 300]
+
+        # Sub-Test 1
+        expected = [
+                helpers.line_changed(line_number, patch_a, patch_b)
+                for line_number in line_numbers
+            ]
+        actual = helpers.lines_changed(line_numbers, patch_a, patch_b)
+        self.assertListEqual(expected, actual)
+        self.assertFalse(actual[-1])
+
+        # Sub-Test 2
+        actual = helpers.lines_changed(
+                line_numbers, patch_a, patch_b, keys=(4001, 10001)
+            )
+        self.assertListEqual(expected, actual)
+
     def test_load_json_w_sanitization(self):
         data = expected = {'message': 'hello world!!!'}
         with tempfile.TemporaryDirectory() as tempdir:
@@ -361,6 +442,21 @@ class HelpersTestCase(TestCase):
             actual = helpers.load_json(filepath, sanitize=False)
             self.assertEqual(expected, actual)
 
+    def test_open_file(self):
+        data = expected = [{'message': 'hello world!!!'}, {'message': 'bye'}]
+        with tempfile.TemporaryDirectory() as tempdir:
+            for extension in ['.jsonl', '.jsonl.gz', '.jsonl.xz']:
+                filepath = os.path.join(tempdir, 'foo' + extension)
+                with helpers.open_file(filepath, 'w') as file:
+                    for item in data:
+                        file.write(json.dumps(item) + '\n')
+                actual = list(helpers.load_jsonl(filepath))
+                self.assertEqual(expected, actual)
+
+            # Sub-Test - Files are compressed
+            with open(os.path.join(tempdir, 'foo.jsonl.gz'), 'rb') as file:
+                self.assertEqual(b'\x1f\x8b', file.read(2))
+
     def test_parse_bugids(self):
         data = [
                 # Patterns that SHOULD BE recognized
@@ -60,6 +60,7 @@ class NewQueryStringsTestCase(testcases.SpecialTestCase):
                 )
 
         qs.clear_objects()
+        qs.clear_populations()
 
     def test_new_querystrings(self):
         # Sub-Test 1 - query_by_year(year, table, ids=True)
@@ -190,6 +191,8 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
                     'REFRESH MATERIALIZED VIEW {};'.format('vw_review_lemma')
                 )
 
+        qs.clear_populations()
+
     def test_queryStrings(self):
         # Sub-Test 1 - query_TF_dict(key='token')
         expected = [
@@ -268,10 +271,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 7 - query_rIDs_all()
         expected = expected
-        qs.ALL_RIDS = []
-        qs.FIXED_RIDS = []
-        qs.MISSED_RIDS = []
-        qs.NEUTRAL_RIDS = []
+        qs.clear_populations()
         actual = qs.query_rIDs_all()
         self.assertEqual(sorted(expected), sorted(actual))
 
@@ -284,7 +284,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 9 - query_rIDs_missed()
         expected = expected
-        qs.MISSED_RIDS = []
+        qs.clear_populations()
         actual = qs.query_rIDs_missed()
         self.assertEqual(sorted(expected), sorted(actual))
 
@@ -296,7 +296,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 11 - query_rIDs_fixed()
         expected = expected
-        qs.FIXED_RIDS = []
+        qs.clear_populations()
         actual = qs.query_rIDs_fixed()
         self.assertEqual(sorted(expected), sorted(actual))
 
@@ -311,10 +311,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 13 - query_rIDs_neutral()
         expected = expected
-        qs.ALL_RIDS = []
-        qs.NEUTRAL_RIDS = []
-        qs.FIXED_RIDS = []
-        qs.MISSED_RIDS = []
+        qs.clear_populations()
         actual = qs.query_rIDs_neutral()
         self.assertEqual(sorted(expected), sorted(actual))
 
@@ -379,6 +376,12 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
         random2 = qs.query_rIDs_random(list(actual), 2)
         self.assertNotEqual(sorted(list(random1)), sorted(list(random2)))
 
+        # Sub-Test 20 - query_rIDs_random(seed)
+        random1 = qs.query_rIDs_random(list(actual), 2, seed=1)
+        random2 = qs.query_rIDs_random(list(actual), 2, seed=1)
+        self.assertEqual(len(actual) // 2, len(random1))
+        self.assertListEqual(random1, random2)
+
         # Sub-Test 21 - query_mIDs('missed')
         expected = 99
         actual = qs.query_mIDs('missed')
@@ -386,8 +389,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 22 - query_mIDs_missed()
         expected = 99
-        # Force repopulation for unit test coverage.
-        qs.MISSED_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_missed()
         self.assertEqual(expected, len(list(actual)))
 
@@ -398,8 +400,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 24 - query_mIDs_fixed()
         expected = 60
-        # Force repopulation for unit test coverage.
-        qs.FIXED_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_fixed()
         self.assertEqual(expected, len(list(actual)))
 
@@ -410,8 +411,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 26 - query_mIDs_neutral()
         expected = 238
-        # Force repopulation for unit test coverage.
-        qs.NEUTRAL_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_neutral()
         self.assertEqual(expected, len(list(actual)))
 
@@ -422,8 +422,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 28 - query_mIDs_fm()
         expected = 152
-        # Force repopulation for unit test coverage.
-        qs.FM_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_fm()
         self.assertEqual(expected, len(list(actual)))
 
@@ -436,8 +435,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 30 - query_mIDs_nm()
         expected = 330
-        # Force repopulation for unit test coverage.
-        qs.NM_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_nm()
         self.assertEqual(expected, len(list(actual)))
 
@@ -450,8 +448,7 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
 
         # Sub-Test 32 - query_mIDs_nf()
         expected = 291
-        # Force repopulation for unit test coverage.
-        qs.NF_MIDS = []
+        qs.clear_populations()
         actual = qs.query_mIDs_nf()
         self.assertEqual(expected, len(list(actual)))
 
@@ -471,6 +468,10 @@ class QueryStringsTestCase(testcases.SpecialTestCase):
         random1 = qs.query_mIDs_random(list(actual), 5)
         random2 = qs.query_mIDs_random(list(actual), 5)
         self.assertNotEqual(sorted(list(random1)), sorted(list(random2)))
+        random1 = qs.query_mIDs_random(list(actual), 5, seed=1)
+        random2 = qs.query_mIDs_random(list(actual), 5, seed=1)
+        self.assertEqual(5, len(random1))
+        self.assertListEqual(random1, random2)
 
         # Sub-Test 36 - query_mIDs_all()
         expected = 390
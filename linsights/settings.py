@@ -43,12 +43,18 @@ IDS_PATH = os.path.join(DATA_DIR, '{switch}/ids')
 REVIEWS_PATH = os.path.join(DATA_DIR, 'reviews/{year}')
 VULNERABILITIES_PATH = os.path.join(DATA_DIR, 'vulnerabilities')
 NLP_CACHE_PATH = os.path.join(DATA_DIR, 'nlp')
+POPULATIONS_PATH = os.path.join(DATA_DIR, 'populations')
 
 # Preferences
 
 # Years for which data is available
 YEARS = list(range(2008, 2017))
 
+# Compression of the chunk files to which bugs and reviews are saved. One of
+# None, 'gzip', or 'lzma'. Compressed and uncompressed chunk files are read
+# alike, so existing chunk files may be (re)compressed using recompress.
+ARCHIVE_COMPRESSION = None
+
 # Addresses of bots that post messages during a code review or bug triaging
 BOTS = ['commit-bot@chromium.org', 'bugdroid1@chromium.org']
 
@@ -64,6 +70,17 @@ CPU_COUNT = multiprocessing.cpu_count()
 # Maximum number of items in a queue
 QUEUE_SIZE = 5000
 
+# Maximum number of rows saved in a single bulk insert
+BATCH_SIZE = 5000
+
+# Stanford CoreNLP
+# ## URLs of the CoreNLP servers that the sentiment and sentence parse taggers
+# ## send sentences to in turn. May be overridden by a comma-separated list of
+# ## URLs in the CORENLP_URLS environment variable.
+CORENLP_URLS = os.environ.get(
+        'CORENLP_URLS', 'http://localhost:41194/'
+    ).split(',')
+
 # Monorail API
 # ## Discovery URL for Monorail API
 MONORAIL_URL = 'https://monorail-prod.appspot.com/_ah/api/discovery/v1/' \